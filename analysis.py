@@ -0,0 +1,198 @@
+"""Checks the moves of the players for blunders in the background, within a strict time budget.
+
+The position before the move is copied and a worker thread compares the move with the other moves of that
+position: each one is scored by a short tactical search(the captures and the checks that follow it, see
+`TacticalSearch`). A move scoring at least MISTAKE_CP below the best one is annotated '?', BLUNDER_CP below '??'.
+Moves not scored when the budget runs out are not compared, so a check never takes longer than its budget.
+
+    python analysis.py [games] [moves] [budget_ms]
+
+checks every move of random games and prints the CPU time and the latency of a check.
+"""
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fen import STARTING_FEN, game_from_fen
+from game import parse_uci_move, uci_move
+from instrumentation import LatencyHistogram, get_logger
+from search import MATE_SCORE, Search, SearchStopped
+
+logger = get_logger('analysis')
+
+BUDGET_MS = 200  # time a check may take
+MISTAKE_CP = 100  # centipawns lost by a '?' move
+BLUNDER_CP = 300  # centipawns lost by a '??' move
+MATE_CHECK_DEPTH = 2  # the positions after the replies to a move are also checked for checkmate
+
+
+def annotation(loss: int) -> str:
+    """Returns the annotation of a move losing `loss` centipawns('??', '?' or '')"""
+    if loss >= BLUNDER_CP:
+        return '??'
+    if loss >= MISTAKE_CP:
+        return '?'
+    return ''
+
+
+class TacticalSearch(Search):
+    """Scores the moves of one position by the captures and the checks that follow them.
+
+    After the move, a player in check must answer it(so a checkmate is found), else the captures and the moves
+    giving check are searched, then only the captures(see `Search.quiescence`).
+    """
+
+    def quiescence(self, node, alpha: int, beta: int, depth: int) -> int:
+        color = 'white' if node.white_turn else 'black'
+        if depth > 0:
+            # the capture or check answering the move may be checkmate(e.g. Qxf7#)
+            if depth <= MATE_CHECK_DEPTH and node.is_check(color) and not node.legal_moves():
+                return -MATE_SCORE + 1
+            return Search.quiescence(self, node, alpha, beta, depth)
+
+        self.count_node()
+        if node.is_check(color):
+            moves = self.ordered_moves(node)
+            if not moves:
+                return -MATE_SCORE + 1
+        else:
+            score = self.quiescence(node, alpha, beta, 1)  # the stand pat and the captures
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+            moves = self.checking_moves(node)
+
+        for move in moves:
+            score = -self.quiescence(self.play(node, move), -beta, -alpha, 1)
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
+
+    def checking_moves(self, node) -> list:
+        """Returns the moves of `node` that give check without capturing(the captures are searched anyway)"""
+        opponent = 'black' if node.white_turn else 'white'
+        moves = []
+        for move in self.ordered_moves(node):
+            from_square, to_square, _ = move
+            piece = node.pieces[node.get_piece_on_square(from_square)]
+            if node.get_piece_on_square(to_square) or (piece.name == 'pawn' and from_square[0] != to_square[0]):
+                continue
+            self.count_node()
+            if self.play(node, move).is_check(opponent):
+                moves.append(move)
+        return moves
+
+    def check(self, move: str, budget_ms: int = BUDGET_MS) -> dict:
+        """Compares `move`(UCI) with the other moves of the position within `budget_ms`.
+
+        :return: dict with the move, the best move found, the centipawns lost, the annotation and whether every
+            move was compared before the budget ran out(complete)
+        """
+        self.start = time.perf_counter()
+        self.deadline = self.start + budget_ms / 1000
+        result = {'move': move, 'best_move': move, 'loss': 0, 'annotation': '', 'complete': False}
+
+        played = parse_uci_move(move)
+        try:
+            played_score = -self.quiescence(self.play(self.root, played), -MATE_SCORE - 1, MATE_SCORE + 1, 0)
+        except SearchStopped:
+            return result  # not even the move itself was scored
+
+        best_score = played_score
+        try:
+            for alternative in self.ordered_moves(self.root):
+                if alternative[:2] == played[:2]:
+                    continue
+                # only a better move matters: its score is exact, a worse one is cut off
+                score = -self.quiescence(self.play(self.root, alternative), -MATE_SCORE - 1, -best_score, 0)
+                if score > best_score:
+                    best_score = score
+                    result['best_move'] = uci_move(*alternative)
+            result['complete'] = True
+        except SearchStopped:
+            pass  # the moves not scored yet are not compared
+
+        result['loss'] = best_score - played_score
+        result['annotation'] = annotation(result['loss'])
+        return result
+
+
+class BlunderCheck:
+    """Checks one move at a time in a worker thread, a new check cancels the previous one"""
+
+    def __init__(self, budget_ms: int = BUDGET_MS):
+        self.budget_ms = budget_ms
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.search = None  # TacticalSearch of the last check
+
+    def submit(self, search: TacticalSearch, move: str):
+        """Starts checking `move` of the position of `search`(copied before the move) and returns a Future of
+        the result of `TacticalSearch.check` with the CPU time of the check added(cpu_ns)"""
+        self.cancel()
+        self.search = search
+        return self.executor.submit(self.run_check, search, move, self.budget_ms)
+
+    def cancel(self):
+        """Stops the running check(e.g. the next move arrived), its result is not used"""
+        if self.search is not None:
+            self.search.stop()
+            self.search = None
+
+    def close(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def run_check(search: TacticalSearch, move: str, budget_ms: int) -> dict:
+        """Runs in the worker thread"""
+        start = time.thread_time_ns()
+        result = search.check(move, budget_ms)
+        result['cpu_ns'] = time.thread_time_ns() - start
+        logger.debug('%s checked: %s', move, result)
+        return result
+
+
+def benchmark(games: int = 5, moves: int = 30, budget_ms: int = BUDGET_MS):
+    """Checks every move of `games` random games and prints the CPU time and the latency of the checks"""
+    checker = BlunderCheck(budget_ms)
+    cpu = LatencyHistogram()
+    latency = LatencyHistogram()
+    annotations = {'?': 0, '??': 0}
+    complete = 0
+
+    for seed in range(games):
+        generator = random.Random(seed)
+        game = game_from_fen(STARTING_FEN)
+        for _ in range(moves):
+            legal = game.legal_moves()
+            if not legal:
+                break
+            from_square, to_square = generator.choice(legal)
+            piece = game.pieces[game.get_piece_on_square(from_square)]
+            promotion = 'queen' if piece.name == 'pawn' and to_square[1] in '18' else None
+
+            start = time.perf_counter_ns()
+            future = checker.submit(TacticalSearch(game), uci_move(from_square, to_square, promotion))
+            game.play_move(from_square, to_square, promotion)
+            result = future.result()
+            latency.record(time.perf_counter_ns() - start)
+            cpu.record(result['cpu_ns'])
+            complete += result['complete']
+            if result['annotation']:
+                annotations[result['annotation']] += 1
+            if game.game_state:
+                break
+
+    checker.close()
+    print(f'{cpu.count} moves checked({complete} complete within {budget_ms} ms), '
+          f'{annotations["?"]} ?, {annotations["??"]} ??')
+    print(f'CPU per move: mean {cpu.total_ns / max(1, cpu.count) / 1e6:.1f} ms, max {cpu.max_ns / 1e6:.1f} ms')
+    print(f'annotation latency: p50 {latency.percentile(50) / 1e6:.1f} ms, p99 {latency.percentile(99) / 1e6:.1f} '
+          f'ms, max {latency.max_ns / 1e6:.1f} ms')
+
+
+if __name__ == '__main__':
+    arguments = [int(argument) for argument in sys.argv[1:4]]
+    benchmark(*arguments)
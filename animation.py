@@ -0,0 +1,121 @@
+import time
+
+
+class Tween:
+    """Movement of one canvas item from a start to an end position over a period of time"""
+
+    def __init__(self, item: int, start: tuple, end: tuple, start_time: float, duration: float):
+        self.item = item
+        self.start = start
+        self.end = end
+        self.start_time = start_time
+        self.duration = duration
+
+    def position(self, now: float) -> tuple:
+        """Returns the (x, y) position of the item at time `now` and whether the movement is finished.
+
+        The position is computed from the time that has passed, so a late frame simply jumps further
+        along the path instead of slowing the movement down.
+        """
+        progress = (now - self.start_time) / self.duration if self.duration > 0 else 1
+        if progress >= 1:
+            return self.end, True
+
+        # ease out: fast at the start, slow at the end
+        progress = 1 - (1 - progress) ** 2
+        x0, y0 = self.start
+        x1, y1 = self.end
+
+        return (x0 + (x1 - x0) * progress, y0 + (y1 - y0) * progress), False
+
+
+class Animator:
+    """Moves canvas items smoothly.
+
+    All the items being moved are updated from one shared `after` tick so the number of pending timers
+    never grows with the number of moving pieces.
+    Every tick has a fixed frame budget(`frame_ms`). If the event loop is busy and a tick comes late, the
+    frames that were missed are dropped(counted in `dropped_frames`) and the items go straight to the
+    position they should have at that time.
+    """
+
+    def __init__(self, canvas, frame_ms: int = 16, duration_ms: int = 150):
+        self.canvas = canvas
+        self.frame_ms = frame_ms
+        self.duration_ms = duration_ms
+        self.default_duration_ms = duration_ms  # `duration_ms` goes back to this after a fast replay
+
+        self.tweens = {}  # key: item id, value: Tween
+        self.after_id = None
+        self.next_tick = None  # time the next tick is expected to run
+
+        self.frames = 0
+        self.dropped_frames = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self.tweens)
+
+    def animate(self, item: int, x, y, duration_ms: int = None):
+        """Moves the canvas `item` from where it currently is to (x, y).
+
+        If the item is already moving, it continues from its current position to the new target.
+        """
+        if duration_ms is None:
+            duration_ms = self.duration_ms
+
+        if duration_ms <= 0:
+            self.tweens.pop(item, None)
+            self.canvas.coords(item, x, y)
+            return
+
+        x0, y0 = self.canvas.coords(item)[:2]
+        self.tweens[item] = Tween(item, (x0, y0), (x, y), time.perf_counter(), duration_ms / 1000)
+
+        if self.after_id is None:
+            self.next_tick = time.perf_counter()
+            self.after_id = self.canvas.after(self.frame_ms, self._tick)
+
+    def finish(self):
+        """Puts every moving item at its end position and stops the animation.
+
+        Called before a new move starts so a move never begins from a half finished animation.
+        """
+        for tween in self.tweens.values():
+            self.canvas.coords(tween.item, *tween.end)
+        self.cancel()
+
+    def cancel(self):
+        """Stops the animation and leaves the items where they are(used when the items are deleted)"""
+        self.tweens = {}
+        if self.after_id is not None:
+            self.canvas.after_cancel(self.after_id)
+            self.after_id = None
+
+    def _tick(self):
+        """Moves every item one frame forward and schedules the next frame if any item is still moving"""
+        self.after_id = None
+        now = time.perf_counter()
+        frame = self.frame_ms / 1000
+
+        # frames that should have been drawn between the expected and the actual time of this tick
+        late = now - (self.next_tick + frame)
+        if late > frame:
+            self.dropped_frames += int(late // frame)
+        self.frames += 1
+
+        finished = []
+        for item, tween in self.tweens.items():
+            (x, y), done = tween.position(now)
+            self.canvas.coords(item, x, y)
+            if done:
+                finished.append(item)
+
+        for item in finished:
+            del self.tweens[item]
+
+        if self.tweens:
+            # the time spent drawing this frame is taken out of the wait for the next frame
+            spent = time.perf_counter() - now
+            self.next_tick = now
+            self.after_id = self.canvas.after(max(1, int((frame - spent) * 1000)), self._tick)
@@ -0,0 +1,198 @@
+"""Annotates the games of a PGN file: the evaluation after every move, the best move and the centipawns lost.
+
+    python annotate.py GAMES.pgn [--output FILE] [--nodes N | --depth D | --movetime MS] [--workers N]
+
+Every position of a game is searched once(see `Search`): the score of a position for the player to move is the
+score the previous move led to, so the centipawns lost by a move are its score against the best score found in the
+position before it. A move losing INACCURACY_CP or more is marked '?!', MISTAKE_CP '?' and BLUNDER_CP '??'(see
+`analysis`). Each move gets a comment with the evaluation for white in pawns and the best move if it lost
+centipawns, and the games get WhiteACPL and BlackACPL tags: the average centipawn loss of each player. A search
+stopped by --nodes or --movetime before depth 1 finished has no score: the moves it is needed for are left out of
+the averages and commented 'not searched' when the position after them has no score either.
+
+The games are read one at a time and each one is annotated by a worker process. The scores of the positions a
+worker searched are cached by its Zobrist hash(see `Game.position_hash`), so the openings the games share are
+searched once per worker. The annotated games are written in the order of the input.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from analysis import BLUNDER_CP, MISTAKE_CP
+from fen import STARTING_FEN, game_from_fen
+from game import parse_uci_move, uci_move
+from instrumentation import get_logger
+from pgn import game_pgn, parse_san, play_san, read_games, san_move
+from search import MATE_SCORE, Search
+
+logger = get_logger('annotate')
+
+INACCURACY_CP = 50  # centipawns lost by a '?!' move
+MAX_LOSS_CP = 1000  # a loss counts at most this much in the averages(e.g. missing a checkmate)
+NODES = 2000  # nodes searched per position when no limit is given
+CACHE_SIZE = 100000  # positions whose score each worker keeps
+GAMES_AHEAD = 4  # games sent to each worker ahead of the one written
+
+# key: Zobrist hash of a position, value: (best move(UCI) or None, score for the player to move), one per process
+cache = {}
+cache_stats = {'hits': 0, 'misses': 0}
+
+
+def move_annotation(loss: int) -> str:
+    """Returns the annotation of a move losing `loss` centipawns('??', '?', '?!' or '')"""
+    if loss >= BLUNDER_CP:
+        return '??'
+    if loss >= MISTAKE_CP:
+        return '?'
+    if loss >= INACCURACY_CP:
+        return '?!'
+    return ''
+
+
+def score_position(game, limits: dict):
+    """Returns (best move(UCI), score for the player to move) of the position of `game`, from the cache if it was
+    searched before"""
+    key = game.position_hash
+    if key in cache:
+        cache_stats['hits'] += 1
+        return cache[key]
+
+    cache_stats['misses'] += 1
+    if game.game_state not in (None, 'checkmate'):
+        scored = None, 0  # drawn
+    else:
+        scored = Search(game).run(**limits)
+    if len(cache) >= CACHE_SIZE:
+        cache.clear()
+    cache[key] = scored
+    return scored
+
+
+def format_score(score: int, white_turn: bool) -> str:
+    """Returns the score of the player to move as the evaluation for white(e.g. '+0.35', '#3', '#-2')"""
+    white_score = score if white_turn else -score
+    if abs(white_score) >= MATE_SCORE - 64:
+        plies = MATE_SCORE - abs(white_score)
+        return f'#{(plies + 1) // 2}' if white_score > 0 else f'#-{(plies + 1) // 2}'
+    return f'{white_score / 100:+.2f}'
+
+
+def annotate_game(record: tuple, limits: dict) -> dict:
+    """Annotates one game(in a worker process).
+
+    :param record: (headers, SAN moves, result) of `pgn.read_games`
+    :return: dict with the annotated PGN, the centipawn losses of each player(key: color, value: list), the
+        moves of each annotation, the moves left without a loss and the cache hits and misses of the game
+    """
+    headers, moves, result = record
+    fen = headers.get('FEN', STARTING_FEN)
+    hits, misses = cache_stats['hits'], cache_stats['misses']
+    losses = {'white': [], 'black': []}
+    annotations = {'?!': 0, '?': 0, '??': 0}
+    annotated = []
+    unannotated = 0  # moves whose loss is unknown
+
+    try:
+        game = game_from_fen(fen)
+        best_move, score = score_position(game, limits)
+        for san in moves:
+            if game.game_state not in (None, 'checkmate', 'stalemate'):
+                game.game_state = None  # over the board, the players may play on instead of claiming the draw
+            color = 'white' if game.white_turn else 'black'
+            from_square, to_square, promotion = parse_san(game, san)
+            best_san = san_move(game, *parse_uci_move(best_move)) if best_move else None
+            played = play_san(game, from_square, to_square, promotion)
+            next_best, next_score = score_position(game, limits)
+
+            if score is None or next_score is None:  # the limits stopped the search before depth 1 finished
+                unannotated += 1
+                comment = 'not searched' if next_score is None else format_score(next_score, game.white_turn)
+                annotated.append(f'{played} {{{comment}}}')
+                best_move, score = next_best, next_score
+                continue
+
+            loss = max(0, score + next_score)  # the score of the move is minus the score of the opponent
+            if uci_move(from_square, to_square, promotion) == best_move:
+                loss = 0
+            losses[color].append(min(loss, MAX_LOSS_CP))
+            mark = move_annotation(loss)
+            if mark:
+                annotations[mark] += 1
+            comment = format_score(next_score, game.white_turn)
+            if loss and best_san:
+                comment += f', best {best_san}'
+            annotated.append(f'{played}{mark} {{{comment}}}')
+            best_move, score = next_best, next_score
+    except ValueError as error:
+        logger.info('%s: %s', headers.get('Event', '?'), error)
+        annotated.append(f'{{{error}}}')
+
+    headers = {name: value for name, value in headers.items() if name not in ('Result', 'SetUp', 'FEN')}
+    for color in ('white', 'black'):
+        if losses[color]:
+            headers[f'{color.capitalize()}ACPL'] = str(round(sum(losses[color]) / len(losses[color])))
+    return {'pgn': game_pgn(headers, annotated, result, fen), 'losses': losses, 'annotations': annotations,
+            'unannotated': unannotated, 'hits': cache_stats['hits'] - hits, 'misses': cache_stats['misses'] - misses}
+
+
+def annotate_games(records, limits: dict, workers: int = None):
+    """Yields the results of `annotate_game` for the games of the iterable `records`, in their order.
+
+    Only a few games per worker are read ahead, so a file of any size can be annotated.
+    """
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for record in records:
+            pending.append(executor.submit(annotate_game, record, limits))
+            if len(pending) >= workers * GAMES_AHEAD:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Annotates the games of a PGN file')
+    parser.add_argument('games', help='PGN file')
+    parser.add_argument('--output', help='file the annotated games are written to(stdout by default)')
+    parser.add_argument('--nodes', type=int, help=f'nodes per position({NODES} without any limit)')
+    parser.add_argument('--depth', type=int)
+    parser.add_argument('--movetime', type=int, help='ms per position')
+    parser.add_argument('--workers', type=int, help='processes annotating games(the number of cores by default)')
+    arguments = parser.parse_args()
+
+    limits = {'depth': arguments.depth, 'nodes': arguments.nodes, 'movetime_ms': arguments.movetime}
+    if not any(limits.values()):
+        limits['nodes'] = NODES
+
+    start = time.perf_counter()
+    games = hits = misses = unannotated = 0
+    losses = {'white': [], 'black': []}
+    annotations = {'?!': 0, '?': 0, '??': 0}
+    output = open(arguments.output, 'w') if arguments.output else sys.stdout
+    with open(arguments.games) as file:
+        for annotated in annotate_games(read_games(file), limits, arguments.workers):
+            output.write(annotated['pgn'] + '\n')
+            games += 1
+            hits += annotated['hits']
+            misses += annotated['misses']
+            unannotated += annotated['unannotated']
+            for color in losses:
+                losses[color] += annotated['losses'][color]
+            for mark, count in annotated['annotations'].items():
+                annotations[mark] += count
+    if output is not sys.stdout:
+        output.close()
+
+    hours = (time.perf_counter() - start) / 3600
+    average = {color: sum(loss) / len(loss) if loss else 0 for color, loss in losses.items()}
+    print(f'{games} games annotated, {games / hours:.0f} games per hour', file=sys.stderr)
+    print(f'average centipawn loss: white {average["white"]:.0f}, black {average["black"]:.0f}; '
+          f'{annotations["?!"]} ?!, {annotations["?"]} ?, {annotations["??"]} ??', file=sys.stderr)
+    print(f'cache: {hits} hits, {misses} positions searched', file=sys.stderr)
+    if unannotated:
+        print(f'{unannotated} moves not annotated: the search of a position stopped before depth 1 finished, '
+              f'raise --nodes or --movetime', file=sys.stderr)
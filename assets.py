@@ -0,0 +1,74 @@
+import time
+
+from instrumentation import get_logger, profiler
+
+logger = get_logger('assets')
+
+
+class AssetCache:
+    """Loads images(or any other asset) only once, when they are needed.
+
+    Assets needed for the first paint of the window are loaded when they are registered. Deferred assets are
+    loaded the first time they are asked for(`get`) or, once the window is drawn, one by one when the GUI is
+    idle(`load_deferred`), whichever comes first.
+    """
+
+    def __init__(self):
+        self.loaders = {}  # key: name of the asset, value: function loading the asset
+        self.assets = {}  # key: name of the asset, value: loaded asset
+        self.deferred = []  # names of the assets not loaded yet
+
+    def register(self, name: str, loader, deferred: bool = True):
+        """Registers the function `loader` returning the asset `name`"""
+        self.loaders[name] = loader
+        if deferred:
+            self.deferred.append(name)
+        else:
+            self.get(name)
+
+    def get(self, name: str):
+        """Returns the asset `name`, loading it if it was not loaded yet"""
+        if name not in self.assets:
+            start = time.perf_counter_ns()
+            self.assets[name] = self.loaders[name]()
+            duration = time.perf_counter_ns() - start
+
+            logger.debug('loaded %s in %.1f ms', name, duration / 1e6)
+            if profiler.enabled:
+                profiler.record(f'load_{name}', duration)
+
+        return self.assets[name]
+
+    def load_deferred(self, widget):
+        """Loads the deferred assets in the idle time of `widget`'s event loop, one asset per idle callback"""
+        while self.deferred and self.deferred[0] in self.assets:
+            self.deferred.pop(0)
+
+        if not self.deferred:
+            return
+
+        self.get(self.deferred.pop(0))
+        if self.deferred:
+            # wait for the event loop to handle pending events before loading the next asset
+            widget.after(1, lambda: widget.after_idle(self.load_deferred, widget))
+
+
+def report_first_frame(widget, start: float, then=None):
+    """Reports how long it took from `start`(a time.perf_counter() value) until the window was drawn and ready.
+
+    Called through `after_idle` after the widgets are created, so it runs once Tk has drawn the first frame and
+    is waiting for events.
+    `then` is called right after the report(e.g. to start loading the deferred assets), so work it starts is
+    never counted in the time to the first frame.
+    """
+
+    def report():
+        duration = time.perf_counter() - start
+        logger.info('first interactive frame after %.1f ms', duration * 1000)
+        if profiler.enabled:
+            profiler.record('time_to_first_frame', int(duration * 1e9))
+
+        if then is not None:
+            then()
+
+    widget.after_idle(report)
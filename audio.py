@@ -0,0 +1,244 @@
+import array
+import os
+import threading
+import time
+import wave
+
+from instrumentation import get_logger
+
+try:
+    import miniaudio
+    import numpy
+except ImportError:  # the game works without sound
+    miniaudio = numpy = None
+
+logger = get_logger('audio')
+
+SAMPLE_RATE = 44100
+CHANNELS = 2
+
+FALLBACK_DURATION = 0.2  # seconds, length of the silence replacing a sound that cannot be decoded
+
+# key: name of the sound, value: file path. A missing file falls back to the 'move' sound
+SOUND_FILES = {
+    'move': 'sounds/move5.mp3',
+}
+
+
+class Sound:
+    """A decoded sound: signed 16 bit PCM samples(channels interleaved)"""
+
+    def __init__(self, samples: array.array, channels: int = CHANNELS, sample_rate: int = SAMPLE_RATE):
+        self.samples = samples
+        self.channels = channels
+        self.sample_rate = sample_rate
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.channels / self.sample_rate
+
+
+def silence(duration: float) -> Sound:
+    """Returns a silent Sound of `duration` seconds"""
+    return Sound(array.array('h', bytes(2 * CHANNELS * int(duration * SAMPLE_RATE))))
+
+
+def decode_file(path: str) -> Sound:
+    """Decodes a sound file into PCM samples at SAMPLE_RATE with CHANNELS channels.
+
+    WAV files with 16 bit samples at that format are read with the standard library, anything else(e.g. mp3)
+    needs the optional `miniaudio` package.
+    """
+    if miniaudio is not None:
+        decoded = miniaudio.decode_file(path, output_format=miniaudio.SampleFormat.SIGNED16,
+                                        nchannels=CHANNELS, sample_rate=SAMPLE_RATE)
+        return Sound(decoded.samples)
+
+    if path.endswith('.wav'):
+        with wave.open(path) as file:
+            if file.getsampwidth() == 2 and file.getnchannels() == CHANNELS and file.getframerate() == SAMPLE_RATE:
+                samples = array.array('h')
+                samples.frombytes(file.readframes(file.getnframes()))
+                return Sound(samples)
+
+    raise RuntimeError(f'cannot decode {path}, install miniaudio')
+
+
+class SoundBank:
+    """Decodes every sound once and keeps its PCM samples in memory.
+
+    `get` never decodes, so playing a sound never waits on a decoder. The sounds are decoded by `preload`
+    (normally in a background thread at startup, see `AudioPlayer.start`) or by `load`.
+
+    Already decoded sounds can be given with `sounds`(e.g. in tests) and `fallback` is used for the sounds that
+    cannot be decoded(e.g. a silent Sound when there is no decoder), else those sounds are disabled.
+    """
+
+    def __init__(self, sound_files: dict = None, sounds: dict = None, fallback: Sound = None):
+        self.sound_files = dict(SOUND_FILES if sound_files is None else sound_files)
+        self.sounds = dict(sounds or {})  # key: name of the sound, value: Sound
+        self.fallback = fallback
+        self.decoded = {}  # key: file path, value: Sound(sounds falling back to the same file share it)
+
+    def load(self, name: str):
+        """Decodes the sound `name` if it is not decoded yet and returns it(None if it cannot be decoded)"""
+        if name in self.sounds:
+            return self.sounds[name]
+
+        path = self.sound_files.get(name)
+        if not path or not os.path.exists(path):
+            path = self.sound_files.get('move')
+
+        if path not in self.decoded:
+            try:
+                self.decoded[path] = decode_file(path)
+            except Exception as error:
+                if self.fallback is None:
+                    logger.warning('sound %s is disabled: %s', name, error)
+                else:
+                    logger.info('sound %s is replaced by the fallback sound: %s', name, error)
+                self.decoded[path] = self.fallback
+        sound = self.decoded[path]
+
+        self.sounds[name] = sound
+        return sound
+
+    def preload(self):
+        """Decodes all the sounds"""
+        start = time.perf_counter()
+        for name in self.sound_files:
+            self.load(name)
+        logger.debug('decoded %d sounds in %.1f ms', len(self.sound_files), (time.perf_counter() - start) * 1000)
+
+    def get(self, name: str):
+        """Returns the decoded sound `name` or None if it is not decoded(yet)"""
+        return self.sounds.get(name)
+
+
+class NullSink:
+    """Plays nothing, only records when each sound was played. Used without a sound device and in tests"""
+
+    def __init__(self):
+        self.played = []  # (time.perf_counter() timestamp, name of the sound)
+
+    def play(self, name: str, sound: Sound):
+        self.played.append((time.perf_counter(), name))
+
+    def close(self):
+        pass
+
+
+class MixingSink:
+    """Plays sounds through the sound card with miniaudio.
+
+    The samples are pulled by miniaudio's own playback thread. Sounds that overlap are mixed together(with numpy,
+    the playback thread must fill a buffer in a few milliseconds), so `play` only appends the sound to the list of
+    voices and returns straight away.
+    """
+
+    def __init__(self):
+        self.voices = []  # [sound, position of the next sample]
+        self.lock = threading.Lock()
+        self.device = miniaudio.PlaybackDevice(output_format=miniaudio.SampleFormat.SIGNED16,
+                                               nchannels=CHANNELS, sample_rate=SAMPLE_RATE)
+        stream = self._mix()
+        next(stream)
+        self.device.start(stream)
+
+    def play(self, name: str, sound: Sound):
+        with self.lock:
+            self.voices.append([sound, 0])
+
+    def _mix(self):
+        """Generator feeding the playback device: sums the samples of every voice and clips the result"""
+        frames = yield b''
+        while True:
+            size = frames * CHANNELS
+            with self.lock:
+                voices = [voice for voice in self.voices if voice[1] < len(voice[0].samples)]
+                self.voices = voices
+
+            if not voices:
+                frames = yield array.array('h', bytes(size * 2))
+                continue
+
+            if len(voices) == 1:  # nothing to mix
+                sound, position = voices[0]
+                chunk = sound.samples[position:position + size]
+                voices[0][1] = position + size
+                if len(chunk) < size:
+                    chunk.extend(array.array('h', bytes(2 * (size - len(chunk)))))
+                frames = yield chunk
+                continue
+
+            mixed = numpy.zeros(size, dtype=numpy.int32)  # no overflow before the clipping
+            for voice in voices:
+                sound, position = voice
+                chunk = numpy.frombuffer(sound.samples, dtype=numpy.int16)[position:position + size]
+                voice[1] = position + size
+                mixed[:len(chunk)] += chunk
+            chunk = array.array('h')
+            chunk.frombytes(numpy.clip(mixed, -32768, 32767).astype(numpy.int16).tobytes())
+            frames = yield chunk
+
+    def close(self):
+        self.device.close()
+
+
+class AudioPlayer:
+    """Plays the sounds of the game(e.g. the move sound) without blocking the GUI.
+
+    At most `max_voices` sounds play at the same time. A sound asked for while that many are playing, or
+    before it is decoded, is dropped rather than queued, so fast replays never build up a backlog of sounds.
+    """
+
+    def __init__(self, bank: SoundBank = None, sink=None, max_voices: int = 2):
+        self.bank = bank if bank is not None else SoundBank()
+        self.sink = sink if sink is not None else NullSink()
+        self.max_voices = max_voices
+
+        self.playing_until = []  # end times of the sounds that are playing
+        self.dropped = 0
+
+    def start(self):
+        """Decodes the sounds in a background thread so that startup does not wait for the decoder"""
+        thread = threading.Thread(target=self.bank.preload, name='sound-decoder', daemon=True)
+        thread.start()
+        return thread
+
+    def play(self, name: str) -> bool:
+        """Plays the sound `name`. Returns False if it was dropped"""
+        sound = self.bank.get(name)
+        now = time.perf_counter()
+        self.playing_until = [end for end in self.playing_until if end > now]
+
+        if sound is None or len(self.playing_until) >= self.max_voices:
+            self.dropped += 1
+            return False
+
+        self.sink.play(name, sound)
+        self.playing_until.append(now + sound.duration)
+        return True
+
+    def close(self):
+        self.sink.close()
+
+
+def create_audio_player() -> AudioPlayer:
+    """Returns an AudioPlayer playing through the sound card if possible, else a silent one.
+
+    The silent player records the sounds it is asked to play(see `NullSink`), sounds that cannot be decoded
+    without miniaudio are recorded as short silences.
+    The sound can be switched off with the CHESS_SOUND=0 environment variable.
+    """
+    sink = None
+    if miniaudio is not None and os.environ.get('CHESS_SOUND') != '0':
+        try:
+            sink = MixingSink()
+        except Exception as error:
+            logger.warning('no sound device: %s', error)
+
+    bank = SoundBank() if sink is not None else SoundBank(fallback=silence(FALLBACK_DURATION))
+    player = AudioPlayer(bank=bank, sink=sink)
+    player.start()
+    return player
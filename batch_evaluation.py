@@ -0,0 +1,111 @@
+"""Scores many positions at once with NumPy: the same material and piece-square tables as `evaluation.evaluate`.
+
+A batch is either
+    planes (N, 12, 64) or (N, 12, 8, 8): one plane per piece type(see `selfplay.PLANE_SYMBOLS`), 1 where it stands
+    codes (N, 64): the piece on each square(a1 to h8), 0 if empty, else 1 + its plane(see `position_codes`)
+and a single position is the same array without N. The scores are integers in centipawns for white and are
+exactly those of `evaluation.evaluate`.
+
+    python batch_evaluation.py
+
+checks the scores against `evaluation.evaluate` and prints the positions per second at several batch sizes.
+"""
+import random
+import time
+
+import numpy as np
+
+from evaluation import SQUARE_SCORES, evaluate
+from fen import STARTING_FEN, game_from_fen
+from position import square_index
+from selfplay import PLANE_SYMBOLS, PLANES
+
+# score of each piece type(the planes) on each square
+PLANE_SCORES = np.array([SQUARE_SCORES[symbol] for symbol in PLANE_SYMBOLS], dtype=np.int32)
+# the same with the empty square first, indexed by a code of `position_codes`
+CODE_SCORES = np.vstack([np.zeros(64, dtype=np.int32), PLANE_SCORES])
+# the planes are multiplied as float32: BLAS is faster and every sum(at most 32 pieces) is exact
+PLANE_WEIGHTS = PLANE_SCORES.reshape(-1).astype(np.float32)
+CHUNK = 512  # positions converted to float32 at a time, so the copy stays in the cache
+SQUARES = np.arange(64)
+BATCH_SIZES = (1, 64, 4096, 65536)
+
+
+def position_codes(position) -> np.ndarray:
+    """Returns the (64,) codes of the pieces of `position`(a Position or a Game)"""
+    codes = np.zeros(64, dtype=np.uint8)
+    for piece in position.pieces.values():
+        codes[square_index(piece.current_square)] = PLANES[piece.symbol] + 1
+    return codes
+
+
+def evaluate_codes(codes: np.ndarray):
+    """Returns the scores of (N, 64) codes, the score of one position for (64,) codes"""
+    if codes.ndim == 1:  # only the squares with a piece are looked up
+        squares = np.flatnonzero(codes)
+        return int(CODE_SCORES[codes[squares], squares].sum())
+    return CODE_SCORES[codes, SQUARES].sum(axis=1)
+
+
+def evaluate_planes(planes: np.ndarray):
+    """Returns the scores of (N, 12, 64) or (N, 12, 8, 8) planes, the score of one position without N"""
+    if planes.shape in ((12, 64), (12, 8, 8)):
+        return int(np.dot(planes.reshape(-1).astype(np.int32), PLANE_SCORES.reshape(-1)))
+
+    flat = planes.reshape(len(planes), 12 * 64)
+    scores = np.empty(len(flat), dtype=np.float32)
+    for start in range(0, len(flat), CHUNK):
+        scores[start:start + CHUNK] = flat[start:start + CHUNK].astype(np.float32) @ PLANE_WEIGHTS
+    return scores.astype(np.int32)
+
+
+def random_positions(count: int, seed: int = 0) -> list:
+    """Returns `count` Games after random moves(e.g. to check or benchmark the evaluators)"""
+    generator = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        game = game_from_fen(STARTING_FEN)
+        for _ in range(generator.randrange(1, 120)):
+            legal = game.legal_moves()
+            if not legal:
+                break
+            game.play_move(*generator.choice(legal), 'queen')
+        positions.append(game)
+    return positions
+
+
+def benchmark(count: int = 200):
+    """Checks the batch scores of `count` random positions against `evaluate` and prints the positions per second
+    of each evaluator at BATCH_SIZES"""
+    positions = random_positions(count)
+    expected = [evaluate(position) for position in positions]
+    codes = np.array([position_codes(position) for position in positions])
+    planes = np.zeros((count, 12, 64), dtype=np.uint8)
+    planes[np.nonzero(codes)[0], codes[codes > 0] - 1, np.nonzero(codes)[1]] = 1
+
+    assert evaluate_codes(codes).tolist() == expected
+    assert evaluate_planes(planes).tolist() == expected
+    assert [evaluate_codes(row) for row in codes] == expected
+    assert [evaluate_planes(row) for row in planes] == expected
+    print(f'{count} positions scored like evaluation.evaluate')
+
+    start = time.perf_counter()
+    for position in positions:
+        evaluate(position)
+    print(f'evaluation.evaluate: {count / (time.perf_counter() - start):,.0f} positions per second')
+
+    for name, batch, function in (('codes', codes, evaluate_codes), ('planes', planes, evaluate_planes)):
+        for size in BATCH_SIZES:
+            data = np.resize(batch, (size,) + batch.shape[1:])
+            if size == 1:
+                data = data[0]  # a single position
+            repeats = max(1, 100000 // size)
+            start = time.perf_counter()
+            for _ in range(repeats):
+                function(data)
+            rate = size * repeats / (time.perf_counter() - start)
+            print(f'{name:6} batch {size:6}: {rate:14,.0f} positions per second')
+
+
+if __name__ == '__main__':
+    benchmark()
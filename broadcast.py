@@ -0,0 +1,236 @@
+"""Sends the moves of a game to many spectators.
+
+A spectator first gets a snapshot of the board, then a small delta per move:
+
+    S <seq> <board> <player to move> <state>    the board is 64 characters from a1 to h8, '.' for an empty square
+                                                and the FEN letter of the piece otherwise(e.g. 'P', 'n')
+    D <seq> <change> <change> ... [=<state>]    e2e4: a piece moved, xd5: the piece on d5 was taken off the board,
+                                                +h8Q: a piece was put on the square(promotion)
+
+A castling is two moves(king and rook) and an en passant capture is a move and an `x`.
+The deltas published during one tick of the event loop are encoded once and written to each spectator in one
+write. A spectator that cannot keep up is not sent deltas at all: once its buffer drained, it gets the latest
+snapshot and continues from there.
+
+The seq of a snapshot is the seq of the last delta it holds, and a spectator only gets the deltas with a greater
+seq after it: a snapshot is only sent when the queued deltas are flushed, in place of them.
+
+    python broadcast.py [number_of_spectators] [slow_percent]
+
+simulates one game watched by in-memory spectators and prints the bytes and time spent on the fan-out.
+"""
+import asyncio
+import random
+import sys
+import time
+
+from game import Game
+from instrumentation import get_logger
+
+logger = get_logger('broadcast')
+
+MAX_BUFFER = 64 * 1024  # bytes waiting to be sent to a spectator before it is considered slow
+CATCH_UP_MS = 100  # how often a slow spectator is checked again when no move is played
+
+
+class StreamSpectator:
+    """A spectator connected with an asyncio stream"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.behind = False  # True while deltas are skipped because the spectator is too slow
+
+    def buffered(self) -> int:
+        return self.writer.transport.get_write_buffer_size()
+
+    def send(self, data: bytes):
+        self.writer.write(data)
+
+
+class MemorySpectator:
+    """A spectator keeping what it receives in memory(a stand-in for a connection in tests and benchmarks).
+
+    `bandwidth` is how many bytes it reads per call of `drain`, None to read everything straight away.
+    """
+
+    def __init__(self, bandwidth: int = None):
+        self.bandwidth = bandwidth
+        self.behind = False
+        self.pending = 0  # bytes sent but not read yet
+        self.received = []  # the messages read
+
+    def buffered(self) -> int:
+        return self.pending
+
+    def send(self, data: bytes):
+        self.received.append(data)
+        self.pending = 0 if self.bandwidth is None else self.pending + len(data)
+
+    def drain(self):
+        if self.bandwidth is not None:
+            self.pending = max(0, self.pending - self.bandwidth)
+
+
+class BroadcastChannel:
+    """The spectators of one game and the deltas not sent to them yet"""
+
+    def __init__(self, game, max_buffer: int = MAX_BUFFER):
+        self.game = game
+        self.max_buffer = max_buffer
+        self.spectators = []
+        self.pending = []  # encoded deltas published since the last flush
+        self.seq = 0  # number of the last delta
+        self.flush_handle = None
+
+    def snapshot(self) -> bytes:
+        """Returns the snapshot message of the current board"""
+        board = ''.join(self.game.pieces[item].symbol if item else '.' for item in self.game.square_items)
+        turn = 'white' if self.game.white_turn else 'black'
+        return f'S {self.seq} {board} {turn} {self.game.game_state or "playing"}\n'.encode()
+
+    def add(self, spectator):
+        """Starts sending the game to `spectator`, beginning with a snapshot at the next flush(the deltas queued
+        already are part of it)"""
+        spectator.behind = True
+        self.spectators.append(spectator)
+        self.schedule(0)
+
+    def remove(self, spectator):
+        if spectator in self.spectators:
+            self.spectators.remove(spectator)
+
+    def publish(self, changes: list, state: str = None):
+        """Queues the delta of one move, all the deltas of this tick are sent together(see `flush`)"""
+        self.seq += 1
+        delta = ' '.join(['D', str(self.seq)] + changes + ([f'={state}'] if state else []))
+        self.pending.append(delta)
+        self.schedule(0)
+
+    def reset(self):
+        """Sends a new snapshot to everybody instead of the queued deltas(e.g. a new game started)"""
+        self.pending = []
+        for spectator in self.spectators:
+            spectator.behind = True
+        self.schedule(0)
+
+    def schedule(self, delay_ms: int):
+        if self.flush_handle is not None:
+            return
+
+        loop = asyncio.get_running_loop()
+        if delay_ms:
+            self.flush_handle = loop.call_later(delay_ms / 1000, self.flush)
+        else:
+            self.flush_handle = loop.call_soon(self.flush)
+
+    def flush(self):
+        """Sends the queued deltas to every spectator that keeps up and a snapshot to those that fell behind"""
+        self.flush_handle = None
+        batch = ('\n'.join(self.pending) + '\n').encode() if self.pending else None
+        self.pending = []
+        snapshot = None
+
+        waiting = 0
+        for spectator in self.spectators:
+            if spectator.buffered() > self.max_buffer:
+                if not spectator.behind:
+                    logger.debug('spectator skipped until it catches up')
+                spectator.behind = True
+                waiting += 1
+            elif spectator.behind:
+                if snapshot is None:
+                    snapshot = self.snapshot()
+                spectator.send(snapshot)
+                spectator.behind = False
+            elif batch:
+                spectator.send(batch)
+
+        if waiting:
+            self.schedule(CATCH_UP_MS)
+
+
+class WatchedGame(Game):
+    """A Game publishing the changes of the board made by every move to its spectators(see `BroadcastChannel`)"""
+
+    def __init__(self):
+        self.changes = []  # changes of the board made by the move being played
+        self.channel = None  # created when the first spectator comes(see `watch`)
+        Game.__init__(self)
+        self.changes = []
+
+    def watch(self, spectator):
+        if self.channel is None:
+            self.channel = BroadcastChannel(self)
+        self.channel.add(spectator)
+
+    def add_piece(self, name: str, color: str, square_name: str) -> int:
+        item = Game.add_piece(self, name, color, square_name)
+        self.changes.append(f'+{square_name}{self.pieces[item].symbol}')
+        return item
+
+    def remove_piece(self, item: int):
+        self.changes.append(f'x{self.pieces[item].current_square}')
+        Game.remove_piece(self, item)
+
+    def move_piece(self, item: int, square_name: str):
+        self.changes.append(f'{self.pieces[item].current_square}{square_name}')
+        Game.move_piece(self, item, square_name)
+
+    def new_game(self):
+        Game.new_game(self)
+        self.changes = []
+        if self.channel is not None:
+            self.channel.reset()
+
+    def make_move(self, item: int, piece, square_name: str, promotion: str = None) -> bool:
+        self.changes = []
+        captured = Game.make_move(self, item, piece, square_name, promotion)
+        self.publish()
+        return captured
+
+    def promote(self, piece_name: str) -> bool:
+        self.changes = []
+        promoted = Game.promote(self, piece_name)
+        if promoted:
+            self.publish()
+        return promoted
+
+    def publish(self):
+        if self.channel is not None:
+            self.channel.publish(self.changes, self.game_state)
+        self.changes = []
+
+
+async def simulate(spectators: int = 5000, slow_percent: int = 5, moves: int = 60, max_buffer: int = 256):
+    """Plays random moves in a game watched by in-memory spectators, one move per event loop tick.
+
+    The slow spectators read 4 bytes per tick and the buffer limit is small, so they fall behind during the game.
+    """
+    game = WatchedGame()
+    generator = random.Random(0)
+    watchers = [MemorySpectator(bandwidth=4 if generator.randrange(100) < slow_percent else None)
+                for _ in range(spectators)]
+    for watcher in watchers:
+        game.watch(watcher)
+    game.channel.max_buffer = max_buffer
+
+    start = time.perf_counter()
+    played = 0
+    while played < moves and game.legal_moves():
+        game.play_move(*generator.choice(game.legal_moves()), promotion='queen')
+        played += 1
+        await asyncio.sleep(0)  # the fan-out of this move happens here
+        for watcher in watchers:
+            watcher.drain()
+    duration = time.perf_counter() - start
+
+    sent = sum(len(data) for watcher in watchers for data in watcher.received)
+    full = len(game.channel.snapshot()) * played * spectators
+    snapshots = sum(data.startswith(b'S') for watcher in watchers for data in watcher.received)
+    print(f'{spectators} spectators({slow_percent}% slow), {played} moves in {duration * 1000:.0f} ms')
+    print(f'sent {sent} bytes, a full board per move would be {full} bytes, {snapshots} snapshots sent')
+
+
+if __name__ == '__main__':
+    arguments = [int(argument) for argument in sys.argv[1:3]]
+    asyncio.run(simulate(*arguments))
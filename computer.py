@@ -0,0 +1,151 @@
+"""A computer player: the search(see `search`) playing one color, in a worker thread.
+
+While the opponent thinks, the computer ponders: it searches the position after the reply it expects(the second
+move of its best line). If the opponent plays that move(a ponder hit), the search already running goes on and only
+needs the rest of its time, often none. Any other move(a miss) stops the ponder search and a new one starts.
+
+Nothing here waits for the worker: a search is stopped by setting its stop flag and the result is a Future the
+caller checks when it suits it(e.g. `ChessBoard.poll_computer`).
+
+    python computer.py [moves] [movetime_ms] [hit_percent]
+
+plays that many replies with and without pondering against an opponent who thinks for a second and plays the
+expected move `hit_percent` % of the time, and prints how long the replies took.
+"""
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fen import STARTING_FEN, game_from_fen
+from game import parse_uci_move
+from instrumentation import LatencyHistogram, get_logger
+from search import Search, SearchNode
+
+logger = get_logger('computer')
+
+MOVETIME_MS = 2000  # time the computer thinks about a move
+
+
+class ComputerPlayer:
+    """Plays the `color` pieces, searching `movetime_ms` per move(see `reply` and `ponder`)"""
+
+    def __init__(self, color: str, movetime_ms: int = MOVETIME_MS, pondering: bool = True):
+        self.color = color
+        self.movetime_ms = movetime_ms
+        self.pondering = pondering
+
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.search = None  # the Search running or last run
+        self.future = None  # Future of (best move, best line) of `search`
+        self.pv = []  # best line of the last move played by the computer, its second move is the expected reply
+        self.predicted_move = None  # the opponent move `search` is pondering on, None if it is not pondering
+        self.ponder_start = 0  # time.perf_counter() the ponder search started at
+
+    def think(self, game):
+        """Starts searching the best move of `game`(the computer is to move) and returns its Future"""
+        self.cancel()
+        self.search = Search(game)
+        self.future = self.executor.submit(self.run_search, self.search, self.movetime_ms)
+        return self.future
+
+    def ponder(self, game):
+        """Starts searching the position after the expected reply of the opponent(the opponent is to move in `game`).
+
+        The search has no time limit, it is given one by a ponder hit(see `reply`).
+        """
+        self.cancel()
+        if not self.pondering or len(self.pv) < 2:
+            return
+
+        # the line was found in this very position, so the expected reply is a correct move
+        predicted_move = self.pv[1]
+        self.search = Search(Search.play(game.copy(SearchNode), parse_uci_move(predicted_move)))
+        self.future = self.executor.submit(self.run_search, self.search, None)
+        self.predicted_move = predicted_move
+        self.ponder_start = time.perf_counter()
+        logger.debug('pondering on %s', predicted_move)
+
+    def reply(self, game, move: str):
+        """Returns (Future of the reply, ponder hit) once the opponent played `move`(UCI, None if unknown) in `game`"""
+        if self.predicted_move is not None and move == self.predicted_move:
+            # the search already ran for some time, it only gets the rest of its time
+            logger.debug('ponder hit on %s', move)
+            self.search.deadline = max(time.perf_counter(), self.ponder_start + self.movetime_ms / 1000)
+            self.predicted_move = None
+            return self.future, True
+
+        return self.think(game), False
+
+    def played(self, pv: list):
+        """Called once the best move of a search was played, `pv` being the best line of that search"""
+        self.pv = pv
+
+    def new_game(self):
+        self.cancel()
+        self.pv = []
+
+    def cancel(self):
+        """Stops the running search, its result is never used"""
+        if self.search is not None:
+            self.search.stop()
+        self.search = None
+        self.future = None
+        self.predicted_move = None
+
+    def close(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def run_search(search: Search, movetime_ms):
+        """Runs in the worker thread and returns (best move, best line)"""
+        best_move, _ = search.run(movetime_ms=movetime_ms)
+        return best_move, search.pv
+
+
+def benchmark(moves: int = 10, movetime_ms: int = 1000, hit_percent: int = 50, opponent_ms: int = 1000):
+    """Plays `moves` replies of the computer(white) with and without pondering and prints the reply times"""
+    for pondering in (False, True):
+        generator = random.Random(0)
+        computer = ComputerPlayer('white', movetime_ms, pondering)
+        game = game_from_fen(STARTING_FEN)
+        hits = LatencyHistogram()
+        misses = LatencyHistogram()
+
+        best_move, pv = computer.think(game).result()
+        for _ in range(moves):
+            game.play_move(*parse_uci_move(best_move))
+            computer.played(pv)
+            legal = game.legal_moves()
+            if not legal:
+                break
+
+            computer.ponder(game)
+            time.sleep(opponent_ms / 1000)  # the opponent thinks
+            if len(pv) > 1 and generator.randrange(100) < hit_percent and parse_uci_move(pv[1])[:2] in legal:
+                move = pv[1]
+            else:
+                move = '%s%s' % generator.choice(legal)
+            from_square, to_square, promotion = parse_uci_move(move)
+            game.play_move(from_square, to_square, promotion or 'queen')
+            if game.game_state:
+                break
+
+            start = time.perf_counter_ns()
+            future, hit = computer.reply(game, move)
+            best_move, pv = future.result()
+            (hits if hit else misses).record(time.perf_counter_ns() - start)
+            if best_move is None:
+                break
+
+        computer.close()
+        for name, histogram in (('ponder hit', hits), ('no ponder hit', misses)):
+            if histogram.count:
+                print(f'pondering {"on " if pondering else "off"} {name:14} {histogram.count:3} replies, '
+                      f'mean {histogram.total_ns / histogram.count / 1e6:7.1f} ms, max {histogram.max_ns / 1e6:7.1f} ms')
+
+
+if __name__ == '__main__':
+    arguments = [int(argument) for argument in sys.argv[1:4]]
+    benchmark(*arguments)
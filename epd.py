@@ -0,0 +1,142 @@
+"""Runs test suites of positions in Extended Position Description(EPD, e.g. the WAC or ECM suites) with the search.
+
+    python epd.py SUITE.epd [SUITE.epd ...] [--movetime MS | --nodes N | --depth D] [--workers N] [--json FILE]
+
+An EPD line is the first four fields of a FEN and then opcodes ending with ';', e.g.
+
+    2rr3k/pp3pp1/1nnqbN1p/3pN3/2pP4/2P3Q1/PPB4P/R4RK1 w - - bm Qg6; id "WAC.001";
+
+`bm` lists the best moves(SAN), `am` the moves to avoid and `id` names the position. A position is solved if
+the move the search plays is one of its best moves and none of the moves to avoid. Its time to solution is the
+time of the first depth after which the search kept playing a solving move.
+
+The positions are spread over a process pool. For each suite the solved positions, the average time to solution
+and the nodes per second of all the searches are printed, and with --json every result is written to FILE(sorted
+keys, so the files of two versions of the engine can be compared with diff).
+"""
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fen import game_from_fen
+from game import uci_move
+from instrumentation import get_logger
+from pgn import parse_san
+from search import Search
+
+logger = get_logger('epd')
+
+MOVETIME_MS = 1000  # time of a search when no limit is given
+OPCODE = re.compile(r'\s*(\w+)\s*((?:"[^"]*"|[^;])*);')
+
+
+def parse_epd(line: str) -> dict:
+    """Returns dict with the FEN of an EPD line and its opcodes(key: opcode, value: list of its operands).
+    Raises ValueError if it has fewer than four fields."""
+    fields = line.split(None, 4)
+    if len(fields) < 4:
+        raise ValueError(f'not an EPD line: {line!r}')
+
+    opcodes = {}
+    for opcode, operands in OPCODE.findall(fields[4] if len(fields) > 4 else ''):
+        opcodes[opcode] = [operand.strip('"') for operand in re.findall(r'"[^"]*"|\S+', operands)]
+
+    # the move counters are opcodes in EPD
+    halfmove_clock = opcodes.get('hmvc', ['0'])[0]
+    fullmove_number = opcodes.get('fmvn', ['1'])[0]
+    return {'fen': ' '.join(fields[:4] + [halfmove_clock, fullmove_number]), 'opcodes': opcodes}
+
+
+def read_suite(path: str) -> list:
+    """Returns the positions(see `parse_epd`) of an EPD file, empty lines and lines starting with '#' skipped"""
+    with open(path) as file:
+        return [parse_epd(line) for line in file if line.strip() and not line.startswith('#')]
+
+
+def solve(position: dict, limits: dict) -> dict:
+    """Searches one position of a suite(in a worker process) within `limits`(depth, nodes, movetime_ms).
+
+    :return: dict with the id, the FEN, the best moves and the moves to avoid(UCI), the move played, whether it
+        solves the position, the time to solution(None if not solved), the depth, the nodes and the time
+    """
+    opcodes = position['opcodes']
+    result = {'id': ' '.join(opcodes.get('id', [])) or position['fen'], 'fen': position['fen']}
+    try:
+        game = game_from_fen(position['fen'])
+        best_moves = [uci_move(*parse_san(game, move)) for move in opcodes.get('bm', [])]
+        avoid_moves = [uci_move(*parse_san(game, move)) for move in opcodes.get('am', [])]
+    except ValueError as error:
+        result['error'] = str(error)
+        return result
+
+    def solving(move: str) -> bool:
+        return (not best_moves or move in best_moves) and move not in avoid_moves
+
+    solved_at = None  # time_ms of the depth from which the search plays a solving move
+    depth = 0
+
+    def info(report: dict):
+        nonlocal solved_at, depth
+        depth = report['depth']
+        if not solving(report['pv'][0]):
+            solved_at = None
+        elif solved_at is None:
+            solved_at = report['time_ms']
+
+    search = Search(game, info=info)
+    move, score = search.run(**limits)
+    time_ms = max(1, int((time.perf_counter() - search.start) * 1000))
+    solved = move is not None and solving(move)
+    logger.debug('%s: %s(%s) %s', result['id'], move, score, 'solved' if solved else 'not solved')
+
+    result.update(bm=best_moves, am=avoid_moves, move=move, score=score, solved=solved,
+                  solution_ms=solved_at if solved else None, depth=depth, nodes=search.nodes, time_ms=time_ms)
+    return result
+
+
+def run_suite(positions: list, limits: dict, executor) -> dict:
+    """Solves the positions of a suite in the pool `executor` and returns dict with the totals and the results"""
+    results = list(executor.map(solve, positions, [limits] * len(positions)))
+    searched = [result for result in results if 'error' not in result]
+    solved = [result for result in searched if result['solved']]
+    nodes = sum(result['nodes'] for result in searched)
+    time_ms = sum(result['time_ms'] for result in searched)
+    return {'positions': len(results), 'solved': len(solved), 'errors': len(results) - len(searched),
+            'average_solution_ms': sum(result['solution_ms'] for result in solved) / len(solved) if solved else None,
+            'nodes': nodes, 'nps': nodes * 1000 // max(1, time_ms), 'results': results}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Runs EPD test suites with the search')
+    parser.add_argument('suites', nargs='+', help='EPD files')
+    parser.add_argument('--movetime', type=int, help=f'ms per position({MOVETIME_MS} without any limit)')
+    parser.add_argument('--nodes', type=int)
+    parser.add_argument('--depth', type=int)
+    parser.add_argument('--workers', type=int, help='processes searching positions(the number of cores by default)')
+    parser.add_argument('--json', help='file the results are written to')
+    arguments = parser.parse_args()
+
+    limits = {'depth': arguments.depth, 'nodes': arguments.nodes, 'movetime_ms': arguments.movetime}
+    if not any(limits.values()):
+        limits['movetime_ms'] = MOVETIME_MS
+
+    report = {'limits': limits, 'suites': {}}
+    with ProcessPoolExecutor(max_workers=arguments.workers or os.cpu_count()) as pool:
+        for path in arguments.suites:
+            suite = run_suite(read_suite(path), limits, pool)
+            report['suites'][os.path.basename(path)] = suite
+            average = suite['average_solution_ms']
+            errors = f', {suite["errors"]} errors' if suite['errors'] else ''
+            average_text = f'{average:.0f} ms' if average is not None else '-'
+            print(f'{os.path.basename(path)}: {suite["solved"]}/{suite["positions"]} solved{errors}, '
+                  f'average time to solution {average_text}, {suite["nps"]} nps')
+            for result in suite['results']:
+                if 'error' in result:
+                    print(f'  {result["id"]}: {result["error"]}')
+
+    if arguments.json:
+        with open(arguments.json, 'w') as file:
+            json.dump(report, file, indent=2, sort_keys=True)
@@ -0,0 +1,92 @@
+"""Static evaluation of a position: the material and where the pieces stand(piece-square tables).
+
+The scores are in centipawns from the point of view of white(e.g. +100 means white is a pawn up).
+"""
+from pieces import PIECE_CLASSES, create_piece
+from position import square_index
+
+# key: name of the piece, value: its value in centipawns
+PIECE_VALUES = {'king': 0, 'queen': 900, 'rook': 500, 'bishop': 330, 'knight': 320, 'pawn': 100}
+
+# key: name of the piece, value: bonus of a white piece per square, as seen from white(the a8...h8 rank first)
+PIECE_SQUARE_TABLES = {
+    'pawn': (
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0,
+    ),
+    'knight': (
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50,
+    ),
+    'bishop': (
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20,
+    ),
+    'rook': (
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0,
+    ),
+    'queen': (
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20,
+    ),
+    'king': (
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        20, 20, 0, 0, 0, 0, 20, 20,
+        20, 30, 10, 0, 0, 10, 30, 20,
+    ),
+}
+
+
+def square_scores(name: str, color: str) -> list:
+    """Returns the score of a `color` piece `name` on each square(a1 to h8), negative for black"""
+    table = PIECE_SQUARE_TABLES[name]
+    if color == 'white':  # the a1 square is the first of the last row of the table
+        return [PIECE_VALUES[name] + table[(7 - index // 8) * 8 + index % 8] for index in range(64)]
+    return [-(PIECE_VALUES[name] + table[index]) for index in range(64)]  # the table seen from the other side
+
+
+# key: FEN letter of a piece(e.g. 'N', 'p'), value: the score of that piece on each square(a1 to h8)
+SQUARE_SCORES = {create_piece(name, color).symbol: square_scores(name, color)
+                 for name in PIECE_CLASSES for color in ('white', 'black')}
+
+
+def evaluate(position) -> int:
+    """Returns the score of `position` in centipawns for white(the sum of the scores of the pieces)"""
+    return sum(SQUARE_SCORES[piece.symbol][square_index(piece.current_square)]
+               for piece in position.pieces.values())
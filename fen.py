@@ -0,0 +1,159 @@
+"""Reads and writes positions in Forsyth-Edwards Notation(FEN), e.g. the starting position:
+
+    rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1
+"""
+import re
+
+from game import Game, BLACK_TO_MOVE_KEY
+
+STARTING_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+# key: FEN letter(lower case), value: name of the piece
+PIECE_NAMES = {'k': 'king', 'q': 'queen', 'r': 'rook', 'b': 'bishop', 'n': 'knight', 'p': 'pawn'}
+
+
+def game_from_fen(fen: str, game_class=Game):
+    """Returns a game(made by `game_class`) in the position `fen`. Raises ValueError if `fen` is not valid.
+
+    The pieces have no move history, so it is made up from the FEN fields:
+        - a pawn off its starting rank has moved
+        - a King or a Rook has not moved if a castling right needs it
+        - the pawn that can be taken en passant has moved once and was the last move
+    """
+    fields = fen.split()
+    if len(fields) < 4:
+        raise ValueError(f'not a FEN: {fen!r}')
+    placement, turn, castling, enpassant = fields[:4]
+    halfmove_clock = fields[4] if len(fields) > 4 else '0'
+
+    ranks = placement.split('/')
+    if len(ranks) != 8 or turn not in ('w', 'b') or not halfmove_clock.isdigit():
+        raise ValueError(f'not a FEN: {fen!r}')
+
+    game = game_class(setup=False)
+    for row, rank_letters in enumerate(ranks):
+        rank = 8 - row
+        file_index = 0
+        for letter in rank_letters:
+            if letter.isdigit():
+                file_index += int(letter)
+                continue
+            if letter.lower() not in PIECE_NAMES or file_index > 7:
+                raise ValueError(f'bad rank {rank_letters!r} in FEN {fen!r}')
+
+            if letter.lower() == 'p' and rank in (1, 8):
+                raise ValueError(f'a pawn cannot stand on rank {rank}: {fen!r}')
+
+            color = 'white' if letter.isupper() else 'black'
+            square = f'{"abcdefgh"[file_index]}{rank}'
+            item = game.add_piece(PIECE_NAMES[letter.lower()], color, square)
+            game.pieces[item].move_count = initial_move_count(game.pieces[item], castling)
+            file_index += 1
+
+        if file_index != 8:
+            raise ValueError(f'bad rank {rank_letters!r} in FEN {fen!r}')
+
+    if game.material['K'] != 1 or game.material['k'] != 1:
+        raise ValueError(f'a FEN needs one King of each color: {fen!r}')
+
+    game.white_turn = turn == 'w'
+    if not game.white_turn:
+        game.position_hash ^= BLACK_TO_MOVE_KEY
+
+    if enpassant != '-':
+        # the square behind a pawn of the player who just moved: rank 6 when white is to move, rank 3 otherwise
+        if not re.fullmatch('[a-h]6' if game.white_turn else '[a-h]3', enpassant):
+            raise ValueError(f'bad en passant square {enpassant!r} in FEN {fen!r}')
+        # the pawn that moved two squares is in front of the en passant square
+        pawn_square = f'{enpassant[0]}{4 if enpassant[1] == "3" else 5}'
+        item = game.get_piece_on_square(pawn_square)
+        pawn = game.pieces[item] if item else None
+        if pawn is None or pawn.name != 'pawn' or (pawn.color == 'white') == game.white_turn:
+            raise ValueError(f'no pawn can be taken en passant on {enpassant}: {fen!r}')
+        pawn.move_count = 1
+        if pawn.color == 'white':
+            game.white_moves.append(pawn_square)
+        else:
+            game.black_moves.append(pawn_square)
+        game.hash_enpassant(pawn_square)
+
+    game.halfmove_clock = int(halfmove_clock)
+    game.repetitions = {game.position_hash: 1}
+    return game
+
+
+def initial_move_count(piece, castling: str) -> int:
+    """Returns 0 if the piece of a position read from a FEN is treated as not moved yet, else 1"""
+    square = piece.current_square
+    if piece.name == 'pawn':
+        return 0 if square in piece.starting_squares else 1
+
+    if piece.name in ('king', 'rook'):
+        rights = castling if castling != '-' else ''
+        if piece.color == 'white':
+            short_right, long_right, rank = 'K' in rights, 'Q' in rights, '1'
+        else:
+            short_right, long_right, rank = 'k' in rights, 'q' in rights, '8'
+
+        if piece.name == 'king':
+            return 0 if square == f'e{rank}' and (short_right or long_right) else 1
+        if (square == f'h{rank}' and short_right) or (square == f'a{rank}' and long_right):
+            return 0
+        return 1
+
+    return 0
+
+
+def game_to_fen(game) -> str:
+    """Returns the FEN of the position of `game`.
+
+    The move number is counted from the moves the game knows(a game read from a FEN starts again from 1).
+    """
+    rows = []
+    for rank in range(8, 0, -1):
+        row = ''
+        empty = 0
+        for file in 'abcdefgh':
+            item = game.get_piece_on_square(f'{file}{rank}')
+            if item:
+                row += (str(empty) if empty else '') + game.pieces[item].symbol
+                empty = 0
+            else:
+                empty += 1
+        rows.append(row + (str(empty) if empty else ''))
+
+    return ' '.join(['/'.join(rows), 'w' if game.white_turn else 'b', castling_rights(game) or '-',
+                     enpassant_square(game), str(game.halfmove_clock), str(len(game.black_moves) + 1)])
+
+
+def castling_rights(game) -> str:
+    """Returns the castling rights of the FEN(e.g. 'KQkq', 'Kq'), '' if neither player can castle any more"""
+    castling = ''
+    for color, rank, letters in (('white', '1', 'KQ'), ('black', '8', 'kq')):
+        king = game.get_piece_on_square(f'e{rank}')
+        if not king or game.pieces[king].name != 'king' or game.pieces[king].color != color \
+                or game.pieces[king].has_moved:
+            continue
+        for file, letter in (('h', letters[0]), ('a', letters[1])):
+            rook = game.get_piece_on_square(f'{file}{rank}')
+            if rook and game.pieces[rook].name == 'rook' and game.pieces[rook].color == color \
+                    and not game.pieces[rook].has_moved:
+                castling += letter
+    return castling
+
+
+def enpassant_square(game) -> str:
+    """Returns the square behind a pawn that just moved two squares(e.g. 'e3' after e2e4) or '-'"""
+    moves = game.black_moves if game.white_turn else game.white_moves
+    if not moves or len(moves[-1]) != 2:  # the last move was not a pawn move
+        return '-'
+
+    square = moves[-1]
+    item = game.get_piece_on_square(square)
+    if not item:
+        return '-'
+
+    piece = game.pieces[item]
+    if piece.name != 'pawn' or piece.move_count != 1 or square[1] not in '45':
+        return '-'
+    return f'{square[0]}{3 if square[1] == "4" else 6}'
@@ -0,0 +1,504 @@
+import copy
+import random
+
+from instrumentation import get_logger
+from pieces import PIECE_CLASSES, create_piece
+from position import Position, square_index
+
+logger = get_logger('game')
+
+PROMOTION_PIECES = ('queen', 'rook', 'bishop', 'knight')
+
+FIFTY_MOVES = 100  # halfmoves without a capture or a pawn move that draw the game
+
+# random numbers hashing the positions(Zobrist hashing): a number per piece per square, one for black to move and
+# one per file of a pawn that can be taken en passant
+_keys = random.Random(2024)
+PIECE_SQUARE_KEYS = {symbol: [_keys.getrandbits(64) for _ in range(64)] for symbol in 'KQRBNPkqrbnp'}
+BLACK_TO_MOVE_KEY = _keys.getrandbits(64)
+ENPASSANT_KEYS = [_keys.getrandbits(64) for _ in range(8)]
+
+# key: letter of the promotion piece in a UCI move(e.g. e7e8q), value: name of the piece
+PROMOTION_LETTERS = {'q': 'queen', 'r': 'rook', 'b': 'bishop', 'n': 'knight'}
+
+
+def parse_uci_move(move: str):
+    """Returns (from_square, to_square, promotion) of a move in UCI notation(e.g. 'e2e4', 'e7e8q').
+
+    promotion is None if the move has no promotion letter. Returns None if `move` is not a UCI move.
+    """
+    if len(move) not in (4, 5):
+        return None
+
+    from_square, to_square = move[:2], move[2:4]
+    for square in (from_square, to_square):
+        if square[0] not in 'abcdefgh' or square[1] not in '12345678':
+            return None
+
+    if len(move) == 4:
+        return from_square, to_square, None
+    if move[4] not in PROMOTION_LETTERS:
+        return None
+    return from_square, to_square, PROMOTION_LETTERS[move[4]]
+
+
+def promotion_letter(piece_name: str) -> str:
+    """Returns the letter of a promotion piece in UCI notation(e.g. 'knight' -> 'n')"""
+    return next(letter for letter, name in PROMOTION_LETTERS.items() if name == piece_name)
+
+
+def uci_move(from_square: str, to_square: str, promotion: str = None) -> str:
+    """Returns the move in UCI notation(e.g. ('e7', 'e8', 'queen') -> 'e7e8q')"""
+    if promotion:
+        return f'{from_square}{to_square}{promotion_letter(promotion)}'
+    return f'{from_square}{to_square}'
+
+
+class Game(Position):
+    """A game of chess without a GUI: the pieces, whose turn it is and the result of the game.
+
+    The game ends in a draw by repetition(the same position for the third time), by the fifty-move rule or by
+    insufficient material. Those are found without going through the board: the hash of the position, the
+    halfmove clock and the number of pieces of each type are updated by every change of the board.
+
+    The pieces are identified by an item id given by `create_piece_item`. A front-end(e.g. ChessBoard) overrides
+    the `*_item` methods to draw the pieces, `promotion_pawn` to ask for the promotion piece and `game_over` to
+    show the result. Without a front-end a game only holds plain Python objects, so one process can host
+    thousands of them.
+    """
+
+    def __init__(self, setup: bool = True):
+        """If `setup` is False, the pieces are placed later with `place_pieces`(e.g. once the board is drawn)"""
+        Position.__init__(self)
+
+        self.next_item = 1  # id of the next piece created by `create_piece_item`
+
+        self.checkmate = False
+        self.game_state = None  # 'checkmate', 'stalemate' or the reason of a draw once the game is over
+        self.won = None
+        self.promotion_square = None  # square of the pawn waiting for the promotion choice(see `promote`)
+
+        self.position_hash = 0  # Zobrist hash of the pieces, the player to move and the en passant capture
+        self.enpassant_key = 0  # key of ENPASSANT_KEYS in position_hash, 0 if no pawn can be taken en passant
+        self.repetitions = {}  # key: hash of a position since the last irreversible move, value: times it was seen
+        self.halfmove_clock = 0  # halfmoves since the last capture or pawn move
+        self.material = dict.fromkeys('KQRBNPkqrbnp', 0)  # key: FEN letter of a piece type, value: pieces on the board
+
+        self.journal = None  # GameJournal the moves are written to(see `journal`), None to keep no journal
+        self.replaying = False  # True while the moves of a journal are replayed, the game is judged at the end
+
+        if setup:
+            self.place_pieces()
+
+    def copy(self, game_class=None):
+        """Returns a headless copy of the game(e.g. to look at moves without touching the board, the journal or the
+        spectators), made by `game_class`(Game if not given).
+
+        Only the last move of each player is copied, the rules do not need the older ones.
+        """
+        game = (game_class or Game)(setup=False)
+        game.square_items = list(self.square_items)
+        game.white_moves = self.white_moves[-1:]
+        game.black_moves = self.black_moves[-1:]
+        game.white_turn = self.white_turn
+
+        for item, piece in self.pieces.items():
+            piece_copy = copy.copy(piece)
+            game.pieces[item] = piece_copy
+            if piece.color == 'white':
+                game.current_white_pieces[item] = piece_copy
+            else:
+                game.current_black_pieces[item] = piece_copy
+        game.next_item = max(self.pieces, default=0) + 1
+
+        game.checkmate = self.checkmate
+        game.game_state = self.game_state
+        game.won = self.won
+        game.promotion_square = self.promotion_square
+
+        game.position_hash = self.position_hash
+        game.enpassant_key = self.enpassant_key
+        game.repetitions = dict(self.repetitions)
+        game.halfmove_clock = self.halfmove_clock
+        game.material = dict(self.material)
+
+        return game
+
+    def create_piece_item(self, piece, square_name: str) -> int:
+        """Returns the id of a new piece put on `square_name`(a front-end draws the piece and returns its own id)"""
+        item = self.next_item
+        self.next_item += 1
+        return item
+
+    def move_piece_item(self, item: int, square_name: str):
+        """Called when the piece `item` moved to `square_name`"""
+
+    def delete_piece_item(self, item: int):
+        """Called when the piece `item` left the board(captured, promoted or a new game started)"""
+
+    def promotion_pawn(self, color: str, square: str):
+        """Called when a pawn reached the last rank without a promotion piece, the game waits for `promote`"""
+
+    def game_over(self, state: str, color: str):
+        """Called when the game ends. `color` is the winner or, if nobody won, the player who cannot move"""
+
+    def add_piece(self, name: str, color: str, square_name: str) -> int:
+        """Puts a new piece on `square_name` and returns its item id"""
+        piece = create_piece(name, color)
+        piece.current_square = square_name
+
+        item = self.create_piece_item(piece, square_name)
+        index = square_index(square_name)
+        self.square_items[index] = item
+        self.position_hash ^= PIECE_SQUARE_KEYS[piece.symbol][index]
+        self.material[piece.symbol] += 1
+        self.pieces[item] = piece
+        if color == 'white':
+            self.current_white_pieces[item] = piece
+        else:
+            self.current_black_pieces[item] = piece
+
+        return item
+
+    def remove_piece(self, item: int):
+        """Takes the piece `item` off the board(e.g. when it is captured).
+
+        The piece is deleted from the pieces attribute and from the current pieces of its color and the square
+        it was on is emptied.
+        """
+        piece = self.pieces.pop(item)
+        index = square_index(piece.current_square)
+        if self.square_items[index] == item:
+            self.square_items[index] = None
+        self.position_hash ^= PIECE_SQUARE_KEYS[piece.symbol][index]
+        self.material[piece.symbol] -= 1
+
+        if piece.color == 'white':
+            del self.current_white_pieces[item]
+        else:
+            del self.current_black_pieces[item]
+
+        self.delete_piece_item(item)
+
+    def move_piece(self, item: int, square_name: str):
+        """Moves the piece `item` to `square_name`, updates its current square and counts the move"""
+        piece = self.pieces[item]
+
+        keys = PIECE_SQUARE_KEYS[piece.symbol]
+        old_square = piece.current_square
+        if old_square and self.get_piece_on_square(old_square) == item:
+            self.square_items[square_index(old_square)] = None
+        self.square_items[square_index(square_name)] = item
+        self.position_hash ^= keys[square_index(old_square)] ^ keys[square_index(square_name)]
+
+        piece.current_square = square_name
+        piece.move_count += 1  # castling rights and en passant depend on it
+
+        self.move_piece_item(item, square_name)
+
+    def place_pieces(self):
+        """Puts the chess pieces in their original starting squares"""
+        for color in ('black', 'white'):
+            for name, piece_class in PIECE_CLASSES.items():
+                for square in piece_class.STARTING_SQUARES[color]:
+                    self.add_piece(name, color, square)
+
+        self.repetitions = {self.position_hash: 1}
+
+    def new_game(self):
+        """Starts a new game with pieces in their original squares"""
+        if self.journal is not None:
+            self.journal.restart()
+
+        for item in self.pieces:
+            self.delete_piece_item(item)
+
+        self.pieces = {}
+        self.current_black_pieces = {}
+        self.current_white_pieces = {}
+        self.square_items = [None] * 64
+
+        self.white_turn = True
+        self.white_moves = []
+        self.black_moves = []
+        self.checkmate = False
+        self.game_state = None
+        self.won = None
+        self.promotion_square = None
+
+        self.position_hash = 0
+        self.enpassant_key = 0
+        self.halfmove_clock = 0
+        self.material = dict.fromkeys(self.material, 0)
+
+        self.place_pieces()
+
+    def legal_moves(self) -> list:
+        """Returns the (from_square, to_square) moves the player to move can play(none once the game is over)"""
+        if self.game_state or self.promotion_square:
+            return []
+
+        pieces = self.current_white_pieces if self.white_turn else self.current_black_pieces
+        return [(piece.current_square, square) for piece in list(pieces.values())
+                for square in self.generate_correct_piece_moves(piece)]
+
+    def play_move(self, from_square: str, to_square: str, promotion: str = None) -> bool:
+        """Plays the move from_square -> to_square.
+
+        `promotion` is the piece a pawn reaching the last rank becomes(e.g. 'queen'). Without it the game waits
+        for the choice(see `promote`).
+        Returns False if the game is over, a promotion is waiting, there is no piece of the player to move on
+        from_square or the move is not valid.
+        """
+        if self.game_state or self.promotion_square:
+            return False
+
+        item = self.get_piece_on_square(from_square)
+        if not item:
+            return False
+
+        piece = self.pieces[item]
+        if (piece.color == 'white') != self.white_turn:
+            return False
+
+        if to_square not in self.generate_correct_piece_moves(piece):
+            return False
+
+        if promotion is not None and promotion not in PROMOTION_PIECES:
+            return False
+
+        self.make_move(item, piece, to_square, promotion)
+        return True
+
+    def make_move(self, item: int, piece, square_name: str, promotion: str = None) -> bool:
+        """Moves the piece `item` to square_name. The move must be valid(see `play_move`).
+
+        If there is a piece on square_name, it is captured.
+        If the piece == pawn:
+            check whether en-passant was played and whether the pawn is promoted
+        If the piece == king:
+            If the king has not moved and castles is possible, play it
+        Gives the move to the other player and checks whether the game is over.
+
+        Returns True if a piece was captured.
+        """
+        from_square = piece.current_square
+        if self.white_turn:
+            turn = 'white'
+            opponent = 'black'
+            self.white_moves.append(f'{piece.annotation}{square_name}')
+        else:
+            turn = 'black'
+            opponent = 'white'
+            self.black_moves.append(f'{piece.annotation}{square_name}')
+
+        # the position before a capture, a pawn move or the first move of a king or a rook(castling rights are
+        # lost) can never come back
+        irreversible = piece.name == 'pawn' or (piece.name in ('king', 'rook') and not piece.has_moved)
+
+        # capture the piece on square_name
+        current_item = self.get_piece_on_square(square_name)
+        captured = bool(current_item)
+        if current_item:
+            self.remove_piece(current_item)
+
+        promoted = False
+        if piece.name == 'pawn':
+            enpassant_square = self.get_enpassant_square_capture(piece, square_name)
+            # if an enpassant move was played, remove the pawn that was captured
+            if enpassant_square:
+                logger.debug('en-passant capture on %s', enpassant_square)
+                self.remove_piece(self.get_piece_on_square(enpassant_square))
+                captured = True
+
+            promoted = square_name[1] == ('8' if turn == 'white' else '1')
+
+        # check whether castles was played
+        castle_type = None
+        if piece.name == 'king' and not piece.has_moved:
+            king_rank = 1 if turn == 'white' else 8
+            if square_name == f'c{king_rank}':
+                castle_type = 'long_castle'
+            elif square_name == f'g{king_rank}':
+                castle_type = 'short_castle'
+
+        if castle_type:
+            self.castle(turn, castle_type)
+        else:
+            self.move_piece(item, square_name)
+            logger.debug('%s moved to %s(move %d)', piece.name, square_name, piece.move_count)
+
+        # give the move to the other player
+        self.white_turn = not self.white_turn
+        self.position_hash ^= BLACK_TO_MOVE_KEY ^ self.enpassant_key
+        self.enpassant_key = 0
+        if piece.name == 'pawn' and abs(int(square_name[1]) - int(from_square[1])) == 2:
+            self.hash_enpassant(square_name)
+
+        if captured or piece.name == 'pawn':
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+
+        if promoted:
+            if promotion:
+                self.replace_pawn(square_name, promotion)
+            else:
+                self.promotion_square = square_name
+                self.promotion_pawn(turn, square_name)
+
+        if captured or irreversible:
+            self.repetitions = {}
+        self.repetitions[self.position_hash] = self.repetitions.get(self.position_hash, 0) + 1
+
+        if self.journal is not None:
+            self.journal.record(uci_move(from_square, square_name, promotion if promoted else None))
+
+        # check if the opponent is checkmated, in stalemate or if the game is drawn
+        if not self.replaying:
+            self.judge(opponent)
+
+        return captured
+
+    def hash_enpassant(self, pawn_square: str):
+        """Adds the en passant key of the pawn that just moved two squares to `pawn_square` to the hash, if a pawn of
+        the player to move can take it(a right nobody can use leaves the position the same for the repetitions)"""
+        file_index, rank = 'abcdefgh'.index(pawn_square[0]), pawn_square[1]
+        behind = f'{pawn_square[0]}{3 if rank == "4" else 6}'
+        for neighbour in (file_index - 1, file_index + 1):  # the pawns next to it
+            if not 0 <= neighbour < 8:
+                continue
+            item = self.get_piece_on_square(f'{"abcdefgh"[neighbour]}{rank}')
+            piece = self.pieces[item] if item else None
+            if piece is not None and piece.name == 'pawn' and (piece.color == 'white') == self.white_turn \
+                    and behind in self.generate_correct_piece_moves(piece):
+                self.enpassant_key = ENPASSANT_KEYS[file_index]
+                self.position_hash ^= self.enpassant_key
+                return
+
+    def castle(self, color: str, castle_type: str):
+        """
+        Makes the move castle.
+
+        If long_castle:
+            - Move the king to c1(c8) and the a_rook to d1(d8)
+        Else short_castle:
+            - Move the king to g1(g8) and the h_rook to f1(f8)
+        """
+        rank = 1 if color == 'white' else 8
+
+        king_id = self.get_piece_on_square(f'e{rank}')
+        if castle_type == 'long_castle':
+            rook_id = self.get_piece_on_square(f'a{rank}')
+            self.move_piece(king_id, f'c{rank}')
+            self.move_piece(rook_id, f'd{rank}')
+        elif castle_type == 'short_castle':
+            rook_id = self.get_piece_on_square(f'h{rank}')
+            self.move_piece(king_id, f'g{rank}')
+            self.move_piece(rook_id, f'f{rank}')
+
+    def replace_pawn(self, square_name: str, piece_name: str):
+        """Replaces the pawn on square_name by a new `piece_name` piece of the same color"""
+        pawn_id = self.get_piece_on_square(square_name)
+        color = self.pieces[pawn_id].color
+
+        self.remove_piece(pawn_id)
+        self.add_piece(piece_name, color, square_name)
+
+    def promote(self, piece_name: str) -> bool:
+        """Promotes the pawn waiting on the last rank to `piece_name`(one of PROMOTION_PIECES).
+
+        Returns False if no pawn is waiting for a promotion or `piece_name` cannot be chosen.
+        """
+        square = self.promotion_square
+        if square is None or piece_name not in PROMOTION_PIECES:
+            return False
+
+        logger.debug('promotion to %s on %s', piece_name, square)
+        color = self.pieces[self.get_piece_on_square(square)].color
+        self.promotion_square = None
+        self.replace_pawn(square, piece_name)
+
+        self.repetitions = {self.position_hash: 1}
+
+        if self.journal is not None:
+            self.journal.record('=' + promotion_letter(piece_name))
+
+        # the promoted piece may have changed the state of the game
+        if not self.replaying:
+            self.judge('black' if color == 'white' else 'white')
+        return True
+
+    def has_insufficient_material(self) -> bool:
+        """Checks if neither player has the pieces to checkmate.
+
+        That is the case with only the Kings and at most one Knight or Bishop, or only Bishops that all stand on
+        squares of the same color.
+        """
+        material = self.material
+        if material['P'] or material['p'] or material['R'] or material['r'] or material['Q'] or material['q']:
+            return False
+
+        minor_pieces = material['N'] + material['n'] + material['B'] + material['b']
+        if minor_pieces <= 1:
+            return True
+        if material['N'] or material['n']:
+            return False
+
+        # only Bishops are left(a few pieces at most, so going through them is cheap)
+        square_colors = {(ord(piece.current_square[0]) + int(piece.current_square[1])) % 2
+                         for piece in self.pieces.values() if piece.name == 'bishop'}
+        return len(square_colors) == 1
+
+    def draw_state(self):
+        """Returns the reason the game is drawn('repetition', 'fifty-moves' or 'insufficient-material') or None.
+
+        A move giving checkmate wins even if it reaches a draw(e.g. on the 100th halfmove).
+        """
+        if self.repetitions.get(self.position_hash, 0) >= 3:
+            draw = 'repetition'
+        elif self.halfmove_clock >= FIFTY_MOVES:
+            draw = 'fifty-moves'
+        elif self.has_insufficient_material():  # nobody can give checkmate
+            return 'insufficient-material'
+        else:
+            return None
+        return None if self.is_checkmate('white' if self.white_turn else 'black') else draw
+
+    def judge(self, color: str):
+        """Checks whether the game is over, `color` being the player to move.
+
+        A draw is found straight away from the counters kept by the moves(the correct moves are only looked at to
+        rule out a checkmate), a checkmate or stalemate needs the correct moves of the `color` pieces(see
+        `request_verdict`).
+        """
+        draw = self.draw_state()
+        if draw:
+            self.apply_verdict(draw, color)
+        else:
+            self.request_verdict(color)
+
+    def request_verdict(self, color: str):
+        """Checks the state of the game for the `color` player(the player to move).
+
+        Runs straight away, a front-end may do it in the background instead(see `ChessBoard.request_verdict`).
+        """
+        self.apply_verdict(self.check_game_state(color), color)
+
+    def apply_verdict(self, state, color: str):
+        """Ends the game if `state` is not None('checkmate', 'stalemate' or a draw) for the `color` player"""
+        if state is None:
+            logger.debug('%s King is not yet checkmated', color)
+            return
+
+        logger.info('game over: %s for %s', state, color)
+        self.game_state = state
+        if self.journal is not None:
+            self.journal.finish(state)
+        if state == 'checkmate':
+            self.checkmate = True
+            self.won = 'white' if color == 'black' else 'black'
+            self.game_over(state, self.won)
+        else:
+            self.won = None
+            self.game_over(state, color)
@@ -0,0 +1,204 @@
+import atexit
+import bisect
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+# every logger of the game is below this one, e.g. chess.board, chess.rules
+ROOT_LOGGER = 'chess'
+
+logging.getLogger(ROOT_LOGGER).addHandler(logging.NullHandler())
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """Returns the logger of a part of the game(e.g. 'board', 'rules').
+
+    Nothing is written unless logging is switched on(see `configure_logging`). The messages use lazy
+    %-formatting, so when a level is disabled the call returns before any string is built.
+    Hot loops should check `logger.isEnabledFor(logging.DEBUG)` once and skip the calls altogether.
+    """
+    return logging.getLogger(f'{ROOT_LOGGER}.{subsystem}')
+
+
+def configure_logging(level=None):
+    """Switches on the logs of the game.
+
+    If `level` is not given, it is read from the CHESS_LOG_LEVEL environment variable(e.g. DEBUG, INFO).
+    Without either, the logs stay off and cost nothing.
+    The level of a single part of the game can be changed with e.g. CHESS_LOG_LEVEL=WARNING,rules=DEBUG
+    """
+    if level is None:
+        level = os.environ.get('CHESS_LOG_LEVEL')
+    if not level:
+        return
+
+    root = logging.getLogger(ROOT_LOGGER)
+    for setting in str(level).split(','):
+        if '=' in setting:
+            subsystem, subsystem_level = setting.split('=', 1)
+            get_logger(subsystem.strip()).setLevel(subsystem_level.strip().upper())
+        else:
+            root.setLevel(setting.strip().upper())
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s %(name)s %(levelname)s %(message)s'))
+    root.addHandler(handler)
+
+
+class LatencyHistogram:
+    """Counts durations in fixed buckets.
+
+    The upper bounds of the buckets double from 1 microsecond to about 8 seconds, so recording a duration
+    only costs a binary search and an increment and the memory used never grows.
+    """
+
+    BUCKET_BOUNDS_NS = [1000 * 2 ** i for i in range(24)]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKET_BOUNDS_NS) + 1)  # the last bucket holds anything slower
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, duration_ns: int):
+        self.counts[bisect.bisect_left(self.BUCKET_BOUNDS_NS, duration_ns)] += 1
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+    def percentile(self, percent: float) -> int:
+        """Returns the upper bound(in nanoseconds) of the bucket holding the `percent` percentile"""
+        if not self.count:
+            return 0
+
+        rank = percent / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                if index < len(self.BUCKET_BOUNDS_NS):
+                    return min(self.BUCKET_BOUNDS_NS[index], self.max_ns)
+                return self.max_ns
+
+        return self.max_ns
+
+    def as_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'mean_ns': self.total_ns // self.count if self.count else 0,
+            'p50_ns': self.percentile(50),
+            'p99_ns': self.percentile(99),
+            'max_ns': self.max_ns,
+            'buckets': {str(bound): count for bound, count in zip(self.BUCKET_BOUNDS_NS + ['inf'], self.counts)
+                        if count},
+        }
+
+
+class Profiler:
+    """Keeps a LatencyHistogram for every timed function(see `timed`).
+
+    It is switched off by default. When off, a timed function only pays for one extra call and one check, and a
+    hot method(see `timed`) pays nothing.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.histograms = {}  # key: name of the timed function, value: LatencyHistogram
+        self.lock = threading.Lock()  # the rules are also timed in the worker threads
+        self.hot_methods = []  # (class, attribute name, method, name of the timing) of the hot timed methods
+
+    def record(self, name: str, duration_ns: int):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(duration_ns)
+
+    def report(self) -> dict:
+        with self.lock:
+            return {name: histogram.as_dict() for name, histogram in sorted(self.histograms.items())}
+
+    def dump(self, path: str):
+        """Writes the report as JSON to `path`"""
+        with open(path, 'w') as file:
+            json.dump(self.report(), file, indent=2)
+
+    def enable(self, dump_path: str = None):
+        """Starts timing. If `dump_path` is given, the report is written there when the program exits"""
+        if not self.enabled:
+            for owner, attribute, method, label in self.hot_methods:
+                setattr(owner, attribute, timing_wrapper(method, label))
+        self.enabled = True
+        if dump_path:
+            atexit.register(self.dump, dump_path)
+
+
+profiler = Profiler()
+
+
+def timed(name: str = None, hot: bool = False):
+    """Decorator recording how long every call of the function takes in the profiler(see `Profiler`).
+
+    A `hot` method(e.g. a rule the search calls millions of times) stays the plain method while the profiler is off,
+    the timed one replaces it on its class when the profiler is switched on(see `Profiler.enable`).
+    """
+
+    def decorate(function):
+        label = name or function.__name__
+        if hot:
+            return HotMethod(function, label)
+        timed_function = timing_wrapper(function, label)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return function(*args, **kwargs)
+            return timed_function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def timing_wrapper(function, label: str):
+    """Returns `function` recording how long every call takes in the profiler"""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profiler.record(label, time.perf_counter_ns() - start)
+
+    return wrapper
+
+
+class HotMethod:
+    """A method timed with `timed(hot=True)`: it puts the plain method on its class once the class is created"""
+
+    def __init__(self, method, label: str):
+        self.method = method
+        self.label = label
+
+    def __set_name__(self, owner, attribute: str):
+        profiler.hot_methods.append((owner, attribute, self.method, self.label))
+        setattr(owner, attribute, timing_wrapper(self.method, self.label) if profiler.enabled else self.method)
+
+
+def configure_profiling(setting=None):
+    """Switches on the profiler.
+
+    If `setting` is not given, it is read from the CHESS_PROFILE environment variable.
+    '1' only switches the profiler on, any other value is used as the path of the JSON report written on exit.
+    """
+    if setting is None:
+        setting = os.environ.get('CHESS_PROFILE')
+    if not setting or setting == '0':
+        return
+
+    profiler.enable(None if setting == '1' else setting)
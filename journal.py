@@ -0,0 +1,288 @@
+"""Append-only journals of the games, so a game in progress survives a crash of the process.
+
+Each game has a small text file in the journal directory holding its moves in UCI notation, one per line:
+
+    e2e4
+    e7e8        a pawn that is waiting for the promotion choice
+    =q          the promotion choice
+    end mate    the game is over(the journal is kept but the game is not resumed)
+
+A new game with the same id starts the journal again from an empty file.
+Every line is handed to the OS straight away, so a crash of the process loses nothing. The fsync that makes the
+lines survive a crash of the machine is batched: the journals written since the last sync are synced together
+by the first write once `sync_interval_ms` has passed. A write alone leaves the last moves unsynced until the next
+one, so the program writing the journal also syncs it every `sync_interval_ms`(see `GameServer.sync_journal` and
+`ChessBoard.sync_journal`): a crash of the machine loses at most the moves of the last interval.
+
+    python journal.py [number_of_games] [moves_per_game]
+
+writes the journals of that many games in progress and measures how long it takes to resume all of them.
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from game import Game, PROMOTION_LETTERS, parse_uci_move
+from instrumentation import get_logger
+
+logger = get_logger('journal')
+
+SYNC_INTERVAL_MS = 50  # longest time a move stays in the OS cache before it is synced to the disk
+MAX_OPEN_FILES = 256  # journals kept open for writing, the least recently written ones are closed first
+END = 'end'
+
+
+class Journal:
+    """The journals of many games in one directory"""
+
+    def __init__(self, directory: str, sync_interval_ms: int = SYNC_INTERVAL_MS):
+        self.directory = directory
+        self.sync_interval = sync_interval_ms / 1000
+        os.makedirs(directory, exist_ok=True)
+
+        self.files = OrderedDict()  # key: game id, value: file open for appending, the last written at the end
+        self.dirty = set()  # ids of the games written since the last sync
+        self.last_sync = time.monotonic()
+
+    def path(self, game_id) -> str:
+        return os.path.join(self.directory, f'{game_id}.journal')
+
+    def open(self, game_id) -> 'GameJournal':
+        """Returns the journal of the game `game_id`(see `Game.journal`)"""
+        return GameJournal(self, game_id)
+
+    def write(self, game_id, line: str):
+        """Appends `line` to the journal of `game_id`"""
+        file = self.files.get(game_id)
+        if file is None:
+            if len(self.files) >= MAX_OPEN_FILES:
+                self.close_file(next(iter(self.files)))
+            file = self.files[game_id] = open(self.path(game_id), 'a')
+        else:
+            self.files.move_to_end(game_id)
+
+        file.write(line + '\n')
+        file.flush()
+        self.dirty.add(game_id)
+
+        if time.monotonic() - self.last_sync >= self.sync_interval:
+            self.sync()
+
+    def restart(self, game_id):
+        """Empties the journal of `game_id`(a new game started)"""
+        self.close_file(game_id)
+        open(self.path(game_id), 'w').close()
+        self.dirty.add(game_id)
+
+    def remove(self, game_id):
+        """Deletes the journal of `game_id`(the game will never be resumed)"""
+        self.close_file(game_id)
+        self.dirty.discard(game_id)
+        if os.path.exists(self.path(game_id)):
+            os.remove(self.path(game_id))
+
+    def close_file(self, game_id):
+        file = self.files.pop(game_id, None)
+        if file is not None:
+            if game_id in self.dirty:
+                os.fsync(file.fileno())
+                self.dirty.discard(game_id)
+            file.close()
+
+    def sync(self):
+        """Syncs every journal written since the last sync to the disk"""
+        for game_id in self.dirty:
+            file = self.files.get(game_id)
+            if file is not None:
+                os.fsync(file.fileno())
+            elif os.path.exists(self.path(game_id)):  # restarted or closed before it was synced
+                descriptor = os.open(self.path(game_id), os.O_RDONLY)
+                try:
+                    os.fsync(descriptor)
+                finally:
+                    os.close(descriptor)
+        self.dirty = set()
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        self.sync()
+        for game_id in list(self.files):
+            self.close_file(game_id)
+
+    def read(self, game_id) -> list:
+        """Returns the lines of the journal of `game_id`.
+
+        A line the crash cut in the middle is dropped, and cut from the file so the next move starts on a line
+        of its own.
+        """
+        path = self.path(game_id)
+        with open(path) as file:
+            data = file.read()
+
+        if data and not data.endswith('\n'):
+            logger.warning('journal of game %s ends with an incomplete line: %r', game_id, data[data.rfind('\n') + 1:])
+            data = data[:data.rfind('\n') + 1]
+            with open(path, 'r+') as file:
+                file.truncate(len(data.encode()))
+
+        return data.splitlines()
+
+    def games_in_progress(self) -> dict:
+        """Returns the journals of the games that are not over.
+
+        :return: dict where key: game id, value: the lines of its journal
+        """
+        games = {}
+        for file_name in os.listdir(self.directory):
+            game_id, extension = os.path.splitext(file_name)
+            if extension != '.journal':
+                continue
+
+            lines = self.read(game_id)
+            if not lines or not lines[-1].startswith(END):
+                games[int(game_id) if game_id.isdigit() else game_id] = lines
+
+        return games
+
+
+class GameJournal:
+    """The journal of one game, written by the game itself(see `Game.journal`)"""
+
+    def __init__(self, journal: Journal, game_id):
+        self.journal = journal
+        self.game_id = game_id
+
+    def record(self, line: str):
+        self.journal.write(self.game_id, line)
+
+    def restart(self):
+        self.journal.restart(self.game_id)
+
+    def finish(self, state: str):
+        self.journal.write(self.game_id, f'{END} {state}')
+
+    def sync(self):
+        self.journal.sync()
+
+
+def replay_move(game, line: str) -> bool:
+    """Plays one move line of a journal. Returns False if it cannot be played.
+
+    The moves were checked when they were played the first time, so only the piece and the turn are checked
+    again(going through every correct move of the piece is what makes resuming slow).
+    """
+    move = parse_uci_move(line)
+    if move is None or game.promotion_square:
+        return False
+
+    from_square, to_square, promotion = move
+    item = game.get_piece_on_square(from_square)
+    if not item or (game.pieces[item].color == 'white') != game.white_turn:
+        return False
+
+    game.make_move(item, game.pieces[item], to_square, promotion)
+    return True
+
+
+def replay(game, lines: list) -> int:
+    """Plays the moves of a journal in `game`(a new game) and returns the number of lines replayed.
+
+    The game is only judged(checkmate or stalemate) once, after the last move. Replaying stops at the first line
+    that cannot be played.
+    """
+    journal, game.journal = game.journal, None  # the journal already holds these moves
+    game.replaying = True
+    replayed = 0
+    try:
+        for line in lines:
+            if line.startswith(END):
+                break
+
+            if line.startswith('='):
+                played = game.promote(PROMOTION_LETTERS.get(line[1:]))
+            else:
+                played = replay_move(game, line)
+
+            if not played:
+                logger.warning('cannot replay %r, the game is resumed before it', line)
+                break
+            replayed += 1
+    finally:
+        game.replaying = False
+        game.journal = journal
+
+    if replayed and not game.promotion_square:
+        game.judge('white' if game.white_turn else 'black')
+    return replayed
+
+
+def resume_games(journal: Journal, create_game=Game) -> dict:
+    """Rebuilds every game in progress from its journal and attaches the journal to it.
+
+    :return: dict where key: game id, value: the game made by `create_game` with the moves of the journal
+    """
+    games = {}
+    for game_id, lines in journal.games_in_progress().items():
+        game = create_game()
+        replayed = replay(game, lines)
+        game.journal = journal.open(game_id)
+        games[game_id] = game
+
+        if replayed < len(lines):  # keep only the moves the game was resumed with
+            journal.restart(game_id)
+            for line in lines[:replayed]:
+                journal.write(game_id, line)
+
+    return games
+
+
+def random_game(seed: int, moves: int) -> list:
+    """Returns the journal lines of a game of `moves` random moves"""
+    lines = []
+    game = Game()
+    game.journal = SimpleNamespace(record=lines.append, restart=lines.clear,
+                                   finish=lambda state: lines.append(f'{END} {state}'))
+    generator = random.Random(seed)
+    for _ in range(moves):
+        legal = game.legal_moves()
+        if not legal:
+            break
+        game.play_move(*generator.choice(legal), promotion='queen')
+
+    return lines
+
+
+def benchmark(games: int = 1000, moves: int = 40, different_games: int = 20):
+    """Writes the journals of `games` games(made of `different_games` random games), then resumes them all"""
+    samples = [random_game(seed, moves) for seed in range(different_games)]
+
+    directory = tempfile.mkdtemp()
+    try:
+        journal = Journal(directory)
+        start = time.perf_counter()
+        for game_id in range(games):
+            for line in samples[game_id % different_games]:
+                journal.write(game_id, line)
+        journal.close()
+        written = time.perf_counter() - start
+
+        start = time.perf_counter()
+        resumed = resume_games(Journal(directory))
+        duration = time.perf_counter() - start
+
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        print(f'wrote {games} journals({size} bytes) in {written:.2f} s')
+        print(f'resumed {len(resumed)} games in progress in {duration:.2f} s'
+              f'({duration / max(1, len(resumed)) * 1000:.2f} ms per game)')
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    arguments = [int(argument) for argument in sys.argv[1:3]]
+    benchmark(*arguments)
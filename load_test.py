@@ -0,0 +1,104 @@
+"""Load test of the game server(see `server`): plays many games at the same time and measures the move latency.
+
+    python load_test.py [--games N] [--moves M] [--port PORT | --unix PATH]
+
+Every game has its own connection and plays random legal moves until the game is over or M moves were played.
+The time from sending a MOVE until its reply arrives is recorded and the percentiles are printed at the end.
+Without --port or --unix, a server is started in another process on a temporary Unix socket.
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from instrumentation import LatencyHistogram
+from server import DEFAULT_HOST
+
+
+async def play_game(open_connection, moves: int, histogram: LatencyHistogram, seed: int) -> int:
+    """Plays one game of random moves and returns the number of moves played"""
+    reader, writer = await open_connection()
+    generator = random.Random(seed)
+
+    async def send(line: str) -> list:
+        writer.write(line.encode() + b'\n')
+        await writer.drain()
+        reply = (await reader.readline()).decode().split()
+        if not reply or reply[0] != 'OK':
+            raise RuntimeError(f'{line}: {" ".join(reply)}')
+        return reply[1:]
+
+    game_id = (await send('NEW'))[0]
+    played = 0
+    while played < moves:
+        legal = await send(f'LEGAL {game_id}')
+        if not legal:
+            break
+
+        start = time.perf_counter_ns()
+        state = await send(f'MOVE {game_id} {generator.choice(legal)}')
+        histogram.record(time.perf_counter_ns() - start)
+        played += 1
+
+        if state[0] != 'playing':
+            break
+
+    await send(f'CLOSE {game_id}')
+    writer.close()
+    return played
+
+
+async def run(open_connection, games: int, moves: int):
+    histogram = LatencyHistogram()
+
+    start = time.perf_counter()
+    played = await asyncio.gather(*(play_game(open_connection, moves, histogram, seed) for seed in range(games)))
+    duration = time.perf_counter() - start
+
+    print(f'{games} games, {sum(played)} moves in {duration:.2f} s({sum(played) / duration:.0f} moves/s)')
+    print('move round trip: ' + ', '.join(f'p{percent} {histogram.percentile(percent) / 1e6:.2f} ms'
+                                          for percent in (50, 90, 99)) + f', max {histogram.max_ns / 1e6:.2f} ms')
+
+
+def start_server(path: str) -> subprocess.Popen:
+    """Starts server.py on the Unix socket `path` and waits until it listens"""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    process = subprocess.Popen([sys.executable, os.path.join(directory, 'server.py'), '--unix', path])
+    for _ in range(100):
+        if os.path.exists(path):
+            return process
+        time.sleep(0.05)
+
+    process.kill()
+    raise RuntimeError('the server did not start')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Plays many games against the game server at the same time')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--moves', type=int, default=40)
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--unix', help='path of the Unix socket of the server')
+    arguments = parser.parse_args()
+
+    server_process = None
+    if arguments.port:
+        connect = lambda: asyncio.open_connection(arguments.host, arguments.port)
+    else:
+        socket_path = arguments.unix
+        if not socket_path:
+            socket_path = os.path.join(tempfile.mkdtemp(), 'chess.sock')
+            server_process = start_server(socket_path)
+        connect = lambda: asyncio.open_unix_connection(socket_path)
+
+    try:
+        asyncio.run(run(connect, arguments.games, arguments.moves))
+    finally:
+        if server_process:
+            server_process.terminate()
+            server_process.wait()
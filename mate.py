@@ -0,0 +1,158 @@
+"""Solves mate-in-N puzzles and checks that the solution is unique.
+
+    python mate.py PUZZLES.epd [--moves N] [--workers N] [--slowest K]
+
+A puzzle is an EPD line(see `epd.parse_epd`) whose `dm` opcode is the number of moves to the checkmate(--moves
+when it has none), and whose `bm` opcode, if any, is the key move the puzzle expects. A puzzle is correct if the
+player to move checkmates in N moves but not sooner, with exactly one first move(the key move).
+
+The search(`MateSearch`) tries every move of the attacker, the checks first, against every reply of the
+defender, the promotions to each of the four pieces included. Proofs(the attacker mates within n moves) and
+disproofs(the attacker does not) are cached by the Zobrist hash of the position(see `Game.position_hash`): a
+position proven within n moves is proven for more moves and one disproven for n moves is disproven for fewer. The
+puzzles are spread over a process pool and the solve time of each puzzle and the slowest ones are printed.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from epd import parse_epd
+from fen import game_from_fen
+from game import uci_move
+from instrumentation import get_logger
+from pgn import parse_san, san_move
+from search import Search, SearchNode
+
+logger = get_logger('mate')
+
+MOVES = 2  # moves to the checkmate of a puzzle without a `dm` opcode
+SLOWEST = 5  # puzzles listed as the slowest
+
+
+class MateSearch:
+    """Finds the moves of the player to move in `game` that checkmate within a number of moves"""
+
+    def __init__(self, game):
+        self.root = game.copy(SearchNode)
+        self.proven = {}  # key: Zobrist hash, value: fewest moves the attacker to move was proven to mate in
+        self.disproven = {}  # key: Zobrist hash, value: most moves the attacker to move was proven not to mate in
+        self.nodes = 0
+
+    def key_moves(self, moves: int) -> list:
+        """Returns every (from_square, to_square, promotion) first move that checkmates within `moves` moves"""
+        return [move for move, child in self.attacker_moves(self.root, moves == 1)
+                if self.defender_lost(child, moves)]
+
+    def attacker_mates(self, node, moves: int) -> bool:
+        """Checks whether the player to move in `node` checkmates within `moves` moves"""
+        key = node.position_hash
+        if self.proven.get(key, moves + 1) <= moves:
+            return True
+        if self.disproven.get(key, 0) >= moves:
+            return False
+
+        mates = any(self.defender_lost(child, moves) for _, child in self.attacker_moves(node, moves == 1))
+        if mates:
+            self.proven[key] = min(moves, self.proven.get(key, moves))
+        else:
+            self.disproven[key] = max(moves, self.disproven.get(key, 0))
+        return mates
+
+    def defender_lost(self, node, moves: int) -> bool:
+        """Checks whether every reply of the player to move in `node` is checkmated within `moves` moves of the
+        attacker, this one included(the attacker just moved)"""
+        color = 'white' if node.white_turn else 'black'
+        if moves == 1:  # the move just played must have been checkmate
+            return node.is_checkmate(color) is True
+        if node.draw_state():
+            return False
+
+        replies = Search.ordered_moves(node, all_promotions=True)
+        if not replies:
+            return node.is_check(color)  # checkmated already, or stalemate
+        return all(self.attacker_mates(Search.play(node, reply), moves - 1) for reply in replies)
+
+    def attacker_moves(self, node, checks_only: bool = False) -> list:
+        """Returns (move, position after it) of the moves of `node`, the checks first(only them if `checks_only`,
+        e.g. for the last move: a checkmate is a check)"""
+        opponent = 'black' if node.white_turn else 'white'
+        checks, others = [], []
+        for move in Search.ordered_moves(node, all_promotions=True):
+            self.nodes += 1
+            child = Search.play(node, move)
+            if child.is_check(opponent):
+                checks.append((move, child))
+            elif not checks_only:
+                others.append((move, child))
+        return checks + others
+
+
+def solve_puzzle(puzzle: dict, default_moves: int = MOVES) -> dict:
+    """Solves one puzzle(in a worker process) and returns dict with its id, the moves to the checkmate asked for and
+    found(None if there is none within them), the key moves(SAN), the verdict, the nodes and the solve time"""
+    opcodes = puzzle['opcodes']
+    moves = int(opcodes.get('dm', [default_moves])[0])
+    result = {'id': ' '.join(opcodes.get('id', [])) or puzzle['fen'], 'moves': moves, 'found': None, 'keys': []}
+    start = time.perf_counter()
+    try:
+        game = game_from_fen(puzzle['fen'])
+        expected = [uci_move(*parse_san(game, move)) for move in opcodes.get('bm', [])]
+    except ValueError as error:
+        result.update(verdict=f'error: {error}', nodes=0, time_ms=0)
+        return result
+
+    search = MateSearch(game)
+    for found in range(1, moves + 1):
+        keys = search.key_moves(found)
+        if keys:
+            result['found'] = found
+            result['keys'] = [san_move(game, *move) for move in keys]
+            break
+    else:
+        keys = []
+
+    if not keys:
+        verdict = f'no mate in {moves}'
+    elif result['found'] < moves:
+        verdict = f'mate in {result["found"]} already'
+    elif len(keys) > 1:
+        verdict = 'several key moves'
+    elif expected and uci_move(*keys[0]) not in expected:
+        verdict = 'another key move'
+    else:
+        verdict = 'ok'
+    result.update(verdict=verdict, nodes=search.nodes, time_ms=(time.perf_counter() - start) * 1000)
+    logger.debug('%s: %s %s', result['id'], verdict, result['keys'])
+    return result
+
+
+def solve_puzzles(puzzles: list, default_moves: int = MOVES, workers: int = None) -> list:
+    """Returns the results of `solve_puzzle` for `puzzles`, in their order, solved in a process pool"""
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        return list(executor.map(solve_puzzle, puzzles, [default_moves] * len(puzzles)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Solves mate-in-N puzzles and checks their solution is unique')
+    parser.add_argument('puzzles', help='EPD file, one puzzle per line')
+    parser.add_argument('--moves', type=int, default=MOVES, help='moves to the checkmate of a puzzle without dm')
+    parser.add_argument('--workers', type=int, help='processes solving puzzles(the number of cores by default)')
+    parser.add_argument('--slowest', type=int, default=SLOWEST, help='slowest puzzles listed')
+    arguments = parser.parse_args()
+
+    with open(arguments.puzzles) as file:
+        puzzles = [parse_epd(line) for line in file if line.strip() and not line.startswith('#')]
+
+    start = time.perf_counter()
+    results = solve_puzzles(puzzles, arguments.moves, arguments.workers)
+    seconds = time.perf_counter() - start
+
+    for result in results:
+        print(f'{result["id"]}: {result["verdict"]} {" ".join(result["keys"])} '
+              f'({result["time_ms"]:.0f} ms, {result["nodes"]} nodes)')
+    correct = sum(result['verdict'] == 'ok' for result in results)
+    print(f'{correct}/{len(results)} puzzles correct in {seconds:.1f} s')
+    print('slowest:')
+    for result in sorted(results, key=lambda result: -result['time_ms'])[:arguments.slowest]:
+        print(f'  {result["id"]}: {result["time_ms"]:.0f} ms')
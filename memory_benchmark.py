@@ -0,0 +1,111 @@
+"""Measures the memory used by positions and games held in memory(e.g. analysis trees, games hosted by a server).
+
+    python memory_benchmark.py [number_of_positions] [moves_per_piece]
+
+Prints the bytes per position for the pieces as they are now(`__slots__` and per type data shared on the class)
+and for the layout they had before: a `__dict__` per piece holding the name, color, image, value, starting
+squares, annotation, current square and the list of every square the piece moved to.
+Then prints the bytes per headless `Game` after a few moves, the cost of hosting one more game in a process.
+"""
+import copy
+import sys
+import tracemalloc
+
+from game import Game
+from position import Position
+
+# the moves played in every game of the games benchmark
+OPENING = [('e2', 'e4'), ('e7', 'e5'), ('g1', 'f3'), ('b8', 'c6'), ('f1', 'c4'), ('g8', 'f6'), ('e1', 'g1')]
+
+
+class DictPiece:
+    """A piece with the attributes every piece had before it used `__slots__`"""
+
+    def __init__(self, piece):
+        self.name = piece.name
+        self.color = piece.color
+        self.image = None  # the PhotoImage of the piece
+        self.piece_value = piece.piece_value
+        self.starting_squares = piece.starting_squares
+        self.moves = []
+        self.current_square = piece.current_square
+        self.annotation = piece.annotation
+
+
+def starting_position(moves_per_piece: int = 0) -> Position:
+    """Returns a Position with the pieces on their starting squares, each counted as having moved `moves_per_piece`
+    times"""
+    position = Game().snapshot()
+    for piece in position.pieces.values():
+        piece.move_count = moves_per_piece
+
+    return position
+
+
+def new_game() -> Game:
+    """Returns a headless game after the OPENING moves"""
+    game = Game()
+    for from_square, to_square in OPENING:
+        game.play_move(from_square, to_square)
+
+    return game
+
+
+def dict_snapshot(position: Position) -> Position:
+    """Returns a copy of `position` like `Position.snapshot` made it when the pieces had a `__dict__`"""
+    copied = copy.copy(position)
+    copied.square_items = list(position.square_items)
+    copied.pieces, copied.current_white_pieces, copied.current_black_pieces = {}, {}, {}
+
+    for piece_id, piece in position.pieces.items():
+        piece_copy = copy.copy(piece)
+        piece_copy.moves = list(piece.moves)
+
+        copied.pieces[piece_id] = piece_copy
+        if piece.color == 'white':
+            copied.current_white_pieces[piece_id] = piece_copy
+        else:
+            copied.current_black_pieces[piece_id] = piece_copy
+
+    return copied
+
+
+def measure(make_copy, count: int) -> float:
+    """Returns the bytes allocated per position when `count` positions made by `make_copy` are kept in memory"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    positions = [make_copy() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del positions
+    return (after - before) / count
+
+
+def main(count: int = 10000, moves_per_piece: int = 3):
+    position = starting_position(moves_per_piece)
+
+    old_position = copy.copy(position)
+    old_position.pieces = {}
+    for piece_id, piece in position.pieces.items():
+        old_piece = DictPiece(piece)
+        old_piece.moves = [piece.current_square] * moves_per_piece
+        old_position.pieces[piece_id] = old_piece
+
+    before = measure(lambda: dict_snapshot(old_position), count)
+    after = measure(position.snapshot, count)
+
+    print(f'{count} positions, {moves_per_piece} moves per piece')
+    print(f'before(__dict__ and moves list): {before:>8.0f} bytes per position')
+    print(f'after(__slots__ and move count):  {after:>8.0f} bytes per position')
+    print(f'saved: {1 - after / before:.0%}')
+
+    games = count // 10
+    per_game = measure(new_game, games)
+    print(f'{games} games after {len(OPENING)} moves: {per_game:.0f} bytes per game'
+          f'({1024 ** 3 / per_game:.0f} games per GiB)')
+
+
+if __name__ == '__main__':
+    arguments = [int(argument) for argument in sys.argv[1:3]]
+    main(*arguments)
@@ -0,0 +1,198 @@
+"""Reads and writes games in Portable Game Notation(PGN), the moves in Standard Algebraic Notation(SAN, e.g. Nxe5+).
+
+    [Event "Match"]
+    [Site "?"]
+    [Date "2024.05.01"]
+    [Round "1"]
+    [White "depth=2"]
+    [Black "depth=1"]
+    [Result "1-0"]
+
+    1. e4 e5 2. Qh5 Nc6 3. Bc4 Nf6 4. Qxf7# 1-0
+"""
+import re
+
+from fen import STARTING_FEN
+from game import PROMOTION_PIECES
+
+# key: name of the piece, value: its letter in SAN(a pawn has none)
+SAN_LETTERS = {'king': 'K', 'queen': 'Q', 'rook': 'R', 'bishop': 'B', 'knight': 'N', 'pawn': ''}
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+# the tags every PGN game has, in this order before any other tag
+SEVEN_TAG_ROSTER = ('Event', 'Site', 'Date', 'Round', 'White', 'Black', 'Result')
+TAG = re.compile(r'\[(\w+)\s+"((?:[^"\\]|\\.)*)"\]')
+COMMENT = re.compile(r'\{[^}]*\}')
+NAG_OR_NUMBER = re.compile(r'\$\d+|\d+\.(\.\.)?')  # e.g. '$1', '12.', '12...'
+
+
+def san_move(game, from_square: str, to_square: str, promotion: str = None) -> str:
+    """Returns the SAN of a correct move of the player to move in `game`, without the check sign(see `play_san`)"""
+    piece = game.pieces[game.get_piece_on_square(from_square)]
+    if piece.name == 'king' and from_square[0] == 'e' and to_square[0] in 'cg' and not piece.has_moved:
+        return 'O-O' if to_square[0] == 'g' else 'O-O-O'
+
+    capture = bool(game.get_piece_on_square(to_square)) or (piece.name == 'pawn' and from_square[0] != to_square[0])
+    if piece.name == 'pawn':
+        san = f'{from_square[0]}x{to_square}' if capture else to_square
+        if promotion and to_square[1] in '18':
+            san += f'={SAN_LETTERS[promotion]}'
+        return san
+
+    # another piece of the same type reaching the same square needs the file or rank of the piece moved
+    pieces = game.current_white_pieces if piece.color == 'white' else game.current_black_pieces
+    rivals = [other.current_square for other in pieces.values() if other is not piece and other.name == piece.name
+              and to_square in game.generate_correct_piece_moves(other)]
+    if not rivals:
+        origin = ''
+    elif all(square[0] != from_square[0] for square in rivals):
+        origin = from_square[0]
+    elif all(square[1] != from_square[1] for square in rivals):
+        origin = from_square[1]
+    else:
+        origin = from_square
+
+    return f'{SAN_LETTERS[piece.name]}{origin}{"x" if capture else ""}{to_square}'
+
+
+def parse_san(game, san: str):
+    """Returns (from_square, to_square, promotion) of the SAN move `san` of the player to move in `game`.
+
+    The check sign and annotations(e.g. '+', '#', '!?') may follow the move. Raises ValueError if `san` is not a
+    correct move.
+    """
+    wanted = san.rstrip('+#!?').replace('0-0', 'O-O')
+    if wanted in ('O-O', 'O-O-O'):
+        rank = '1' if game.white_turn else '8'
+        to_square = ('g' if wanted == 'O-O' else 'c') + rank
+    else:
+        squares = re.findall('[a-h][1-8]', wanted)
+        if not squares:
+            raise ValueError(f'not a SAN move: {san!r}')
+        to_square = squares[-1]
+
+    # only the moves to the right square are written out
+    for from_square, move_square in game.legal_moves():
+        if move_square != to_square:
+            continue
+        piece = game.pieces[game.get_piece_on_square(from_square)]
+        promotions = PROMOTION_PIECES if piece.name == 'pawn' and to_square[1] in '18' else (None,)
+        for promotion in promotions:
+            if san_move(game, from_square, to_square, promotion) == wanted:
+                return from_square, to_square, promotion
+    raise ValueError(f'{san!r} is not a correct move')
+
+
+def play_san(game, from_square: str, to_square: str, promotion: str = None) -> str:
+    """Plays a correct move in `game` and returns its SAN with the check(+) or checkmate(#) sign.
+
+    The game must be judged straight away(e.g. a Game, not a ChessBoard judging in the background).
+    """
+    san = san_move(game, from_square, to_square, promotion)
+    game.play_move(from_square, to_square, promotion)
+
+    if game.game_state == 'checkmate':
+        return san + '#'
+    if game.is_check('white' if game.white_turn else 'black'):
+        return san + '+'
+    return san
+
+
+def game_pgn(headers: dict, moves: list, result: str, fen: str = STARTING_FEN) -> str:
+    """Returns the PGN of a game of the SAN `moves` played from `fen`.
+
+    :param headers: dict where key: tag name(e.g. 'White'), value: its value. The tags of SEVEN_TAG_ROSTER are
+        written first, the others in their order
+    :param result: '1-0', '0-1', '1/2-1/2' or '*'
+    """
+    tags = {name: headers[name] for name in SEVEN_TAG_ROSTER if name in headers}
+    tags['Result'] = result
+    tags.update((name, value) for name, value in headers.items() if name != 'Result')
+    if fen != STARTING_FEN:
+        tags.update(SetUp='1', FEN=fen)
+    lines = []
+    for name, value in tags.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"')  # escaped by a backslash
+        lines.append(f'[{name} "{value}"]')
+
+    black_first = fen.split()[1] == 'b'
+    number = int(fen.split()[5]) if len(fen.split()) > 5 else 1
+    words = []
+    for index, move in enumerate(moves):
+        white_to_move = (index % 2 == 0) != black_first
+        if white_to_move:
+            words.append(f'{number}.')
+        elif index == 0:
+            words.append(f'{number}...')
+        words.append(move)
+        if not white_to_move:
+            number += 1
+    words.append(result)
+
+    # the movetext is wrapped at 80 characters
+    movetext = []
+    line = ''
+    for word in words:
+        if line and len(line) + 1 + len(word) > 80:
+            movetext.append(line)
+            line = word
+        else:
+            line = f'{line} {word}' if line else word
+    movetext.append(line)
+
+    return '\n'.join(lines) + '\n\n' + '\n'.join(movetext) + '\n'
+
+
+def read_games(lines):
+    """Yields (headers, SAN moves, result) of each game of the PGN `lines`(e.g. an open file), one game at a time.
+
+    The comments, the variations and the NAGs are skipped. headers is a dict where key: tag name, value: its value.
+    """
+    headers, movetext = {}, []
+    for line in lines:
+        stripped = line.strip()
+        tag = TAG.fullmatch(stripped)
+        if tag and movetext:  # the tags of the next game
+            yield parse_movetext(headers, ' '.join(movetext))
+            headers, movetext = {}, []
+        if tag:
+            headers[tag.group(1)] = re.sub(r'\\(.)', r'\1', tag.group(2))  # the escaping backslashes go
+        elif stripped and not stripped.startswith('%'):
+            movetext.append(stripped.split(';')[0])  # a comment runs from ';' to the end of the line
+    if headers or movetext:
+        yield parse_movetext(headers, ' '.join(movetext))
+
+
+def parse_movetext(headers: dict, movetext: str):
+    """Returns (headers, SAN moves, result) of a game from its movetext"""
+    # the comments go first, they may hold parentheses
+    words = NAG_OR_NUMBER.sub(' ', strip_variations(COMMENT.sub(' ', movetext))).split()
+    result = headers.get('Result', '*')
+    if words and words[-1] in RESULTS:
+        result = words.pop()
+    return headers, words, result
+
+
+def strip_variations(movetext: str) -> str:
+    """Returns `movetext` without the variations(the moves in parentheses, which may be nested)"""
+    kept = []
+    depth = 0
+    for character in movetext:
+        if character == '(':
+            depth += 1
+        elif character == ')':
+            depth = max(0, depth - 1)
+        elif not depth:
+            kept.append(character)
+    return ''.join(kept)
+
+
+def result_of(game) -> str:
+    """Returns the PGN result of a game that is over('1-0', '0-1' or '1/2-1/2'), '*' if it is not over"""
+    if not game.game_state:
+        return '*'
+    if game.won == 'white':
+        return '1-0'
+    if game.won == 'black':
+        return '0-1'
+    return '1/2-1/2'
+
@@ -0,0 +1,322 @@
+class Piece:
+    """Base class of the pieces.
+
+    The data that is the same for every piece of a type(name, value, annotation, starting squares) is kept once
+    on the class and shared by all its pieces(a flyweight). A piece only stores what is its own: the color, the
+    square it is on and how many moves it made, in `__slots__` so it has no `__dict__`.
+    The pieces know nothing about how they are drawn(see `ChessBoard.piece_image`), so they can be pickled and
+    sent to other processes.
+    """
+    __slots__ = ('color', 'current_square', 'move_count')
+
+    name = None
+    piece_value = 0
+    annotation = ''
+    STARTING_SQUARES = {}  # key: color, value: tuple of the starting squares
+
+    def __init__(self, color: str):
+        self.color = color
+        self.current_square = None
+        self.move_count = 0  # castling rights and en passant only need to know how often the piece moved
+
+    @property
+    def starting_squares(self) -> tuple:
+        return self.STARTING_SQUARES[self.color]
+
+    @property
+    def has_moved(self) -> bool:
+        return self.move_count > 0
+
+    @property
+    def symbol(self) -> str:
+        """Returns the letter of the piece in FEN, upper case for white(e.g. 'N', 'p')"""
+        letter = self.annotation or 'P'
+        return letter if self.color == 'white' else letter.lower()
+
+
+class King(Piece):
+    __slots__ = ()
+
+    name = 'king'
+    piece_value = 0
+    annotation = 'K'
+    STARTING_SQUARES = {'white': ('e1',), 'black': ('e8',)}
+
+    @staticmethod
+    def get_adjacent_files(file: str) -> tuple:
+        """Gets adjacent files, the left, current and right file, if there is any.
+        Example:
+            if 'a' is the argument, -> ('a', 'b').
+            if 'c' is the argument, -> ('b', 'c','d').
+            if 'h' is the argument, -> ('g', 'h') since there is no file to the right of h
+            """
+        if file == 'a':
+            return file, chr(ord(file) + 1)
+        elif file == 'h':
+            return chr(ord(file) - 1), file
+        else:
+            return chr(ord(file) - 1), file, chr(ord(file) + 1)
+
+    @staticmethod
+    def get_adjacent_ranks(rank: int) -> tuple:
+        """Gets adjacent ranks and also the current rank.
+        Example:
+            if rank == 1(at the edge) -> (1, 2).
+            if rank == 4(somewhere in the middle) -> (3, 4, 5).
+            if rank == 8(at the edge) -> (7, 8)
+            """
+        if rank == 1:
+            return 1, 2
+        elif rank == 8:
+            return 7, 8
+        else:
+            return rank - 1, rank, rank + 1
+
+    def generate_valid_moves(self) -> list:
+        """
+        Gets the square the King is currently in and generates the squares that it can move to.
+        The king can move horizontally, diagonally, and vertically but only one square at a time.
+        """
+        file, rank = self.current_square[0], int(self.current_square[1])
+        valid_files = self.get_adjacent_files(file)
+        valid_ranks = self.get_adjacent_ranks(rank)
+
+        valid_moves = [f'{letter}{num}' for letter in valid_files for num in valid_ranks]
+
+        # remove the original square
+        valid_moves.remove(self.current_square)
+
+        return valid_moves
+
+
+class Queen(Piece):
+    __slots__ = ()
+
+    name = 'queen'
+    piece_value = 9
+    annotation = "Q"
+    STARTING_SQUARES = {'white': ('d1',), 'black': ('d8',)}
+
+    def generate_valid_moves(self) -> dict:
+        """
+        Returns a list of valid moves the Queen has.
+        A Queen can move: vertically, horizontally and diagonally.
+        Vertically it can move in the directions: N, S.
+        Horizontally it can move in the directions: W, E.
+        Diagonally it can move in the directions: NW, NE, SE, SW.
+
+        This functions returns a dictionary where:
+                key: direction (str) eg 'NE'
+                value: [valid_moves] list of valid moves in the direction
+        """
+        files = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
+        # ranks = [8, 7, 6, 5, 4, 3, 2, 1]
+
+        file, rank = self.current_square[0], int(self.current_square[1])
+        files_left = files[:files.index(file)][::-1]
+        files_right = files[files.index(file) + 1:]
+
+        if rank == 8:
+            ranks_up = []
+            ranks_down = list(range(7, 0, -1))
+        elif rank == 1:
+            ranks_up = list(range(2, 9))
+            ranks_down = []
+        else:
+            ranks_up = list(range(rank + 1, 9))
+            ranks_down = list(range(rank - 1, 0, -1))
+
+        ne = [f'{letter}{num}' for letter, num in zip(files_right, ranks_up)]
+        e = [f'{letter}{rank}' for letter in files_right]
+        se = [f'{letter}{num}' for letter, num in zip(files_right, ranks_down)]
+        s = [f'{file}{num}' for num in ranks_down]
+        sw = [f'{letter}{num}' for letter, num in zip(files_left, ranks_down)]
+        w = [f'{letter}{rank}' for letter in files_left]
+        nw = [f'{letter}{num}' for letter, num in zip(files_left, ranks_up)]
+        n = [f'{file}{num}' for num in ranks_up]
+
+        return {
+            'NE': ne,
+            'E': e,
+            'SE': se,
+            'S': s,
+            'SW': sw,
+            'W': w,
+            'NW': nw,
+            'N': n,
+        }
+
+
+class Rook(Piece):
+    __slots__ = ()
+
+    name = 'rook'
+    piece_value = 5
+    annotation = "R"
+    STARTING_SQUARES = {'white': ('a1', 'h1'), 'black': ('a8', 'h8')}
+
+    def generate_valid_moves(self) -> dict:
+        """
+        Returns the valid moves the rook has.
+        A rook can move horizontally(W, E) or vertically(N, S).
+        This function returns a dictionary containing:
+            key: direction(eg N, S)
+            value: valid_moves in that direction.
+        """
+        files = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
+        # ranks = [8, 7, 6, 5, 4, 3, 2, 1]
+
+        file, rank = self.current_square[0], int(self.current_square[1])
+        files_left = files[:files.index(file)][::-1]
+        files_right = files[files.index(file) + 1:]
+
+        if rank == 8:
+            ranks_up = []
+            ranks_down = list(range(7, 0, -1))
+        elif rank == 1:
+            ranks_up = list(range(2, 9))
+            ranks_down = []
+        else:
+            ranks_up = list(range(rank + 1, 9))
+            ranks_down = list(range(rank - 1, 0, -1))
+
+        e = [f'{letter}{rank}' for letter in files_right]
+        s = [f'{file}{num}' for num in ranks_down]
+        w = [f'{letter}{rank}' for letter in files_left]
+        n = [f'{file}{num}' for num in ranks_up]
+
+        return {
+            'N': n,
+            'E': e,
+            'W': w,
+            'S': s,
+        }
+
+
+class Bishop(Piece):
+    __slots__ = ()
+
+    name = 'bishop'
+    piece_value = 3
+    annotation = "B"
+    STARTING_SQUARES = {'white': ('c1', 'f1'), 'black': ('c8', 'f8')}
+
+    def generate_valid_moves(self) -> dict:
+        """
+        Returns the valid moves the bishop has.
+        A bishop can only move diagonally in NE, SE, SW and NW directions.
+        This function returns a dictionary containing:
+            key: direction(eg NE, SE)
+            value: valid_moves in that direction.
+        """
+        files = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
+        # ranks = [8, 7, 6, 5, 4, 3, 2, 1]
+
+        file, rank = self.current_square[0], int(self.current_square[1])
+        files_left = files[:files.index(file)][::-1]
+        files_right = files[files.index(file) + 1:]
+
+        if rank == 8:
+            ranks_up = []
+            ranks_down = list(range(7, 0, -1))
+        elif rank == 1:
+            ranks_up = list(range(2, 9))
+            ranks_down = []
+        else:
+            ranks_up = list(range(rank + 1, 9))
+            ranks_down = list(range(rank - 1, 0, -1))
+
+        ne = [f'{letter}{num}' for letter, num in zip(files_right, ranks_up)]
+        se = [f'{letter}{num}' for letter, num in zip(files_right, ranks_down)]
+        sw = [f'{letter}{num}' for letter, num in zip(files_left, ranks_down)]
+        nw = [f'{letter}{num}' for letter, num in zip(files_left, ranks_up)]
+
+        return {
+            'NE': ne,
+            'SE': se,
+            'SW': sw,
+            'NW': nw
+        }
+
+
+class Knight(Piece):
+    __slots__ = ()
+
+    name = 'knight'
+    piece_value = 3
+    annotation = "N"
+    STARTING_SQUARES = {'white': ('b1', 'g1'), 'black': ('b8', 'g8')}
+
+    def generate_valid_moves(self) -> list:
+        """
+        Returns the valid moves the knight has.
+        A knight moves in an L shape.
+        """
+        files = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
+        ranks = [8, 7, 6, 5, 4, 3, 2, 1]
+
+        file, rank = self.current_square[0], int(self.current_square[1])
+
+        left_file_1 = chr(ord(file) - 1) if chr(ord(file) - 1) in files else None
+        left_file_2 = chr(ord(file) - 2) if chr(ord(file) - 2) in files else None
+        right_file_1 = chr(ord(file) + 1) if chr(ord(file) + 1) in files else None
+        right_file_2 = chr(ord(file) + 2) if chr(ord(file) + 2) in files else None
+
+        up_rank_1 = rank + 1 if (rank + 1) in ranks else None
+        up_rank_2 = rank + 2 if (rank + 2) in ranks else None
+        down_rank_1 = rank - 1 if (rank - 1) in ranks else None
+        down_rank_2 = rank - 2 if (rank - 2) in ranks else None
+
+        lr1 = [f'{left_file_1}{num}' for num in (up_rank_2, down_rank_2) if num and left_file_1]
+        lr2 = [f'{left_file_2}{num}' for num in (up_rank_1, down_rank_1) if num and left_file_2]
+        rr1 = [f'{right_file_1}{num}' for num in (up_rank_2, down_rank_2) if num and right_file_1]
+        rr2 = [f'{right_file_2}{num}' for num in (up_rank_1, down_rank_1) if num and right_file_2]
+
+        return lr1 + lr2 + rr1 + rr2
+
+
+class Pawn(Piece):
+    __slots__ = ()
+
+    name = 'pawn'
+    piece_value = 1
+    annotation = ""
+    STARTING_SQUARES = {'white': ('a2', 'b2', 'c2', 'd2', 'e2', 'f2', 'g2', 'h2'), 'black': ('a7', 'b7', 'c7', 'd7', 'e7', 'f7', 'g7', 'h7')}
+
+    def generate_valid_moves(self) -> list:
+        """
+        Returns the valid moves the pawn has.
+        A pawn can only move forward one square at a time, except the first move where it can move
+        two squares or one square.
+        """
+        file, rank = self.current_square[0], int(self.current_square[1])
+        if self.color == 'white':
+            ranks = [2, 3, 4, 5, 6, 7, 8]
+            if self.has_moved:  # the pawn has already moved at least once
+                valid_moves = [f'{file}{rank + 1}' if rank + 1 in ranks else None]
+            else:  # the pawn has not moved
+                valid_moves = [f'{file}{rank + 1}', f'{file}{rank + 2}']
+        else:
+            ranks = [7, 6, 5, 4, 3, 2, 1]
+            if self.has_moved:
+                valid_moves = [f'{file}{rank - 1}' if rank - 1 in ranks else None]
+            else:
+                valid_moves = [f'{file}{rank - 1}', f'{file}{rank - 2}']
+
+        return valid_moves
+
+
+# key: name of the piece, value: class of the piece
+PIECE_CLASSES = {
+    'king': King,
+    'queen': Queen,
+    'rook': Rook,
+    'bishop': Bishop,
+    'knight': Knight,
+    'pawn': Pawn,
+}
+
+
+def create_piece(name: str, color: str):
+    """Given the name and color, this function returns the appropriate Piece(King, Queen etc.) object"""
+    return PIECE_CLASSES[name](color)
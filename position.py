@@ -0,0 +1,937 @@
+import copy
+import logging
+
+from instrumentation import get_logger, timed
+from pieces import King, Pawn
+
+logger = get_logger('rules')
+
+
+def square_index(square_name: str) -> int:
+    """Returns the index(0 - 63) of a square name. Example: 'a1' -> 0, 'h8' -> 63"""
+    return ord(square_name[0]) - 97 + 8 * (int(square_name[1]) - 1)
+
+
+def square_name(index: int) -> str:
+    """Returns the square name of an index(0 - 63). Example: 0 -> 'a1', 63 -> 'h8'"""
+    return f'{"abcdefgh"[index % 8]}{index // 8 + 1}'
+
+
+class Position:
+    """The pieces on the board and the rules of the game.
+
+    The pieces are identified by an id(the image_id when the position belongs to a ChessBoard).
+    A Position does not need a canvas, so the rules can be checked on a snapshot of the game away from the GUI.
+    """
+
+    @staticmethod
+    def get_in_between_squares(k_square: str, p_square: str) -> list:
+        """Generates the squares between the King and a piece including the piece square.
+
+        This function works for pieces Queen, Rook and Bishop as long as any of the pieces is attacking
+        the King.
+        """
+        king_file, king_rank = k_square[0], int(k_square[1])
+        piece_file, piece_rank = p_square[0], int(p_square[1])
+
+        # if the king_file and piece_file are the same
+        if king_file == piece_file:
+            if piece_rank > king_rank:
+                squares = [f'{king_file}{rank}' for rank in range(king_rank + 1, piece_rank + 1)]
+            else:
+                squares = [f'{king_file}{rank}' for rank in range(king_rank - 1, piece_rank - 1, -1)]
+
+        # if the ranks of the king and the piece are the same
+        elif king_rank == piece_rank:
+            if ord(piece_file) > ord(king_file):
+                squares = [f'{chr(file)}{king_rank}' for file in range(ord(king_file) + 1, ord(piece_file) + 1)]
+            else:
+                squares = [f'{chr(file)}{king_rank}' for file in range(ord(king_file) - 1, ord(piece_file) - 1, -1)]
+
+        # If the ranks and files are different
+        else:
+            if ord(king_file) > ord(piece_file):
+                if king_rank > piece_rank:
+                    squares = [f'{chr(file)}{rank}' for file, rank in
+                               zip(range(ord(king_file) - 1, ord(piece_file) - 1, -1),
+                                   range(king_rank - 1, piece_rank - 1, -1))]
+                else:
+                    squares = [f'{chr(file)}{rank}' for file, rank in
+                               zip(range(ord(king_file) - 1, ord(piece_file) - 1, -1),
+                                   range(king_rank + 1, piece_rank + 1))]
+            else:
+                if king_rank > piece_rank:
+                    squares = [f'{chr(file)}{rank}' for file, rank in
+                               zip(range(ord(king_file) + 1, ord(piece_file) + 1),
+                                   range(king_rank - 1, piece_rank - 1, -1))]
+                else:
+                    squares = [f'{chr(file)}{rank}' for file, rank in
+                               zip(range(ord(king_file) + 1, ord(piece_file) + 1),
+                                   range(king_rank + 1, piece_rank + 1))]
+
+        return squares
+
+    def __init__(self):
+        self.files = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
+        self.ranks = [8, 7, 6, 5, 4, 3, 2, 1]
+
+        self.current_white_pieces = {}  # key: piece_id, value: white_piece
+        self.current_black_pieces = {}  # key: piece_id, value: black_piece
+
+        self.pieces = {}  # key: piece_id, value: piece object
+        self.square_items = [None] * 64  # index: square index(see `square_index`), value: piece_id or None
+
+        self.white_moves = []
+        self.black_moves = []
+        self.white_turn = True
+
+    def snapshot(self):
+        """Returns a copy of the position that can be used away from the GUI(for example in another thread).
+
+        The pieces hold no images(see `pieces.Piece`), so the copy has no reference to tkinter objects and can
+        be pickled(e.g. to send it to another process).
+        """
+        position = Position()
+        position.files = self.files
+        position.ranks = self.ranks
+        position.square_items = list(self.square_items)
+        position.white_moves = list(self.white_moves)
+        position.black_moves = list(self.black_moves)
+        position.white_turn = self.white_turn
+
+        for piece_id, piece in self.pieces.items():
+            piece_copy = copy.copy(piece)
+
+            position.pieces[piece_id] = piece_copy
+            if piece.color == 'white':
+                position.current_white_pieces[piece_id] = piece_copy
+            else:
+                position.current_black_pieces[piece_id] = piece_copy
+
+        return position
+
+    def get_king_object(self, color: str):
+        """Gets the King object of a particular `color`"""
+        if color == 'white':
+            for white_piece in self.current_white_pieces.values():
+                if white_piece.name == 'king':
+                    return white_piece
+        else:
+            for black_piece in self.current_black_pieces.values():
+                if black_piece.name == 'king':
+                    return black_piece
+
+    @timed(hot=True)
+    def get_valid_piece_moves(self, piece):
+        """Checks the piece's possible moves, scans the board and returns the piece's valid moves.
+
+        If piece is King:
+            -`generate_valid_moves` method returns a list(possible moves)
+            1. For each of the possible moves
+                If that square contains a piece with the same color
+                    don't include the move
+
+        Elif piece is Knight:
+            -`generate_valid_moves` method returns a list(possible moves).
+            1. For each of the possible moves, check if there is a piece of the same color at that square.
+            2. If there is a piece of the same color, delete that move(invalid move).
+
+        Elif piece is Queen | Rook | Bishop:
+            -`generate_valid_moves` method returns a dict(key(direction), value(list(possible moves in that direction)).
+
+            1. For each direction's possible move:
+                If that square contains a piece of the same color.
+                    include the moves up to the previous square
+                Elif the square contains an enemy piece(different color piece).
+                    include the moves up to that square (enemy piece can be captured)
+
+        Else (piece is Pawn):
+            -`generate_valid_moves` method returns a list.
+
+            1. For each possible move(one square forward, then two):
+                If that square contains any piece(of any color).
+                    delete that move and the ones behind it(a pawn cannot jump over a piece)
+            2. Check the diagonal square to the left and right.
+                If that square contains an enemy piece.
+                    include the move
+                Else
+                    don't include that move
+            3. If the pawn is on the 5th rank(white) or 4th rank(black):
+                Check if there is an enemy pawn to the left or right.
+                    If the enemy pawn has made one move
+                        the pawn can move diagonally to that direction.
+        """
+        name = piece.name
+        color = piece.color
+
+        valid_moves = []
+        if name == 'king':
+            possible_moves = piece.generate_valid_moves()
+            for move in possible_moves:
+                # check to see if there exists a piece on that square
+                item = self.get_piece_on_square(move)
+
+                if item:
+                    image_id = item
+                    another_piece = self.pieces[image_id]
+
+                    # check to see the color of the other piece
+                    if another_piece.color == color:
+                        continue
+                valid_moves.append(move)
+
+        elif name == 'knight':
+            possible_moves = piece.generate_valid_moves()
+            for move in possible_moves:
+                # check to see if there exists a piece on that square
+                item = self.get_piece_on_square(move)
+
+                if item:
+                    image_id = item
+                    another_piece = self.pieces[image_id]
+
+                    # check to see the color of the other piece
+                    if another_piece.color == color:
+                        continue
+
+                valid_moves.append(move)
+        elif name == 'queen' or name == 'rook' or name == 'bishop':
+            possible_moves = piece.generate_valid_moves()
+            for direction in possible_moves.values():
+                if direction:
+                    for move in direction:
+                        # check to see a piece exists in that square
+                        item = self.get_piece_on_square(move)
+
+                        if item:
+                            image_id = item
+                            another_piece = self.pieces[image_id]
+
+                            # check to see the color of the other piece
+                            if another_piece.color == color:
+                                break
+                            else:  # the other piece is of different color
+                                valid_moves.append(move)
+                                break
+                        valid_moves.append(move)
+        else:  # the piece is a pawn
+            current_square = piece.current_square
+            file, rank = current_square[0], int(current_square[1])
+
+            possible_moves = piece.generate_valid_moves()
+            for move in possible_moves:
+                # check to see if there is any piece in that square
+                item = self.get_piece_on_square(move)
+
+                if item:
+                    break
+                valid_moves.append(move)
+
+            if color == 'white':
+                ranks = [3, 4, 5, 6, 7, 8]
+                files = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
+
+                # check to the left or right diagonal
+
+                left_file = chr(ord(file) - 1) if chr(ord(file) - 1) in files else None
+                right_file = chr(ord(file) + 1) if chr(ord(file) + 1) in files else None
+
+                l_diagonal = f'{left_file}{rank + 1}' if left_file and (rank + 1) in ranks else None
+                r_diagonal = f'{right_file}{rank + 1}' if right_file and (rank + 1) in ranks else None
+
+                if rank == 5:  # enforcing the en-passant rule
+
+                    # check to see if there is an enemy pawn to the left or right
+                    left = f'{left_file}{rank}' if left_file else None
+                    right = f'{right_file}{rank}' if right_file else None
+
+                    if left:
+                        item = self.get_piece_on_square(left)
+
+                        if item:
+                            another_piece = self.pieces[item]
+                            if another_piece.color == 'black' and another_piece.name == 'pawn' \
+                                    and another_piece.move_count == 1 and self.black_moves[-1:] == [left]:
+                                valid_moves.append(l_diagonal)
+
+                    if right:
+                        item = self.get_piece_on_square(right)
+
+                        if item:
+                            another_piece = self.pieces[item]
+                            if another_piece.color == 'black' and another_piece.name == 'pawn' \
+                                    and another_piece.move_count == 1 and self.black_moves[-1:] == [right]:
+                                valid_moves.append(r_diagonal)
+
+                # check if left and right diagonal have pieces(for capture) of opposite color
+                if l_diagonal:
+                    item = self.get_piece_on_square(l_diagonal)
+
+                    if item:
+                        another_piece = self.pieces[item]
+                        if another_piece.color == 'black':
+                            valid_moves.append(l_diagonal)
+                if r_diagonal:
+                    item = self.get_piece_on_square(r_diagonal)
+
+                    if item:
+                        another_piece = self.pieces[item]
+                        if another_piece.color == 'black':
+                            valid_moves.append(r_diagonal)
+
+            else:  # piece color is black
+                ranks = [6, 5, 4, 3, 2, 1]
+                files = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
+
+                left_file = chr(ord(file) - 1) if chr(ord(file) - 1) in files else None
+                right_file = chr(ord(file) + 1) if chr(ord(file) + 1) in files else None
+
+                l_diagonal = f'{left_file}{rank - 1}' if left_file and (rank - 1) in ranks else None
+                r_diagonal = f'{right_file}{rank - 1}' if right_file and (rank - 1) in ranks else None
+
+                if rank == 4:  # enforcing en passant rule
+
+                    # check to see if there is an enemy pawn to the left or right
+                    left = f'{left_file}{rank}' if left_file else None
+                    right = f'{right_file}{rank}' if right_file else None
+
+                    if left:  # there is a left square
+                        item = self.get_piece_on_square(left)
+
+                        if item:
+                            another_piece = self.pieces[item]
+                            if another_piece.color == 'white' and another_piece.name == 'pawn' \
+                                    and another_piece.move_count == 1 and self.white_moves[-1:] == [left]:
+                                valid_moves.append(l_diagonal)
+
+                    if right:  # is there a right square
+                        item = self.get_piece_on_square(right)
+
+                        if item:
+                            another_piece = self.pieces[item]
+                            if another_piece.color == 'white' and another_piece.name == 'pawn' \
+                                    and another_piece.move_count == 1 and self.white_moves[-1:] == [right]:
+                                valid_moves.append(r_diagonal)
+
+                # check if left and right diagonal have pieces(for capture) of opposite color
+                if l_diagonal:
+                    item = self.get_piece_on_square(l_diagonal)
+
+                    if item:
+                        another_piece = self.pieces[item]
+                        if another_piece.color == 'white':
+                            valid_moves.append(l_diagonal)
+                if r_diagonal:
+                    item = self.get_piece_on_square(r_diagonal)
+
+                    if item:
+                        another_piece = self.pieces[item]
+                        if another_piece.color == 'white':
+                            valid_moves.append(r_diagonal)
+
+        return valid_moves
+
+    @timed(hot=True)
+    def generate_correct_piece_moves(self, piece) -> list:
+        """Given a piece, this function gets its valid moves.
+        Get the color of the enemy
+        If piece == king:
+            Check for en-passant and act accordingly
+            For move in valid_moves:
+                If that square is attacked by an enemy piece:
+                    do not include the move
+                Else:
+                    include that move
+        Else:
+
+            """
+        correct_moves = []
+        color, name = piece.color, piece.name
+        current_square = piece.current_square
+
+        if color == 'white':
+            enemy_color = 'black'
+        else:
+            enemy_color = 'white'
+
+        if name == 'king':
+            if color == 'white':
+                r = 1
+            else:
+                r = 8
+
+            # checking to see if castle is possible
+            castle_types = self.can_castle(piece)
+
+            if castle_types:
+                logger.debug('castle types for %s are %s', color, castle_types)
+                for castle_type in castle_types:
+                    if castle_type == 'long_castle':
+                        correct_moves.append(f'c{r}')
+                    elif castle_type == 'short_castle':
+                        correct_moves.append(f'g{r}')
+
+            valid_moves = self.get_valid_piece_moves(piece)
+            if valid_moves:
+                for move in valid_moves:
+                    # check if that square is attacked by the enemy color's color pieces
+                    if not self.is_square_attacked(move, enemy_color):
+                        correct_moves.append(move)
+
+        else:
+            # check if the King is in check
+            attacking_pieces = self.is_check(color)
+
+            if not attacking_pieces:  # if the king is not in check return the piece's valid moves
+                # check if the piece is pinned
+                pinning_piece = self.is_piece_pinned(piece)
+                if pinning_piece:
+                    pinning_piece_current_square = pinning_piece.current_square
+
+                    # get the squares between the King and the pinning piece(the piece can move along the pin)
+                    king_square = self.get_king_object(color).current_square
+                    squares_between = self.get_in_between_squares(king_square, pinning_piece_current_square)
+
+                    valid_moves = self.get_valid_piece_moves(piece)
+
+                    debug = logger.isEnabledFor(logging.DEBUG)
+                    if debug:
+                        logger.debug('%s on %s is pinned, squares between are %s, valid moves are %s',
+                                     name, current_square, squares_between, valid_moves)
+                    for move in valid_moves:
+                        if move in squares_between:
+                            correct_moves.append(move)
+                        elif debug:
+                            logger.debug('%s is not a correct move for the pinned %s', move, name)
+                else:
+                    valid_moves = self.get_valid_piece_moves(piece)
+                    if name == 'pawn':  # a diagonal move to an empty square takes en passant
+                        return [move for move in valid_moves if move[0] == current_square[0]
+                                or self.get_piece_on_square(move) or not self.is_enpassant_exposing_king(piece, move)]
+                    return valid_moves
+            else:   # there are attacking pieces (King is in check)
+
+                if len(attacking_pieces) > 1:  # if more than 1 piece are attacking the King, the King must move
+                    return []
+
+                # a pinned piece can neither take the attacking piece nor stand in its way
+                if self.is_piece_pinned(piece):
+                    return []
+
+                # if there is only one attacking piece
+                attack_piece = attacking_pieces[0]
+                attack_piece_current_square, attack_piece_name = attack_piece.current_square, attack_piece.name
+
+                king = self.get_king_object(color)
+                king_current_square = king.current_square
+
+                if attack_piece_name == 'knight' or attack_piece_name == 'pawn':
+                    valid_moves = self.get_valid_piece_moves(piece)
+
+                    if attack_piece_current_square in valid_moves:
+                        correct_moves.append(attack_piece_current_square)
+
+                    # a pawn that just moved two squares can also be taken en passant(a diagonal move to the empty
+                    # square behind it)
+                    if attack_piece_name == 'pawn' and name == 'pawn':
+                        for move in valid_moves:
+                            if move[0] == attack_piece_current_square[0] != current_square[0] \
+                                    and not self.get_piece_on_square(move):
+                                correct_moves.append(move)
+
+                else:  # attack piece is Queen, Rook or Bishop
+                    # get the squares between the attacking piece and the king
+                    squares_between = self.get_in_between_squares(king_current_square, attack_piece_current_square)
+                    valid_moves = self.get_valid_piece_moves(piece)
+
+                    for move in valid_moves:
+                        if move in squares_between:
+                            correct_moves.append(move)
+
+        return correct_moves
+
+    def is_enpassant_exposing_king(self, piece: Pawn, move: str) -> bool:
+        """Checks if taking en passant on `move` leaves the King of the pawn in check.
+
+        Both pawns leave the rank of the pawn, so the King may be attacked along that rank(e.g. by a Rook).
+        """
+        items = self.square_items
+        from_index = square_index(piece.current_square)
+        taken_index = square_index(f'{move[0]}{piece.current_square[1]}')
+        to_index = square_index(move)
+
+        item, taken_item = items[from_index], items[taken_index]
+        items[from_index] = items[taken_index] = None
+        items[to_index] = item
+        try:
+            return bool(self.is_check(piece.color))
+        finally:
+            items[from_index], items[taken_index], items[to_index] = item, taken_item, None
+
+    def get_enpassant_square_capture(self, piece: Pawn, move):
+        """
+        Checks if an en-passant move was played.
+        If yes -> square that a piece was captured on.
+        no -> None
+        """
+        color = piece.color
+
+        # get the current_square
+        current_square = piece.current_square
+        file, rank = current_square[0], int(current_square[1])
+        move_file, move_rank = move[0], int(move[1])
+
+        valid_moves = self.get_valid_piece_moves(piece)
+        item = self.get_piece_on_square(f'{move_file}{rank}')
+        if item:
+            another_piece_color = self.pieces[item].color
+            if another_piece_color == color:
+                return
+
+        if color == 'white':
+            if rank == 5 and move in valid_moves and item:
+                # is there a piece in to the left or right
+
+                return f'{move_file}{rank}'
+            else:
+                return None
+        else:  # color is black
+            if rank == 4 and move in valid_moves and item:
+                return f'{move_file}{rank}'
+            else:
+                return None
+
+    @timed(hot=True)
+    def can_castle(self, king: King) -> list:
+        """
+        Checks if the King can castle.
+
+        For white or black:
+            If square a1|a8 has a rook (checking for long castle).
+                If the rook has not moved and the King has not moved.
+                    If the squares d1(d8), c1(c8), and b1(b8) have pieces
+                        castles not possible
+                    Else
+                        check whether squares e1(e8), d1(d8) and c1(c8) are attacked(the King does not cross b1)
+                            If attacked:
+                                castles not possible
+                            Else
+                                move c1(c8) is possible(long castle)
+            Elif square h1|h8 has a rook (checking for short castle).
+                If the rook and king have not moved.
+                    If squares f1(f8) and g1(g8) have pieces.
+                        short castle not possible
+                    Else
+                        If squares e1(e8), f1(f8) and g1(g8) are attacked:
+                            castles not possible
+                        Else
+                            move g1(g8) is possible(short castle)
+        """
+        castle_moves = []
+        king_color = king.color
+        if king_color == 'white':
+            # left_check_squares = ()
+            check_color = 'black'
+            rank = 1
+        else:
+            check_color = 'white'
+            rank = 8
+
+        # check if the gap squares are empty (e.g. d1, c1 and b1 for white)
+        is_gap_left = not self.get_piece_on_square(f'd{rank}') and not self.get_piece_on_square(
+            f'c{rank}') and not self.get_piece_on_square(f'b{rank}')
+        is_gap_right = not self.get_piece_on_square(f'f{rank}') and not self.get_piece_on_square(f'g{rank}')
+
+        # check whether the left squares of the king are attacked by enemy pieces
+        for square in (f'e{rank}', f'd{rank}', f'c{rank}'):
+            if self.is_square_attacked(square, check_color):
+                is_left_square_attacked = True
+                break
+            else:
+                is_left_square_attacked = False
+
+        # check whether the right squares to king are attacked by enemy pieces
+        for square in (f'e{rank}', f'f{rank}', f'g{rank}'):
+            if self.is_square_attacked(square, check_color):
+                is_right_square_attacked = True
+                break
+            else:
+                is_right_square_attacked = False
+
+        # check if there is a rook in a1(a8)
+        a_image_id = self.get_piece_on_square(f'a{rank}')
+        if a_image_id:
+            if self.pieces[a_image_id].name == 'rook':
+                a_rook = self.pieces[a_image_id]
+                if not king.has_moved and not a_rook.has_moved:
+                    if is_gap_left and not is_left_square_attacked:
+                        castle_moves.append('long_castle')
+
+        h_image_id = self.get_piece_on_square(f'h{rank}')
+        if h_image_id:
+            if self.pieces[h_image_id].name == 'rook':
+                h_rook = self.pieces[h_image_id]
+                if not king.has_moved and not h_rook.has_moved:
+                    if is_gap_right and not is_right_square_attacked:
+                        castle_moves.append('short_castle')
+        return castle_moves
+
+    def get_piece_on_square(self, square_name: str):
+        """
+        Given a square name(e.g. a4), this functions checks if there is a piece on that square.
+
+        If a piece exists
+            return the image_id of the piece
+        Else
+            return None
+            """
+        return self.square_items[square_index(square_name)]
+
+    @timed(hot=True)
+    def is_check(self, color: str):
+        """Checks whether the King of color `color` is in check(or attacked).
+
+        If color == 'white':
+            Get the appropriate king object
+            For every black piece:
+                check the valid moves of the piece
+
+                For every valid move:
+                    If the king's current square == valid move:
+                        return attacking pieces
+
+        Else: (color == 'black')
+            Get the appropriate king object
+            For every white piece:
+                get the valid moves of the piece
+
+                For every valid move:
+                    If the king's current square == valid move:
+                        return attacking pieces
+        """
+        king = None
+        if color == 'white':
+            for piece in self.current_white_pieces.values():
+                if piece.name == 'king':
+                    king = piece
+                    break
+
+            king_current_square = king.current_square
+
+            attacking_pieces = self.is_square_attacked(king_current_square, 'black')
+
+            if attacking_pieces:
+                return attacking_pieces
+
+        else:
+            for piece in self.current_black_pieces.values():
+                if piece.name == 'king':
+                    king = piece
+                    break
+
+            king_current_square = king.current_square
+
+            attacking_pieces = self.is_square_attacked(king_current_square, 'white')
+            if attacking_pieces:
+                return attacking_pieces
+
+    @timed(hot=True)
+    def is_square_attacked(self, square_name: str, color: str) -> list:
+        """Checks whether the `square_name` is attacked by the `color` player.
+        This function checks for pieces other than the King piece.
+
+        If color == 'white': (check whether a white piece is attacking the `square_name`)
+            For each white piece:
+                If piece is pawn:
+                    check for diagonal squares
+                    if square_name == diagonal squares (the pawn is attacking the square)
+                        append the piece to the list
+                Else:
+                    get the piece valid moves
+                    For each valid move:
+                        If valid move == square name:
+                            append the attacking piece to the list
+        Else: (color == 'black')
+            repeat the same steps as done if color == 'white'
+
+        :return `list` containing attacking pieces
+        """
+        attacking_pieces = []
+
+        if color == 'white':
+            for white_piece in self.current_white_pieces.values():
+                if white_piece.name == 'pawn':
+                    current_square = white_piece.current_square
+                    file, rank = current_square[0], int(current_square[1])
+                    left_file = chr(ord(file) - 1) if chr(ord(file) - 1) in self.files else None
+                    right_file = chr(ord(file) + 1) if chr(ord(file) + 1) in self.files else None
+
+                    up_rank = rank + 1 if (rank + 1) in self.ranks else None
+
+                    if square_name in (f'{left_file}{up_rank}', f'{right_file}{up_rank}'):
+                        attacking_pieces.append(white_piece)
+                elif white_piece.name == 'king' or white_piece.name == 'knight':
+                    possible_moves = white_piece.generate_valid_moves()
+                    for move in possible_moves:
+                        if square_name == move:
+                            attacking_pieces.append(white_piece)
+                elif white_piece.name == 'queen' or white_piece.name == 'rook' or white_piece.name == 'bishop':
+                    possible_moves = white_piece.generate_valid_moves()
+                    for direction in possible_moves.values():
+                        if direction:
+                            for move in direction:
+                                # check to see a piece exists in that square
+                                item = self.get_piece_on_square(move)
+
+                                if item:    # there is a piece in the square
+                                    another_piece = self.pieces[item]
+
+                                    if square_name != move:
+                                        # If the King is in the way and the square is not move, check remaining moves
+                                        if another_piece.color != 'white' and another_piece.name == 'king':
+                                            continue
+                                        break
+
+                                    attacking_pieces.append(white_piece)
+                                    break
+                                else:   # the square is empty
+                                    if square_name != move:
+                                        continue
+
+                                    attacking_pieces.append(white_piece)
+
+        else:  # color is black
+            for black_piece in self.current_black_pieces.values():
+                if black_piece.name == 'pawn':
+                    current_square = black_piece.current_square
+                    file, rank = current_square[0], int(current_square[1])
+                    left_file = chr(ord(file) - 1) if chr(ord(file) - 1) in self.files else None
+                    right_file = chr(ord(file) + 1) if chr(ord(file) + 1) in self.files else None
+
+                    down_rank = rank - 1 if (rank - 1) in self.ranks else None
+
+                    if square_name in (f'{left_file}{down_rank}', f'{right_file}{down_rank}'):
+                        attacking_pieces.append(black_piece)
+                elif black_piece.name == 'king' or black_piece.name == 'knight':
+                    possible_moves = black_piece.generate_valid_moves()
+                    for move in possible_moves:
+                        if square_name == move:
+                            attacking_pieces.append(black_piece)
+                elif black_piece.name == 'queen' or black_piece.name == 'rook' or black_piece.name == 'bishop':
+                    possible_moves = black_piece.generate_valid_moves()
+                    for direction in possible_moves.values():
+                        if direction:
+                            for move in direction:
+                                # check to see a piece exists in that square
+                                item = self.get_piece_on_square(move)
+
+                                if item:
+                                    another_piece = self.pieces[item]
+
+                                    if square_name != move:
+                                        # if the king is in the way, the squares after are also attacked
+                                        if another_piece.color != 'black' and another_piece.name == 'king':
+                                            continue
+                                        break
+
+                                    attacking_pieces.append(black_piece)
+                                    break
+                                else:
+                                    if square_name != move:
+                                        continue
+
+                                    attacking_pieces.append(black_piece)
+
+        return attacking_pieces
+
+    @timed(hot=True)
+    def is_piece_pinned(self, piece):
+        """
+        Checks if a particular piece is pinned by an enemy Queen, Rook or Bishop.
+
+        Checks if the piece stands in between the enemy's Queen, Rook or Bishop and the piece's color King.
+        return: the enemy piece pinning the piece
+        """
+        current_square = piece.current_square
+        files = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
+        # ranks = [8, 7, 6, 5, 4, 3, 2, 1]
+
+        file, rank = current_square[0], int(current_square[1])
+        files_left = files[:files.index(file)][::-1]
+        files_right = files[files.index(file) + 1:]
+
+        if rank == 8:
+            ranks_up = []
+            ranks_down = list(range(7, 0, -1))
+        elif rank == 1:
+            ranks_up = list(range(2, 9))
+            ranks_down = []
+        else:
+            ranks_up = list(range(rank + 1, 9))
+            ranks_down = list(range(rank - 1, 0, -1))
+
+        ne = [f'{letter}{num}' for letter, num in zip(files_right, ranks_up)]
+        e = [f'{letter}{rank}' for letter in files_right]
+        se = [f'{letter}{num}' for letter, num in zip(files_right, ranks_down)]
+        s = [f'{file}{num}' for num in ranks_down]
+        sw = [f'{letter}{num}' for letter, num in zip(files_left, ranks_down)]
+        w = [f'{letter}{rank}' for letter in files_left]
+        nw = [f'{letter}{num}' for letter, num in zip(files_left, ranks_up)]
+        n = [f'{file}{num}' for num in ranks_up]
+
+        color = piece.color
+        if color == 'white':
+            enemy_color = 'black'
+        else:
+            enemy_color = 'white'
+
+        if n and s:  # if there are squares to the north and to the south of the piece
+            if self.is_piece_in_list('king', color, n) and self.is_piece_in_list('queen', enemy_color, s):
+                return self.is_piece_in_list('queen', enemy_color, s)
+
+            elif self.is_piece_in_list('king', color, n) and self.is_piece_in_list('rook', enemy_color, s):
+                return self.is_piece_in_list('rook', enemy_color, s)
+
+            elif self.is_piece_in_list('king', color, s) and self.is_piece_in_list('queen', enemy_color, n):
+                return self.is_piece_in_list('queen', enemy_color, n)
+
+            elif self.is_piece_in_list('king', color, s) and self.is_piece_in_list('rook', enemy_color, n):
+                return self.is_piece_in_list('rook', enemy_color, n)
+
+        if e and w:  # if there are squares to the east and west of the piece
+            if self.is_piece_in_list('king', color, e) and self.is_piece_in_list('queen', enemy_color, w):
+                return self.is_piece_in_list('queen', enemy_color, w)
+
+            elif self.is_piece_in_list('king', color, e) and self.is_piece_in_list('rook', enemy_color, w):
+                return self.is_piece_in_list('rook', enemy_color, w)
+
+            elif self.is_piece_in_list('king', color, w) and self.is_piece_in_list('queen', enemy_color, e):
+                return self.is_piece_in_list('queen', enemy_color, e)
+
+            elif self.is_piece_in_list('king', color, w) and self.is_piece_in_list('rook', enemy_color, e):
+                return self.is_piece_in_list('rook', enemy_color, e)
+
+        if ne and sw:  # if there are squares to the north-east and south-west of the piece
+            if self.is_piece_in_list('king', color, ne) and self.is_piece_in_list('queen', enemy_color, sw):
+                return self.is_piece_in_list('queen', enemy_color, sw)
+
+            elif self.is_piece_in_list('king', color, ne) and self.is_piece_in_list('bishop', enemy_color, sw):
+                return self.is_piece_in_list('bishop', enemy_color, sw)
+
+            elif self.is_piece_in_list('king', color, sw) and self.is_piece_in_list('queen', enemy_color, ne):
+                return self.is_piece_in_list('queen', enemy_color, ne)
+
+            elif self.is_piece_in_list('king', color, sw) and self.is_piece_in_list('bishop', enemy_color, ne):
+                return self.is_piece_in_list('bishop', enemy_color, ne)
+
+        if nw and se:  # if there are squares to the north-west and south-east of the piece
+            if self.is_piece_in_list('king', color, nw) and self.is_piece_in_list('queen', enemy_color, se):
+                return self.is_piece_in_list('queen', enemy_color, se)
+
+            elif self.is_piece_in_list('king', color, nw) and self.is_piece_in_list('bishop', enemy_color, se):
+                return self.is_piece_in_list('bishop', enemy_color, se)
+
+            elif self.is_piece_in_list('king', color, se) and self.is_piece_in_list('queen', enemy_color, nw):
+                return self.is_piece_in_list('queen', enemy_color, nw)
+
+            elif self.is_piece_in_list('king', color, se) and self.is_piece_in_list('bishop', enemy_color, nw):
+                return self.is_piece_in_list('bishop', enemy_color, nw)
+
+    def is_piece_in_list(self, name: str, color: str, squares: list):
+        """
+        Checks if there is a `color` piece `name` in the `squares` list provided
+        :param name: name of the piece object
+        :param color: color of the piece object
+        :param squares: list of square names
+        :return: boolean value whether the piece was found
+        """
+        for square in squares:
+            # check to see if there is an item on the square
+            item = self.get_piece_on_square(square)
+
+            if item:
+                piece_id = item
+                piece = self.pieces[piece_id]
+
+                if piece.color != color:  # the piece color is not the color we are searching for
+                    return None
+                else:  # it is color we are searching for
+                    if piece.name != name:  # not the piece we are looking for
+                        return None
+                    else:  # the correct piece is found
+                        return piece
+
+        return None  # no item was found in the squares list
+
+    @timed(hot=True)
+    def is_checkmate(self, color: str):
+        """Checks if the King of `color` is checkmated
+
+        1. Check if the King is in check
+            If True:
+                Check if there are any correct moves for any of the pieces
+                    If not, the King is checkmated
+                Else:
+                    The King is not checkmated
+            Else:
+                The King is not checkmated
+                """
+        if self.is_check(color):
+            if color == 'white':
+                for white_piece in self.current_white_pieces.values():
+                    correct_moves = self.generate_correct_piece_moves(white_piece)
+
+                    if correct_moves:
+                        return False
+
+                return True     # executes if no correct moves were found for any piece
+            else:
+                for black_piece in self.current_black_pieces.values():
+                    correct_moves = self.generate_correct_piece_moves(black_piece)
+
+                    if correct_moves:
+                        return False
+
+                return True
+
+    @timed(hot=True)
+    def is_stalemate(self, color: str):
+        """Checks if the `color` player is in stalemate.
+
+        A stalemate occurs when the `color` King is not in check and there are no valid moves for any of the `color`
+        pieces
+
+        If stalemate -> True
+        Else -> False
+        """
+        if not self.is_check(color):
+            if color == 'white':
+                for white_piece in self.current_white_pieces.values():
+                    correct_moves = self.generate_correct_piece_moves(white_piece)
+
+                    if correct_moves:
+                        return False
+
+                return True     # executes if no correct moves were found for any piece
+            else:
+                for black_piece in self.current_black_pieces.values():
+                    correct_moves = self.generate_correct_piece_moves(black_piece)
+
+                    if correct_moves:
+                        return False
+
+                return True
+
+    @timed(hot=True)
+    def check_game_state(self, color: str):
+        """Checks the state of the game(stalemate, checkmate or draw) for the `color` player(the player to move).
+
+        If the `color` King is checkmated -> 'checkmate'
+        Elif the `color` player is in stalemate -> 'stalemate'
+        Else -> None(the game goes on)
+        """
+        if self.is_checkmate(color):
+            return 'checkmate'
+        if self.is_stalemate(color):
+            return 'stalemate'
+        return None
@@ -0,0 +1,209 @@
+"""Finds the best move of a position with an alpha-beta search(negamax) over copies of the game.
+
+Every node of the search is a headless copy of the game the move is played on(see `Game.copy`), so the search
+plays by the same rules as the GUI. The search goes one ply deeper at a time until the depth, the nodes or the
+time it was given run out or it is stopped(see `Search.stop`), and the best move of the last finished depth is
+played. At the end of the depth, captures are searched until the position is quiet(quiescence search).
+"""
+import threading
+import time
+
+from evaluation import PIECE_VALUES, evaluate
+from game import Game, uci_move
+from instrumentation import get_logger
+
+logger = get_logger('search')
+
+MATE_SCORE = 100000  # score of a checkmate, minus the plies it takes(a faster mate is better)
+MAX_DEPTH = 64
+MAX_QUIESCENCE_DEPTH = 6  # captures searched at most after the depth, so a search always ends
+
+
+class SearchStopped(Exception):
+    """Raised inside the search when the nodes or the time ran out or the search was stopped"""
+
+
+class SearchNode(Game):
+    """A copy of the game inside the search: the search finds the checkmates and the draws itself"""
+
+    def judge(self, color: str):
+        pass
+
+
+class Search:
+    """The search of the best move of one position.
+
+    `info` is called after every finished depth with a dict(depth, score, mate, nodes, time_ms, nps, pv), e.g. to
+    print the UCI info line. `mate` is the number of moves to the checkmate(negative if the player to move is
+    checkmated) or None.
+    """
+
+    def __init__(self, game: Game, info=None):
+        self.root = game.copy(SearchNode)
+        self.info = info
+        self.stopped = threading.Event()
+        self.nodes = 0
+        self.pv = []  # best line of the last finished depth in UCI notation(e.g. ['e2e4', 'e7e5'])
+        self.max_nodes = None
+        self.deadline = None  # time.perf_counter() the search must end at, it may be set while it runs
+        self.start = 0
+        self.quiescence_depth = MAX_QUIESCENCE_DEPTH  # captures searched at most after the depth
+
+    def stop(self):
+        """Ends the search as soon as possible(it can be called from another thread)"""
+        self.stopped.set()
+
+    def run(self, depth: int = None, nodes: int = None, movetime_ms: int = None):
+        """Searches until `depth`, `nodes` or `movetime_ms` is reached(or `stop`) and returns (best_move, score).
+
+        The best move is in UCI notation(e.g. 'e2e4'), None if the player to move has no move. The score is in
+        centipawns for the player to move.
+        """
+        self.start = time.perf_counter()
+        self.nodes = 0
+        self.max_nodes = nodes
+        if movetime_ms is not None:
+            self.deadline = self.start + movetime_ms / 1000
+
+        root_moves = self.ordered_moves(self.root)
+        if not root_moves:
+            return None, self.terminal_score(self.root, 0)
+
+        best_move, best_score = root_moves[0], None
+        for current_depth in range(1, min(depth or MAX_DEPTH, MAX_DEPTH) + 1):
+            try:
+                score, pv = self.search_root(root_moves, current_depth)
+            except SearchStopped:
+                break
+
+            best_move, best_score = pv[0], score
+            self.pv = [uci_move(*move) for move in pv]
+            root_moves.remove(best_move)  # the best move is searched first at the next depth
+            root_moves.insert(0, best_move)
+            self.report(current_depth, score)
+
+            if abs(score) >= MATE_SCORE - MAX_DEPTH:  # a checkmate was found, a deeper search finds the same
+                break
+            # a depth takes several times longer than the previous one, do not start one that cannot finish
+            if self.deadline is not None and time.perf_counter() - self.start > (self.deadline - self.start) / 2:
+                break
+
+        return uci_move(*best_move), best_score
+
+    def search_root(self, root_moves: list, depth: int):
+        """Returns (score, principal variation) of the root position searched to `depth`"""
+        alpha, beta = -MATE_SCORE - 1, MATE_SCORE + 1
+        best_pv = None
+        for move in root_moves:
+            score, pv = self.negamax(self.play(self.root, move), depth - 1, -beta, -alpha, 1)
+            score = -score
+            if best_pv is None or score > alpha:
+                alpha, best_pv = score, [move] + pv
+        return alpha, best_pv
+
+    def negamax(self, node, depth: int, alpha: int, beta: int, ply: int):
+        """Returns (score, principal variation) of `node` for the player to move"""
+        self.count_node()
+        if node.draw_state():
+            return 0, []
+        if depth <= 0:
+            return self.quiescence(node, alpha, beta, 0), []
+
+        moves = self.ordered_moves(node)
+        if not moves:
+            return self.terminal_score(node, ply), []
+
+        best_pv = []
+        for move in moves:
+            score, pv = self.negamax(self.play(node, move), depth - 1, -beta, -alpha, ply + 1)
+            score = -score
+            if score >= beta:
+                return beta, []
+            if score > alpha:
+                alpha, best_pv = score, [move] + pv
+        return alpha, best_pv
+
+    def quiescence(self, node, alpha: int, beta: int, depth: int) -> int:
+        """Returns the score of `node` once the captures are played out(the player to move may also not capture)"""
+        score = evaluate(node) if node.white_turn else -evaluate(node)
+        if score >= beta or depth >= self.quiescence_depth:
+            return score
+        alpha = max(alpha, score)
+
+        for move in self.ordered_moves(node, captures_only=True):
+            self.count_node()
+            score = -self.quiescence(self.play(node, move), -beta, -alpha, depth + 1)
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
+
+    def count_node(self):
+        self.nodes += 1
+        if self.stopped.is_set():
+            raise SearchStopped
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise SearchStopped
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchStopped
+
+    @staticmethod
+    def terminal_score(node, ply: int) -> int:
+        """Returns the score of a position without moves: checkmated or stalemate"""
+        if node.is_check('white' if node.white_turn else 'black'):
+            return -MATE_SCORE + ply
+        return 0
+
+    @staticmethod
+    def ordered_moves(node, captures_only: bool = False, all_promotions: bool = False) -> list:
+        """Returns the (from_square, to_square, promotion) moves of `node`, the most promising first.
+
+        Captures come first, the most valuable piece taken by the least valuable piece first(MVV-LVA). A pawn
+        reaching the last rank becomes a queen or a knight(a rook or a bishop is never better than a queen to
+        win material), or any of the four if `all_promotions`(e.g. a rook mates and a queen stalemates).
+        """
+        moves = []
+        for from_square, to_square in node.legal_moves():
+            piece = node.pieces[node.get_piece_on_square(from_square)]
+            target = node.get_piece_on_square(to_square)
+            if target:
+                order = 10 * PIECE_VALUES[node.pieces[target].name] - PIECE_VALUES[piece.name]
+            elif piece.name == 'pawn' and from_square[0] != to_square[0]:  # en passant
+                order = 10 * PIECE_VALUES['pawn'] - PIECE_VALUES['pawn']
+            elif captures_only:
+                continue
+            else:
+                order = -PIECE_VALUES['queen']
+
+            if piece.name == 'pawn' and to_square[1] in '18':
+                moves.append((order + PIECE_VALUES['queen'], (from_square, to_square, 'queen')))
+                if all_promotions:
+                    moves.extend((order, (from_square, to_square, name)) for name in ('rook', 'bishop', 'knight'))
+                elif not captures_only:
+                    moves.append((order, (from_square, to_square, 'knight')))
+            else:
+                moves.append((order, (from_square, to_square, None)))
+
+        moves.sort(key=lambda ordered_move: -ordered_move[0])
+        return [move for _, move in moves]
+
+    @staticmethod
+    def play(node, move):
+        """Returns a copy of `node` with `move` played"""
+        from_square, to_square, promotion = move
+        child = node.copy(SearchNode)
+        item = child.get_piece_on_square(from_square)
+        child.make_move(item, child.pieces[item], to_square, promotion)
+        return child
+
+    def report(self, depth: int, score: int):
+        time_ms = max(1, int((time.perf_counter() - self.start) * 1000))
+        mate = None
+        if abs(score) >= MATE_SCORE - MAX_DEPTH:
+            plies = MATE_SCORE - abs(score)
+            mate = (plies + 1) // 2 if score > 0 else -(plies // 2)
+
+        logger.debug('depth %d score %d nodes %d in %d ms', depth, score, self.nodes, time_ms)
+        if self.info is not None:
+            self.info({'depth': depth, 'score': score, 'mate': mate, 'nodes': self.nodes, 'time_ms': time_ms,
+                       'nps': self.nodes * 1000 // time_ms, 'pv': self.pv})
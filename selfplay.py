@@ -0,0 +1,148 @@
+"""Plays games of the search against itself and writes their positions as training data for an evaluation.
+
+    python selfplay.py OUTPUT_DIRECTORY [--positions N] [--workers N] [--depth D] [--random-plies P]
+
+Every position before a move is written to three `.npy` files of OUTPUT_DIRECTORY, row i being the same position:
+
+    planes.npy    uint8 (N, 12, 8, 8): one plane per piece type(PLANE_SYMBOLS), [rank - 1][file] is 1 where it stands
+    features.npy  uint8 (N, 5): white to move and the castling rights K, Q, k, q(FEATURES)
+    outcomes.npy  int8 (N,): result of the game for white, 1 won, 0 drawn, -1 lost
+
+The files are allocated for N positions up front and filled through `np.memmap` as the games come back from the
+worker processes, a game at a time(the positions are never pickled one by one). The first plies of a game are
+random moves, so the games differ, then both sides play the best move of a `depth` search.
+"""
+import argparse
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from fen import STARTING_FEN, castling_rights, game_from_fen
+from game import parse_uci_move
+from instrumentation import get_logger
+from position import square_index
+from search import Search
+
+logger = get_logger('selfplay')
+
+PLANE_SYMBOLS = 'PNBRQKpnbrqk'  # FEN letter of the pieces of each plane
+# key: FEN letter of a piece, value: its plane
+PLANES = {symbol: plane for plane, symbol in enumerate(PLANE_SYMBOLS)}
+FEATURES = ('white_to_move', 'K', 'Q', 'k', 'q')
+MAX_PLIES = 300  # halfmoves after which a game is drawn
+RANDOM_PLIES = 8  # random moves at the start of a game
+DEPTH = 1  # depth of the search playing the other moves
+
+
+def encode_position(game, planes, features):
+    """Writes the position of `game` to `planes`(12, 8, 8) and `features`(5), both zeroed"""
+    flat = planes.reshape(12, 64)
+    for piece in game.pieces.values():
+        flat[PLANES[piece.symbol], square_index(piece.current_square)] = 1
+
+    features[0] = game.white_turn
+    rights = castling_rights(game)
+    for index, letter in enumerate(FEATURES[1:], 1):
+        features[index] = letter in rights
+
+
+def choose_move(game, generator: random.Random, plies: int, depth: int, random_plies: int):
+    """Returns the (from_square, to_square, promotion) move played in `game`"""
+    if plies < random_plies:
+        from_square, to_square = generator.choice(game.legal_moves())
+        return from_square, to_square, 'queen'  # ignored unless a pawn reaches the last rank
+
+    best_move, _ = Search(game).run(depth=depth)
+    return parse_uci_move(best_move)
+
+
+def play_game(seed: int, depth: int = DEPTH, random_plies: int = RANDOM_PLIES, max_plies: int = MAX_PLIES):
+    """Plays one game in a worker process.
+
+    :return: (planes, features, outcomes) of its positions, one row per position
+    """
+    generator = random.Random(seed)
+    game = game_from_fen(STARTING_FEN)
+    planes = np.zeros((max_plies, 12, 8, 8), dtype=np.uint8)
+    features = np.zeros((max_plies, len(FEATURES)), dtype=np.uint8)
+
+    plies = 0
+    while not game.game_state and plies < max_plies:
+        encode_position(game, planes[plies], features[plies])
+        game.play_move(*choose_move(game, generator, plies, depth, random_plies))
+        plies += 1
+
+    outcome = {'white': 1, 'black': -1}.get(game.won, 0)  # a game reaching max_plies is a draw
+    logger.debug('game %d: %s after %d plies', seed, game.game_state or 'max-plies', plies)
+    return planes[:plies], features[:plies], np.full(plies, outcome, dtype=np.int8)
+
+
+def open_outputs(directory: str, positions: int) -> dict:
+    """Creates the `.npy` files of `positions` rows in `directory` and returns dict where key: name of the file,
+    value: its memmap"""
+    os.makedirs(directory, exist_ok=True)
+    shapes = {'planes': ((positions, 12, 8, 8), np.uint8), 'features': ((positions, len(FEATURES)), np.uint8),
+              'outcomes': ((positions,), np.int8)}
+    return {name: np.lib.format.open_memmap(os.path.join(directory, f'{name}.npy'), mode='w+', dtype=dtype,
+                                            shape=shape)
+            for name, (shape, dtype) in shapes.items()}
+
+
+def generate(directory: str, positions: int, workers: int = None, depth: int = DEPTH,
+             random_plies: int = RANDOM_PLIES, seed: int = 0) -> dict:
+    """Plays games in `workers` processes until `positions` positions are written to `directory`.
+
+    The positions of the last game that do not fit are dropped. Returns dict with the games played, the positions
+    written and the seconds it took.
+    """
+    workers = workers or os.cpu_count()
+    outputs = open_outputs(directory, positions)
+    written = games = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # a game more than the workers is queued, so a worker never waits for the writes
+        running = {executor.submit(play_game, seed + index, depth, random_plies) for index in range(workers + 1)}
+        next_seed = seed + workers + 1
+        while written < positions:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                arrays = future.result()
+                count = min(len(arrays[0]), positions - written)
+                for output, array in zip(outputs.values(), arrays):
+                    output[written:written + count] = array[:count]
+                written += count
+                games += 1
+                if written < positions:
+                    running.add(executor.submit(play_game, next_seed, depth, random_plies))
+                    next_seed += 1
+            logger.info('%d games, %d/%d positions', games, written, positions)
+
+        for output in outputs.values():
+            output.flush()
+        seconds = time.perf_counter() - start
+        for future in running:
+            future.cancel()  # the games already running still finish, their positions are not needed
+
+    return {'games': games, 'positions': written, 'seconds': seconds, 'workers': workers}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Writes the positions of self-play games as training data')
+    parser.add_argument('directory', help='directory the .npy files are written to')
+    parser.add_argument('--positions', type=int, default=10000)
+    parser.add_argument('--workers', type=int, help='processes playing games(the number of cores by default)')
+    parser.add_argument('--depth', type=int, default=DEPTH)
+    parser.add_argument('--random-plies', type=int, default=RANDOM_PLIES)
+    parser.add_argument('--seed', type=int, default=0)
+    arguments = parser.parse_args()
+
+    stats = generate(arguments.directory, arguments.positions, arguments.workers, arguments.depth,
+                     arguments.random_plies, arguments.seed)
+    rate = stats['positions'] / stats['seconds']
+    cores = min(stats['workers'], os.cpu_count())  # more workers than cores share them
+    print(f'{stats["positions"]} positions of {stats["games"]} games in {stats["seconds"]:.1f} s')
+    print(f'{rate:.0f} positions per second, {rate / cores:.0f} per core({stats["workers"]} workers, {cores} cores)')
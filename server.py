@@ -0,0 +1,215 @@
+"""Hosts many games at the same time for remote players, over a local TCP or Unix socket.
+
+    python server.py [--host HOST] [--port PORT] [--unix PATH] [--journal DIRECTORY]
+
+The protocol is one command per line and one reply per command:
+
+    NEW                     -> OK <game_id>
+    MOVE <game_id> <move>   -> OK <state>                the move in UCI notation(e.g. e2e4, e7e8q)
+    LEGAL <game_id>         -> OK <move> <move> ...      the moves the player to move can play
+    STATE <game_id>         -> OK <player to move> <state>
+    CLOSE <game_id>         -> OK
+    WATCH <game_id>         -> OK, then the snapshot and the moves of the game(see `broadcast`)
+
+<state> is playing, checkmate, stalemate or the reason of a draw(repetition, fifty-moves or insufficient-material).
+A pawn reaching the last rank without a promotion letter becomes a queen. A command that cannot be played is
+answered with ERR <reason>.
+
+With --journal, the moves of every game are written to a journal in DIRECTORY and the games in progress are
+resumed when the server starts again(see `journal`).
+"""
+import argparse
+import asyncio
+import inspect
+import itertools
+import os
+
+from broadcast import StreamSpectator, WatchedGame
+from game import parse_uci_move, uci_move
+from instrumentation import configure_logging, get_logger
+from journal import Journal, resume_games
+
+logger = get_logger('server')
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 7450
+
+
+class GameServer:
+    """Keeps the games of every client and plays the moves they send.
+
+    The games are headless(see `game.Game`) and only touched from the event loop, so no locks are needed.
+    The rules are the ones of the GUI: a move is refused if it is not the turn of its piece(`white_turn`) or
+    the square is not in `generate_correct_piece_moves` of the piece.
+    """
+
+    def __init__(self, journal: Journal = None):
+        self.journal = journal
+        self.games = {}  # key: game id, value: Game
+        if journal is not None:
+            self.games = resume_games(journal, WatchedGame)
+            logger.info('resumed %d games', len(self.games))
+        self.game_ids = itertools.count(max((game_id for game_id in self.games if isinstance(game_id, int)),
+                                            default=0) + 1)
+        self.commands = {
+            'NEW': self.new_game,
+            'MOVE': self.move,
+            'LEGAL': self.legal,
+            'STATE': self.state,
+            'CLOSE': self.close_game,
+        }
+
+    def handle_line(self, line: str) -> str:
+        """Runs one command line and returns the reply line(without the new line)"""
+        words = line.split()
+        if not words:
+            return 'ERR empty command'
+
+        command = self.commands.get(words[0].upper())
+        if command is None:
+            return f'ERR unknown command {words[0]}'
+
+        try:
+            inspect.signature(command).bind(*words[1:])
+        except TypeError:  # wrong number of arguments
+            return f'ERR bad arguments for {words[0].upper()}'
+
+        try:
+            return command(*words[1:])
+        except Exception:  # a bug of the server, the client may go on
+            logger.exception('%r failed', line)
+            return f'ERR internal error in {words[0].upper()}'
+
+    def get_game(self, game_id: str):
+        """Returns the game `game_id` or None if there is no such game"""
+        return self.games.get(int(game_id)) if game_id.isdigit() else None
+
+    def new_game(self) -> str:
+        game_id = next(self.game_ids)
+        game = self.games[game_id] = WatchedGame()
+        if self.journal is not None:
+            game.journal = self.journal.open(game_id)
+        logger.debug('game %d started', game_id)
+        return f'OK {game_id}'
+
+    def move(self, game_id: str, move: str) -> str:
+        game = self.get_game(game_id)
+        if game is None:
+            return f'ERR no game {game_id}'
+
+        parsed = parse_uci_move(move)
+        if parsed is None:
+            return f'ERR bad move {move}'
+
+        from_square, to_square, promotion = parsed
+        if not game.play_move(from_square, to_square, promotion or 'queen'):
+            return f'ERR illegal move {move}'
+
+        return f'OK {game.game_state or "playing"}'
+
+    def legal(self, game_id: str) -> str:
+        game = self.get_game(game_id)
+        if game is None:
+            return f'ERR no game {game_id}'
+
+        return ' '.join(['OK'] + [uci_move(from_square, to_square) for from_square, to_square in game.legal_moves()])
+
+    def state(self, game_id: str) -> str:
+        game = self.get_game(game_id)
+        if game is None:
+            return f'ERR no game {game_id}'
+
+        return f'OK {"white" if game.white_turn else "black"} {game.game_state or "playing"}'
+
+    def close_game(self, game_id: str) -> str:
+        game = self.get_game(game_id)
+        if game is None:
+            return f'ERR no game {game_id}'
+
+        del self.games[int(game_id)]
+        if self.journal is not None:
+            self.journal.remove(int(game_id))
+        return 'OK'
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answers the commands of one client until it disconnects.
+
+        After WATCH the client is a spectator, the game is sent to it until it disconnects.
+        """
+        spectator = StreamSpectator(writer)
+        watched = []
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                words = line.decode(errors='replace').split()
+                if words and words[0].upper() == 'WATCH':
+                    game = self.get_game(words[1]) if len(words) == 2 else None
+                    if game is None:
+                        reply = 'ERR bad arguments for WATCH' if len(words) != 2 else f'ERR no game {words[1]}'
+                    else:
+                        writer.write(b'OK\n')
+                        game.watch(spectator)
+                        watched.append(game)
+                        continue
+                else:
+                    reply = self.handle_line(' '.join(words))
+
+                writer.write(reply.encode() + b'\n')
+                await writer.drain()
+        except ConnectionError as error:
+            logger.debug('client lost: %s', error)
+        finally:
+            for game in watched:
+                game.channel.remove(spectator)
+            writer.close()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, path: str = None):
+        """Starts listening on the Unix socket `path` if it is given, else on (host, port)"""
+        if path:
+            if os.path.exists(path):
+                os.remove(path)
+            server = await asyncio.start_unix_server(self.handle_client, path=path)
+            logger.info('listening on %s', path)
+        else:
+            server = await asyncio.start_server(self.handle_client, host=host, port=port)
+            logger.info('listening on %s:%d', host, port)
+
+        if self.journal is not None:
+            asyncio.get_running_loop().create_task(self.sync_journal())
+        return server
+
+    async def sync_journal(self):
+        """Syncs the journal regularly, so the last moves are synced even when no other move is played"""
+        while True:
+            await asyncio.sleep(self.journal.sync_interval)
+            if self.journal.dirty:
+                self.journal.sync()
+
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, path: str = None, journal: Journal = None):
+    """Runs a GameServer until the process is stopped"""
+    server = await GameServer(journal).start(host, port, path)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Hosts chess games over a local socket')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', help='path of a Unix socket to listen on instead of TCP')
+    parser.add_argument('--journal', help='directory of the journals of the games')
+    arguments = parser.parse_args()
+
+    configure_logging()
+    game_journal = Journal(arguments.journal) if arguments.journal else None
+    try:
+        asyncio.run(serve(arguments.host, arguments.port, arguments.unix, game_journal))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if game_journal is not None:
+            game_journal.close()
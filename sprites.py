@@ -0,0 +1,125 @@
+"""Sprite atlas of the chess pieces: one image holding every piece and a small JSON index of where each piece is.
+
+Build the atlas from a directory of piece images named `<piece>_<color>.png`(e.g. king_white.png) with:
+
+    python sprites.py build [source_directory] [atlas_name]
+
+which writes `<atlas_name>.png` and `<atlas_name>.json`. Themed piece sets can be shipped as those two files.
+"""
+import json
+import os
+import sys
+
+from PIL import Image
+
+from instrumentation import get_logger
+
+logger = get_logger('sprites')
+
+PIECES_DIRECTORY = 'chess_pieces'
+DEFAULT_ATLAS = 'sprites/classic'
+
+PIECE_NAMES = ('king', 'queen', 'rook', 'bishop', 'knight', 'pawn')
+COLORS = ('white', 'black')
+
+
+def parse_sprite_name(file_name: str):
+    """Returns (name, color) of a piece image file name like 'king_white.png' or None if it is not a piece"""
+    stem, extension = os.path.splitext(file_name)
+    if extension.lower() != '.png' or stem.count('_') != 1:
+        return None
+
+    name, color = stem.split('_')
+    if name not in PIECE_NAMES or color not in COLORS:
+        return None
+    return name, color
+
+
+def load_directory(directory: str = PIECES_DIRECTORY) -> dict:
+    """Loads every piece image of `directory`, one file at a time.
+
+    :return: dict where key: (name, color), value: PIL image
+    """
+    sprites = {}
+    for file_name in sorted(os.listdir(directory)):
+        key = parse_sprite_name(file_name)
+        if key:
+            image = Image.open(os.path.join(directory, file_name))
+            image.load()
+            sprites[key] = image
+
+    return sprites
+
+
+def build_atlas(directory: str = PIECES_DIRECTORY, atlas: str = DEFAULT_ATLAS) -> dict:
+    """Packs the piece images of `directory` in one image(a row per color) and writes the atlas files.
+
+    :return: the index of the atlas
+    """
+    sprites = load_directory(directory)
+    width = max(image.width for image in sprites.values())
+    height = max(image.height for image in sprites.values())
+
+    sheet = Image.new('RGBA', (width * len(PIECE_NAMES), height * len(COLORS)), (0, 0, 0, 0))
+    boxes = {}
+    for row, color in enumerate(COLORS):
+        for column, name in enumerate(PIECE_NAMES):
+            if (name, color) not in sprites:
+                continue
+            x0, y0 = column * width, row * height
+            image = sprites[(name, color)]
+            sheet.paste(image.convert('RGBA'), (x0, y0))
+            boxes[f'{name}_{color}'] = [x0, y0, x0 + image.width, y0 + image.height]
+
+    index = {'image': os.path.basename(atlas) + '.png', 'sprites': boxes}
+
+    os.makedirs(os.path.dirname(atlas) or '.', exist_ok=True)
+    sheet.save(atlas + '.png', optimize=True)
+    with open(atlas + '.json', 'w') as file:
+        json.dump(index, file, indent=2)
+
+    return index
+
+
+def load_atlas(atlas: str = DEFAULT_ATLAS) -> dict:
+    """Loads the atlas image with a single decode and crops the pieces from it in memory.
+
+    :return: dict where key: (name, color), value: PIL image
+    """
+    with open(atlas + '.json') as file:
+        index = json.load(file)
+
+    sheet = Image.open(os.path.join(os.path.dirname(atlas), index['image']))
+    sheet.load()
+
+    sprites = {}
+    for sprite_name, box in index['sprites'].items():
+        name, color = sprite_name.split('_')
+        sprites[(name, color)] = sheet.crop(tuple(box))
+
+    return sprites
+
+
+def load_sprites(atlas: str = DEFAULT_ATLAS, directory: str = PIECES_DIRECTORY) -> dict:
+    """Loads the piece images from the atlas, or from the directory of piece images if there is no atlas.
+
+    :return: dict where key: (name, color), value: PIL image
+    """
+    if os.path.exists(atlas + '.json'):
+        try:
+            return load_atlas(atlas)
+        except (OSError, ValueError, KeyError) as error:
+            logger.warning('cannot load the sprite atlas %s: %s', atlas, error)
+
+    return load_directory(directory)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] != 'build':
+        print(__doc__)
+        sys.exit(1)
+
+    source = sys.argv[2] if len(sys.argv) > 2 else PIECES_DIRECTORY
+    output = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_ATLAS
+    built = build_atlas(source, output)
+    print(f"{output}.png: {len(built['sprites'])} sprites")
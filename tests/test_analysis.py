@@ -0,0 +1,28 @@
+import pytest
+
+from analysis import BlunderCheck, TacticalSearch
+from fen import game_from_fen
+
+# black to move after 1. e4 e5 2. Qh5 Nc6 3. Bc4, Qxf7# is threatened
+SCHOLARS_MATE = 'r1bqkbnr/pppp1ppp/2n5/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR b KQkq - 3 3'
+
+
+@pytest.mark.parametrize('move', ['g8f6', 'a7a6'])
+def test_blunder_into_checkmate(move):
+    result = TacticalSearch(game_from_fen(SCHOLARS_MATE)).check(move, budget_ms=5000)
+    assert result['annotation'] == '??'
+    assert result['complete']
+
+
+def test_good_move():
+    result = TacticalSearch(game_from_fen(SCHOLARS_MATE)).check('g7g6', budget_ms=5000)
+    assert result['annotation'] == ''
+    assert result['loss'] < 100
+
+
+def test_budget_is_kept():
+    check = BlunderCheck(budget_ms=1)
+    result = check.submit(TacticalSearch(game_from_fen(SCHOLARS_MATE)), 'g8f6').result(timeout=5)
+    check.close()
+    assert not result['complete']
+    assert result['cpu_ns'] > 0
@@ -0,0 +1,70 @@
+from animation import Animator, Tween
+
+
+class Canvas:
+    """Keeps the item positions and the pending `after` callbacks, which the test runs itself"""
+
+    def __init__(self):
+        self.positions = {}
+        self.timers = {}
+        self.next_id = 0
+
+    def coords(self, item, *position):
+        if position:
+            self.positions[item] = list(position)
+        return self.positions[item]
+
+    def after(self, _, callback):
+        self.next_id += 1
+        self.timers[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        del self.timers[after_id]
+
+    def run_timers(self):
+        timers, self.timers = self.timers, {}
+        for callback in timers.values():
+            callback()
+
+
+def test_tween_eases_to_the_end():
+    tween = Tween(1, (0, 0), (100, 0), start_time=10, duration=1)
+    assert tween.position(10) == ((0, 0), False)
+    (x, _), done = tween.position(10.5)
+    assert x > 50 and not done
+    assert tween.position(12) == ((100, 0), True)
+
+
+def test_items_share_one_timer():
+    canvas = Canvas()
+    canvas.positions = {1: [0, 0], 2: [10, 10]}
+    animator = Animator(canvas, duration_ms=10_000)
+    animator.animate(1, 50, 50)
+    animator.animate(2, 60, 60)
+    assert animator.running
+    assert len(canvas.timers) == 1
+
+    canvas.run_timers()
+    assert len(canvas.timers) == 1
+    assert animator.frames == 1
+
+
+def test_finish_puts_items_at_their_end():
+    canvas = Canvas()
+    canvas.positions = {1: [0, 0]}
+    animator = Animator(canvas, duration_ms=10_000)
+    animator.animate(1, 50, 70)
+    animator.finish()
+    assert canvas.positions[1] == [50, 70]
+    assert not animator.running
+    assert canvas.timers == {}
+
+
+def test_no_duration_moves_straight_away():
+    canvas = Canvas()
+    canvas.positions = {1: [0, 0]}
+    animator = Animator(canvas)
+    animator.animate(1, 5, 5, duration_ms=0)
+    assert canvas.positions[1] == [5, 5]
+    assert canvas.timers == {}
@@ -0,0 +1,26 @@
+import pytest
+
+import annotate
+
+SCHOLARS_MATE = ({'Event': 'test'}, ['e4', 'e5', 'Qh5', 'Nc6', 'Bc4', 'Nf6', 'Qxf7#'], '1-0')
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    annotate.cache.clear()
+
+
+def test_blunder():
+    annotated = annotate.annotate_game(SCHOLARS_MATE, {'depth': 2})
+    assert 'Nf6?? {#1, best g6}' in annotated['pgn']
+    assert annotated['annotations']['??'] == 1
+    assert annotated['losses']['black'][-1] == annotate.MAX_LOSS_CP
+    assert annotated['unannotated'] == 0
+
+
+def test_search_stopped_before_depth_one():
+    annotated = annotate.annotate_game(SCHOLARS_MATE, {'nodes': 5})
+    assert annotated['unannotated'] == len(SCHOLARS_MATE[1])
+    assert annotated['losses'] == {'white': [], 'black': []}
+    assert '1. e4 {not searched}' in annotated['pgn']
+    assert annotated['pgn'].rstrip().endswith('1-0')
@@ -0,0 +1,49 @@
+from assets import AssetCache
+
+
+class Widget:
+    """Runs the `after` and `after_idle` callbacks straight away, like an idle event loop"""
+
+    def after(self, _, callback, *args):
+        callback(*args)
+
+    def after_idle(self, callback, *args):
+        callback(*args)
+
+
+def counting_loader(calls: list, name: str):
+    def load():
+        calls.append(name)
+        return name.upper()
+    return load
+
+
+def test_asset_is_loaded_once():
+    calls = []
+    cache = AssetCache()
+    cache.register('board', counting_loader(calls, 'board'))
+    assert calls == []
+
+    assert cache.get('board') == 'BOARD'
+    assert cache.get('board') == 'BOARD'
+    assert calls == ['board']
+
+
+def test_first_paint_asset_is_loaded_when_registered():
+    calls = []
+    cache = AssetCache()
+    cache.register('pieces', counting_loader(calls, 'pieces'), deferred=False)
+    assert calls == ['pieces']
+    assert cache.deferred == []
+
+
+def test_deferred_assets_are_loaded_when_idle():
+    calls = []
+    cache = AssetCache()
+    for name in ('icons', 'sounds', 'themes'):
+        cache.register(name, counting_loader(calls, name))
+    cache.get('sounds')
+
+    cache.load_deferred(Widget())
+    assert calls == ['sounds', 'icons', 'themes']
+    assert cache.deferred == []
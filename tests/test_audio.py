@@ -0,0 +1,40 @@
+import array
+
+import numpy
+import pytest
+
+import audio
+from audio import AudioPlayer, MixingSink, NullSink, Sound, SoundBank
+
+
+def test_missing_file_falls_back_to_the_move_sound():
+    move = audio.silence(0.1)
+    bank = SoundBank({'move': 'sounds/move5.mp3', 'other': 'sounds/missing.mp3'}, sounds={'move': move})
+    bank.decoded['sounds/move5.mp3'] = move
+    assert bank.load('other') is move
+
+
+def test_player_drops_sounds_over_max_voices():
+    sink = NullSink()
+    player = AudioPlayer(SoundBank(sounds={'move': audio.silence(1)}), sink, max_voices=2)
+    assert [player.play('move') for _ in range(3)] == [True, True, False]
+    assert player.dropped == 1
+
+
+@pytest.fixture
+def mixer(monkeypatch):
+    monkeypatch.setattr(audio, 'numpy', numpy)
+    sink = MixingSink.__new__(MixingSink)  # without a sound device
+    sink.voices = []
+    sink.lock = audio.threading.Lock()
+    stream = sink._mix()
+    next(stream)
+    return sink, stream
+
+
+def test_overlapping_sounds_are_mixed_and_clipped(mixer):
+    sink, stream = mixer
+    sink.play('a', Sound(array.array('h', [1000, -2000, 30000, 5])))
+    sink.play('b', Sound(array.array('h', [10, 20, 30000])))
+    assert list(stream.send(2)) == [1010, -1980, 32767, 5]
+    assert list(stream.send(1)) == [0, 0]
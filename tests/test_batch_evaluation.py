@@ -0,0 +1,19 @@
+import numpy as np
+
+from batch_evaluation import evaluate_codes, evaluate_planes, position_codes, random_positions
+from evaluation import evaluate
+from selfplay import FEATURES, encode_position
+
+
+def test_batch_scores_are_those_of_evaluate():
+    positions = random_positions(8, seed=3)
+    planes = np.zeros((len(positions), 12, 8, 8), dtype=np.uint8)
+    for game, rows in zip(positions, planes):
+        encode_position(game, rows, np.zeros(len(FEATURES), dtype=np.uint8))
+    codes = np.array([position_codes(game) for game in positions])
+    expected = [evaluate(game) for game in positions]
+
+    assert list(evaluate_planes(planes)) == expected
+    assert list(evaluate_codes(codes)) == expected
+    assert evaluate_planes(planes[0]) == expected[0]
+    assert evaluate_codes(codes[0]) == expected[0]
@@ -0,0 +1,43 @@
+import asyncio
+
+from broadcast import MemorySpectator, WatchedGame
+
+
+def messages(spectator):
+    return [line.split() for data in spectator.received for line in data.decode().splitlines()]
+
+
+def watch(moves_before, moves_after, bandwidth=None, max_buffer=None):
+    """Returns the messages a spectator joining after `moves_before`(played in the same tick) gets, and the game"""
+    async def run():
+        game = WatchedGame()
+        late = MemorySpectator()
+        game.watch(MemorySpectator())
+        for move in moves_before:
+            game.play_move(move[:2], move[2:4])
+        game.watch(late)
+        if max_buffer:
+            game.channel.max_buffer = max_buffer
+        late.bandwidth = bandwidth
+        for move in moves_after:
+            game.play_move(move[:2], move[2:4])
+            await asyncio.sleep(0)
+            late.drain()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        return messages(late), game
+    return asyncio.run(run())
+
+
+def test_snapshot_holds_the_queued_deltas():
+    # g1f3 is played in the tick the spectator joins, so the snapshot holds it
+    received, game = watch(['e2e4', 'e7e5'], ['g1f3', 'b8c6'])
+    assert [message[:2] for message in received] == [['S', '3'], ['D', '4']]
+    assert received[1][2:] == ['b8c6']
+
+
+def test_seq_only_increases():
+    received, game = watch(['e2e4'], ['e7e5', 'g1f3', 'b8c6', 'f1c4', 'g8f6'], bandwidth=4, max_buffer=40)
+    seqs = [int(message[1]) for message in received]
+    assert received[0][0] == 'S'
+    assert seqs == sorted(set(seqs))
@@ -0,0 +1,54 @@
+import pytest
+
+from computer import ComputerPlayer
+from fen import STARTING_FEN, game_from_fen
+
+
+@pytest.fixture
+def computer():
+    player = ComputerPlayer('white', movetime_ms=100)
+    yield player
+    player.close()
+
+
+def test_think_returns_a_legal_move(computer):
+    game = game_from_fen(STARTING_FEN)
+    best_move, pv = computer.think(game).result(timeout=10)
+    assert (best_move[:2], best_move[2:4]) in game.legal_moves()
+    assert pv[0] == best_move
+
+
+def test_ponder_hit_keeps_the_search(computer):
+    game = game_from_fen(STARTING_FEN)
+    computer.played(['e2e4', 'e7e5'])
+    game.play_move('e2', 'e4')
+    computer.ponder(game)
+    assert computer.predicted_move == 'e7e5'
+
+    future = computer.future
+    game.play_move('e7', 'e5')
+    reply, hit = computer.reply(game, 'e7e5')
+    assert hit
+    assert reply is future
+    assert reply.result(timeout=10)[0] is not None
+
+
+def test_ponder_miss_starts_a_new_search(computer):
+    game = game_from_fen(STARTING_FEN)
+    computer.played(['e2e4', 'e7e5'])
+    game.play_move('e2', 'e4')
+    computer.ponder(game)
+    pondering = computer.search
+
+    game.play_move('c7', 'c5')
+    reply, hit = computer.reply(game, 'c7c5')
+    assert not hit
+    assert pondering.stopped.is_set()
+    assert reply.result(timeout=10)[0] is not None
+
+
+def test_no_pondering_without_an_expected_reply(computer):
+    game = game_from_fen(STARTING_FEN)
+    game.play_move('e2', 'e4')
+    computer.ponder(game)
+    assert computer.future is None
@@ -0,0 +1,55 @@
+from fen import game_from_fen, STARTING_FEN
+from search import MATE_SCORE, Search
+
+
+def play(game, moves):
+    for move in moves.split():
+        assert game.play_move(move[:2], move[2:4])
+    return game
+
+
+def test_repetition():
+    game = play(game_from_fen(STARTING_FEN), 'g1f3 g8f6 f3g1 f6g8 g1f3 g8f6 f3g1')
+    assert game.game_state is None
+    play(game, 'f6g8')
+    assert game.game_state == 'repetition'
+    assert game.won is None
+
+
+def test_fifty_moves():
+    game = play(game_from_fen('k7/8/1K6/8/8/8/8/7R w - - 99 1'), 'h1h2')
+    assert game.game_state == 'fifty-moves'
+
+
+def test_checkmate_on_the_hundredth_halfmove():
+    game = play(game_from_fen('k7/8/1K6/8/8/8/8/7R w - - 99 1'), 'h1h8')
+    assert game.halfmove_clock == 100
+    assert game.game_state == 'checkmate'
+    assert game.won == 'white'
+
+
+def test_search_finds_checkmate_on_the_hundredth_halfmove():
+    best_move, score = Search(game_from_fen('k7/8/1K6/8/8/8/8/7R w - - 99 1')).run(depth=2)
+    assert best_move == 'h1h8'
+    assert score == MATE_SCORE - 1
+
+
+def test_insufficient_material():
+    game = play(game_from_fen('4k3/8/8/8/8/8/8/3BK3 w - - 0 1'), 'd1e2')
+    assert game.game_state == 'insufficient-material'
+
+
+def test_enpassant_capture_is_hashed():
+    game = play(game_from_fen('4k3/8/8/8/3p4/8/4P3/4K3 w - - 0 1'), 'e2e4')
+    with_capture = game.position_hash
+    assert with_capture == game_from_fen('4k3/8/8/8/3pP3/8/8/4K3 b - e3 0 1').position_hash
+
+    # the same pieces without the en passant capture are another position
+    play(game, 'e8e7 e1e2 e7e8 e2e1')
+    assert game.position_hash != with_capture
+    assert game.position_hash == game_from_fen('4k3/8/8/8/3pP3/8/8/4K3 b - - 0 1').position_hash
+
+
+def test_unusable_enpassant_right_is_not_hashed():
+    game = play(game_from_fen('4k3/8/8/8/8/8/4P3/4K3 w - - 0 1'), 'e2e4')
+    assert game.position_hash == game_from_fen('4k3/8/8/8/4P3/8/8/4K3 b - - 0 1').position_hash
@@ -0,0 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from epd import parse_epd, run_suite, solve
+
+MATE = 'k7/8/1K6/8/8/8/8/7R w - - bm Rh8#; am Rh7; id "mate in 1";'
+
+
+def test_parse_epd():
+    position = parse_epd('4k3/8/8/8/8/8/8/4K3 b - - am Kd7 Kf7; id "two words"; hmvc 12; fmvn 40;')
+    assert position['fen'] == '4k3/8/8/8/8/8/8/4K3 b - - 12 40'
+    assert position['opcodes']['am'] == ['Kd7', 'Kf7']
+    assert position['opcodes']['id'] == ['two words']
+
+
+def test_solve():
+    result = solve(parse_epd(MATE), {'depth': 2})
+    assert result['id'] == 'mate in 1'
+    assert result['bm'] == ['h1h8'] and result['am'] == ['h1h7']
+    assert result['solved'] and result['solution_ms'] is not None
+
+
+def test_suite_counts_the_errors():
+    positions = [parse_epd(MATE), parse_epd('4k3/8/8/8/8/8/8/4K3 w - - bm Qh5;')]
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        suite = run_suite(positions, {'depth': 2}, executor)
+    assert (suite['positions'], suite['solved'], suite['errors']) == (2, 1, 1)
+    assert 'not a correct move' in suite['results'][1]['error']
@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from fen import STARTING_FEN, game_from_fen, game_to_fen
+
+
+@pytest.mark.parametrize('fen', [
+    STARTING_FEN,
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+    'r3k2r/8/8/8/8/8/8/R3K2R b Kq - 5 1',
+    '4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1',
+    '4k3/8/8/8/3Pp3/8/8/4K3 b - d3 0 1',
+])
+def test_round_trip(fen):
+    # the move number is counted from the moves the game knows
+    assert game_to_fen(game_from_fen(fen)).split()[:5] == fen.split()[:5]
+
+
+def test_round_trip_of_random_games():
+    generator = random.Random(0)
+    game = game_from_fen(STARTING_FEN)
+    for _ in range(60):
+        legal = game.legal_moves()
+        if not legal:
+            break
+        game.play_move(*generator.choice(legal), 'queen')
+        fen = game_to_fen(game)
+        copy = game_from_fen(fen)
+        assert game_to_fen(copy).split()[:5] == fen.split()[:5]
+        assert sorted(copy.legal_moves()) == sorted(game.legal_moves())
+
+
+@pytest.mark.parametrize('fen', [
+    '',
+    '4k3/8/8/8/8/8/8/4K3',
+    '4k3/8/8/8/8/8/8/4K3 x - - 0 1',
+    '4k3/8/8/8/8/8/4K3 w - - 0 1',
+    '4k3/8/8/8/8/8/8/4K4 w - - 0 1',
+    '4k3/8/8/8/8/8/8/4X3 w - - 0 1',
+    '8/8/8/8/8/8/8/4K3 w - - 0 1',
+    '4k3/8/8/8/8/8/8/4K3 w - e 0 1',
+    '4k3/8/8/8/8/8/8/4K3 w - e3 0 1',
+    '4k3/8/8/8/8/8/8/4K3 w - e6 0 1',
+    '4k3/8/8/3pP3/8/8/8/4K3 w - e6 0 1',
+    'P3k3/8/8/8/8/8/8/4K3 w - - 0 1',
+    '4k3/8/8/8/8/8/8/p3K3 w - - 0 1',
+    '4k3/8/8/8/8/8/8/4K3 w - - x 1',
+])
+def test_malformed_fen_raises_value_error(fen):
+    with pytest.raises(ValueError):
+        game_from_fen(fen)
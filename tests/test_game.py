@@ -0,0 +1,47 @@
+from fen import game_from_fen, game_to_fen
+from game import Game, parse_uci_move, uci_move
+
+
+def test_moves_are_checked():
+    game = Game()
+    assert not game.play_move('e7', 'e5')  # not the turn of black
+    assert not game.play_move('e2', 'e5')
+    assert not game.play_move('e3', 'e4')  # no piece
+    assert game.play_move('e2', 'e4')
+    assert not game.white_turn and game.white_moves == ['e4']
+
+
+def test_promotion_waits_for_the_choice():
+    game = game_from_fen('4k3/1P6/8/8/8/8/8/4K3 w - - 0 1')
+    assert game.play_move('b7', 'b8')
+    assert game.promotion_square == 'b8'
+    assert game.legal_moves() == []
+    assert not game.promote('king')
+    assert game.promote('rook')
+    assert game.promotion_square is None
+    assert game_to_fen(game).split()[0] == '1R2k3/8/8/8/8/8/8/4K3'
+    assert game.game_state is None
+
+
+def test_copy_is_independent():
+    game = Game()
+    game.play_move('e2', 'e4')
+    copied = game.copy()
+    copied.play_move('e7', 'e5')
+    assert game.black_moves == [] and not game.white_turn
+    assert copied.position_hash != game.position_hash
+
+
+def test_new_game():
+    game = Game()
+    start = game.position_hash
+    game.play_move('e2', 'e4')
+    game.new_game()
+    assert game.position_hash == start and game.white_turn and len(game.pieces) == 32
+
+
+def test_uci_moves():
+    assert parse_uci_move('e7e8q') == ('e7', 'e8', 'queen')
+    assert parse_uci_move('e7e8k') is None
+    assert parse_uci_move('i2i4') is None
+    assert uci_move('a7', 'a8', 'knight') == 'a7a8n'
@@ -0,0 +1,29 @@
+import pytest
+
+from board import BoardGeometry
+
+
+@pytest.mark.parametrize('flipped, square, bbox', [
+    (False, 'a8', (0, 0, 50, 50)),
+    (False, 'a1', (0, 350, 50, 400)),
+    (False, 'h1', (350, 350, 400, 400)),
+    (True, 'h1', (0, 0, 50, 50)),
+    (True, 'a8', (350, 350, 400, 400)),
+])
+def test_square_bbox(flipped, square, bbox):
+    assert BoardGeometry(50, flipped).square_bbox(square) == bbox
+
+
+@pytest.mark.parametrize('flipped', [False, True])
+def test_square_at_finds_every_square(flipped):
+    geometry = BoardGeometry(50, flipped)
+    for index in range(64):
+        square = geometry.square_name(index)
+        x, y = geometry.square_center(square)
+        assert geometry.square_at(x, y) == square
+        assert geometry.square_index(square) == index
+
+
+@pytest.mark.parametrize('x, y', [(-1, 10), (10, -1), (400, 10), (10, 400)])
+def test_square_at_outside_the_board(x, y):
+    assert BoardGeometry(50).square_at(x, y) is None
@@ -0,0 +1,43 @@
+import logging
+
+import instrumentation
+from instrumentation import ROOT_LOGGER, Profiler, configure_logging, get_logger, timed
+
+
+def test_hot_method_is_timed_only_once_profiling_is_on(monkeypatch):
+    profiler = Profiler()
+    monkeypatch.setattr(instrumentation, 'profiler', profiler)
+
+    def double(self, value):
+        return 2 * value
+
+    class Rules:
+        twice = timed(hot=True)(double)
+
+    assert Rules.__dict__['twice'] is double
+    profiler.enable()
+    assert Rules.__dict__['twice'] is not double
+    assert Rules().twice(3) == 6
+    assert profiler.report()['double']['count'] == 1
+
+
+def test_logging_stays_off_without_a_level(monkeypatch):
+    monkeypatch.delenv('CHESS_LOG_LEVEL', raising=False)
+    root = logging.getLogger(ROOT_LOGGER)
+    handlers = list(root.handlers)
+    configure_logging()
+    assert root.handlers == handlers
+
+
+def test_logging_level_per_subsystem(monkeypatch):
+    monkeypatch.setenv('CHESS_LOG_LEVEL', 'WARNING,rules=DEBUG')
+    root = logging.getLogger(ROOT_LOGGER)
+    handlers = list(root.handlers)
+    try:
+        configure_logging()
+        assert not get_logger('board').isEnabledFor(logging.INFO)
+        assert get_logger('rules').isEnabledFor(logging.DEBUG)
+    finally:
+        root.handlers = handlers
+        root.setLevel(logging.NOTSET)
+        get_logger('rules').setLevel(logging.NOTSET)
@@ -0,0 +1,50 @@
+from fen import game_to_fen
+from game import Game
+from journal import Journal, resume_games
+
+MOVES = 'e2e4 e7e5 g1f3 b8c6 f1c4 g8f6'
+
+
+def play(game, moves):
+    for move in moves.split():
+        assert game.play_move(move[:2], move[2:4])
+
+
+def test_resume_after_crash(tmp_path):
+    journal = Journal(str(tmp_path))
+    game = Game()
+    game.journal = journal.open(1)
+    play(game, MOVES)
+
+    # the process stops without closing the journal
+    resumed = resume_games(Journal(str(tmp_path)))
+    assert list(resumed) == [1]
+    assert game_to_fen(resumed[1]) == game_to_fen(game)
+
+
+def test_incomplete_line_is_dropped(tmp_path):
+    (tmp_path / '7.journal').write_text('e2e4\ne7e5\ng1f')
+    journal = Journal(str(tmp_path))
+    resumed = resume_games(journal)
+    assert resumed[7].black_moves == ['e5']
+
+    play(resumed[7], 'g1f3')
+    journal.close()
+    assert (tmp_path / '7.journal').read_text() == 'e2e4\ne7e5\ng1f3\n'
+
+
+def test_finished_game_is_not_resumed(tmp_path):
+    journal = Journal(str(tmp_path))
+    game = Game()
+    game.journal = journal.open(2)
+    play(game, 'f2f3 e7e5 g2g4 d8h4')
+    assert game.game_state == 'checkmate'
+    assert resume_games(Journal(str(tmp_path))) == {}
+
+
+def test_sync_clears_the_written_journals(tmp_path):
+    journal = Journal(str(tmp_path), sync_interval_ms=60000)
+    journal.write(3, 'e2e4')
+    assert journal.dirty == {3}
+    journal.sync()
+    assert journal.dirty == set()
@@ -0,0 +1,30 @@
+from epd import parse_epd
+from fen import game_from_fen
+from mate import solve_puzzle
+from search import Search
+
+
+def solve(line):
+    return solve_puzzle(parse_epd(line))
+
+
+def test_unique_mate_in_two():
+    result = solve('kbK5/pp6/1P6/8/8/8/8/R7 w - - dm 2; bm Ra6;')
+    assert result['verdict'] == 'ok'
+    assert result['keys'] == ['Ra6']
+
+
+def test_underpromotion_dual():
+    result = solve('7k/4P1pp/8/8/8/8/8/4K3 w - - dm 1;')
+    assert result['verdict'] == 'several key moves'
+    assert result['keys'] == ['e8=Q', 'e8=R']
+
+
+def test_shorter_mate():
+    assert solve('7k/4P1pp/8/8/8/8/8/4K3 w - - dm 2;')['verdict'] == 'mate in 1 already'
+
+
+def test_every_promotion_of_the_defender():
+    game = game_from_fen('4k3/8/8/8/8/8/p7/4K3 b - - 0 1')
+    promotions = [move[2] for move in Search.ordered_moves(game, all_promotions=True) if move[1] == 'a1']
+    assert sorted(promotions) == ['bishop', 'knight', 'queen', 'rook']
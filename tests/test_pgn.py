@@ -0,0 +1,74 @@
+import io
+
+import pytest
+
+from fen import game_from_fen, STARTING_FEN
+from pgn import game_pgn, parse_san, play_san, read_games, san_move
+from tournament import play_game
+
+
+@pytest.mark.parametrize('fen, move, san', [
+    (STARTING_FEN, ('g1', 'f3', None), 'Nf3'),
+    ('4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1', ('e1', 'g1', None), 'O-O'),
+    ('4k3/8/8/8/8/8/4K3/R6R w - - 0 1', ('a1', 'd1', None), 'Rad1'),
+    ('4k3/8/8/8/R7/8/8/R3K3 w - - 0 1', ('a1', 'a2', None), 'R1a2'),
+    ('4k3/8/8/8/8/8/8/1N2KN2 w - - 0 1', ('b1', 'd2', None), 'Nbd2'),
+    ('3rk3/4P3/8/8/8/8/8/4K3 w - - 0 1', ('e7', 'd8', 'knight'), 'exd8=N'),
+    ('4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1', ('e5', 'd6', None), 'exd6'),
+])
+def test_san(fen, move, san):
+    game = game_from_fen(fen)
+    assert san_move(game, *move) == san
+    assert parse_san(game, san) == move
+
+
+def test_check_and_checkmate_signs():
+    game = game_from_fen(STARTING_FEN)
+    moves = [play_san(game, *parse_san(game, san)) for san in 'e4 e5 Qh5 Nc6 Bc4 Nf6 Qxf7'.split()]
+    assert moves[-1] == 'Qxf7#'
+    game = game_from_fen('4k3/8/8/8/8/8/8/R3K3 w - - 0 1')
+    assert play_san(game, 'a1', 'a8') == 'Ra8+'
+
+
+def test_bad_san():
+    with pytest.raises(ValueError):
+        parse_san(game_from_fen(STARTING_FEN), 'e5')
+
+
+def test_seven_tag_roster_comes_first():
+    pgn = game_pgn({'Event': 'e', 'Termination': 'normal', 'White': 'w', 'Black': 'b', 'Site': '?',
+                    'Date': '????.??.??', 'Round': '1'}, ['e4'], '*')
+    tags = [line.split()[0][1:] for line in pgn.splitlines() if line.startswith('[')]
+    assert tags == ['Event', 'Site', 'Date', 'Round', 'White', 'Black', 'Result', 'Termination']
+
+
+def test_tournament_game_has_the_seven_tags():
+    result = play_game(0, 'e2e4 e7e5', {'name': 'first', 'depth': 1}, {'name': 'second', 'depth': 1}, max_plies=2)
+    headers, moves, _ = next(read_games(io.StringIO(result['pgn'])))
+    assert list(headers)[:7] == ['Event', 'Site', 'Date', 'Round', 'White', 'Black', 'Result']
+    assert headers['Site'] == '?'
+    assert moves[:2] == ['e4', 'e5']
+
+
+def test_read_games():
+    text = '''[Event "one \\"quoted\\""]
+[Result "1-0"]
+
+1. e4 {best by test} e5 (1... c5 2. Nf3 (2. c3)) 2. Nf3 $1 Nc6 ; a comment
+3. Bb5 1-0
+
+[Event "two"]
+
+1. d4 d5 *
+'''
+    games = list(read_games(io.StringIO(text)))
+    assert games[0] == ({'Event': 'one "quoted"', 'Result': '1-0'}, ['e4', 'e5', 'Nf3', 'Nc6', 'Bb5'], '1-0')
+    assert games[1] == ({'Event': 'two'}, ['d4', 'd5'], '*')
+
+
+def test_round_trip_from_fen():
+    fen = '4k3/8/8/8/8/8/4P3/4K3 b - - 0 12'
+    pgn = game_pgn({'Event': 'e'}, ['Kd7', 'e4'], '*', fen)
+    assert '12... Kd7 13. e4 *' in pgn
+    headers, moves, result = next(read_games(io.StringIO(pgn)))
+    assert headers['FEN'] == fen and moves == ['Kd7', 'e4']
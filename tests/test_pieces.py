@@ -0,0 +1,33 @@
+import copy
+import pickle
+
+import pytest
+
+from fen import game_from_fen, game_to_fen
+from pieces import PIECE_CLASSES, create_piece
+
+
+@pytest.mark.parametrize('name', PIECE_CLASSES)
+def test_piece_has_no_dict(name):
+    piece = create_piece(name, 'black')
+    assert not hasattr(piece, '__dict__')
+    with pytest.raises(AttributeError):
+        piece.image = None
+
+
+def test_shared_data_and_own_state():
+    first, second = create_piece('knight', 'white'), create_piece('knight', 'black')
+    assert (first.symbol, second.symbol) == ('N', 'n')
+    assert second.starting_squares == ('b8', 'g8')
+
+    moved = copy.copy(first)
+    moved.move_count = 1
+    assert moved.has_moved and not first.has_moved
+
+
+def test_snapshot_is_picklable():
+    game = game_from_fen('r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1')
+    position = pickle.loads(pickle.dumps(game.snapshot()))
+    assert {piece.symbol for piece in position.pieces.values()} == {'K', 'R', 'k', 'r'}
+    assert position.can_castle(position.pieces[position.get_piece_on_square('e1')])
+    assert game_to_fen(pickle.loads(pickle.dumps(game))) == game_to_fen(game)
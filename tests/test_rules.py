@@ -0,0 +1,54 @@
+import pytest
+
+from fen import STARTING_FEN, game_from_fen
+from game import PROMOTION_PIECES
+from search import SearchNode
+
+
+def perft(node, depth: int) -> int:
+    """Returns the number of move sequences of `depth` plies from `node`, the promotions to each piece counted"""
+    if depth == 0:
+        return 1
+
+    count = 0
+    for from_square, to_square in node.legal_moves():
+        piece = node.pieces[node.get_piece_on_square(from_square)]
+        promotions = PROMOTION_PIECES if piece.name == 'pawn' and to_square[1] in '18' else (None,)
+        for promotion in promotions:
+            child = node.copy(SearchNode)
+            item = child.get_piece_on_square(from_square)
+            child.make_move(item, child.pieces[item], to_square, promotion)
+            count += perft(child, depth - 1)
+    return count
+
+
+# the standard perft test positions and their known counts at depth 1, 2, ...
+@pytest.mark.parametrize('fen, counts', [
+    (STARTING_FEN, [20, 400, 8902]),
+    ('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1', [48, 2039]),
+    ('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1', [14, 191, 2812]),
+    ('r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1', [6, 264, 9467]),
+    ('rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8', [44, 1486]),
+    ('r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10', [46, 2079]),
+])
+def test_perft(fen, counts):
+    game = game_from_fen(fen, SearchNode)
+    assert [perft(game, depth) for depth in range(1, len(counts) + 1)] == counts
+
+
+@pytest.mark.parametrize('fen, move, legal', [
+    ('4k3/8/8/8/8/4n3/4P3/4K3 w - - 0 1', ('e2', 'e4'), False),  # a double step over a piece
+    ('1r2k3/8/8/8/8/8/8/R3K3 w Q - 0 1', ('e1', 'c1'), True),  # b1 is attacked, the King does not cross it
+    ('2r1k3/8/8/8/8/8/8/R3K3 w Q - 0 1', ('e1', 'c1'), False),  # the King would stand on an attacked square
+    ('1r2k3/8/8/8/8/8/8/R3K3 b - - 0 1', ('e8', 'c8'), False),  # no castling right
+    ('r3k3/8/8/8/8/8/8/1R2K3 b q - 0 1', ('e8', 'c8'), True),
+    ('4k3/8/8/8/8/8/4R3/4K2r w - - 0 1', ('e2', 'e1'), False),
+    ('4k3/4r3/8/8/8/8/4R3/4K3 w - - 0 1', ('e2', 'e7'), True),  # a pinned piece takes the pinning piece
+    ('4k3/4r3/8/8/8/8/4R3/4K3 w - - 0 1', ('e2', 'e5'), True),  # and moves along the pin
+    ('4k3/4r3/8/8/8/8/4R3/4K3 w - - 0 1', ('e2', 'd2'), False),
+    ('4k3/8/8/8/1b6/8/3R4/r3K3 w - - 0 1', ('d2', 'd1'), False),  # a pinned piece cannot block a check
+    ('8/8/8/K2pP2r/8/8/8/7k w - d6 0 1', ('e5', 'd6'), False),  # en passant exposing the King on the rank
+    ('8/8/8/2KpP3/8/8/8/7k w - d6 0 1', ('e5', 'd6'), True),  # en passant taking the checking pawn
+])
+def test_moves(fen, move, legal):
+    assert (move in game_from_fen(fen).legal_moves()) == legal
@@ -0,0 +1,33 @@
+import numpy as np
+
+from fen import STARTING_FEN, game_from_fen
+from selfplay import FEATURES, PLANES, encode_position, generate, play_game
+
+
+def test_encode_position():
+    planes = np.zeros((12, 8, 8), dtype=np.uint8)
+    features = np.zeros(len(FEATURES), dtype=np.uint8)
+    encode_position(game_from_fen('4k3/8/8/8/8/8/4P3/R3K3 b Q - 0 1'), planes, features)
+    assert planes[PLANES['P'], 1, 4] == 1  # e2
+    assert planes[PLANES['R'], 0, 0] == 1  # a1
+    assert planes[PLANES['k'], 7, 4] == 1  # e8
+    assert planes.sum() == 4
+    assert list(features) == [0, 0, 1, 0, 0]
+
+
+def test_play_game():
+    planes, features, outcomes = play_game(seed=1, random_plies=4, max_plies=10)
+    assert planes.shape == (10, 12, 8, 8) and features.shape == (10, len(FEATURES)) and outcomes.shape == (10,)
+    start = np.zeros((12, 8, 8), dtype=np.uint8)
+    encode_position(game_from_fen(STARTING_FEN), start, np.zeros(len(FEATURES), dtype=np.uint8))
+    assert (planes[0] == start).all()
+    assert list(features[:2, 0]) == [1, 0]
+    assert (outcomes == 0).all()  # drawn at max_plies
+
+
+def test_generate(tmp_path):
+    summary = generate(str(tmp_path), positions=30, workers=1, random_plies=1000)
+    assert summary['positions'] == 30
+    planes = np.load(tmp_path / 'planes.npy', mmap_mode='r')
+    assert planes.shape == (30, 12, 8, 8)
+    assert (planes.reshape(30, -1).sum(axis=1) >= 2).all()  # at least the two Kings in every row
@@ -0,0 +1,27 @@
+from server import GameServer
+
+
+def test_game():
+    server = GameServer()
+    assert server.handle_line('NEW') == 'OK 1'
+    assert server.handle_line('move 1 e2e4') == 'OK playing'
+    assert server.handle_line('MOVE 1 e2e4') == 'ERR illegal move e2e4'
+    assert server.handle_line('STATE 1') == 'OK black playing'
+    assert server.handle_line('CLOSE 1') == 'OK'
+    assert server.handle_line('STATE 1') == 'ERR no game 1'
+
+
+def test_bad_commands():
+    server = GameServer()
+    assert server.handle_line('') == 'ERR empty command'
+    assert server.handle_line('JUMP 1') == 'ERR unknown command JUMP'
+    assert server.handle_line('NEW 1') == 'ERR bad arguments for NEW'
+    assert server.handle_line('MOVE 1') == 'ERR bad arguments for MOVE'
+
+
+def test_internal_error_is_not_bad_arguments(caplog):
+    server = GameServer()
+    server.handle_line('NEW')
+    server.games[1].play_move = lambda *move: None + 1  # a bug raising TypeError
+    assert server.handle_line('MOVE 1 e2e4') == 'ERR internal error in MOVE'
+    assert "'MOVE 1 e2e4' failed" in caplog.text
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+from PIL import Image
+
+from sprites import build_atlas, load_atlas, load_sprites, parse_sprite_name
+
+
+@pytest.mark.parametrize('file_name, key', [
+    ('king_white.png', ('king', 'white')),
+    ('pawn_black.PNG', ('pawn', 'black')),
+    ('king_white.gif', None),
+    ('king.png', None),
+    ('dragon_white.png', None),
+    ('king_red.png', None),
+])
+def test_parse_sprite_name(file_name, key):
+    assert parse_sprite_name(file_name) == key
+
+
+def test_atlas_holds_every_piece(tmp_path):
+    source = tmp_path / 'pieces'
+    source.mkdir()
+    colors = {'king_white': (255, 0, 0, 255), 'pawn_black': (0, 0, 255, 255), 'queen_black': (0, 255, 0, 255)}
+    for sprite_name, color in colors.items():
+        Image.new('RGBA', (20, 30), color).save(source / f'{sprite_name}.png')
+    (source / 'notes.txt').write_text('not a piece')
+
+    atlas = str(tmp_path / 'atlas' / 'test')
+    index = build_atlas(str(source), atlas)
+    assert sorted(index['sprites']) == sorted(colors)
+    assert os.path.exists(atlas + '.png')
+
+    sprites = load_atlas(atlas)
+    assert set(sprites) == {tuple(sprite_name.split('_')) for sprite_name in colors}
+    for sprite_name, color in colors.items():
+        image = sprites[tuple(sprite_name.split('_'))]
+        assert image.size == (20, 30)
+        assert image.getpixel((10, 15)) == color
+
+
+def test_load_sprites_without_atlas(tmp_path):
+    Image.new('RGBA', (8, 8)).save(tmp_path / 'rook_white.png')
+    sprites = load_sprites(str(tmp_path / 'missing'), str(tmp_path))
+    assert list(sprites) == [('rook', 'white')]
@@ -0,0 +1,42 @@
+import pytest
+
+from tournament import Sprt, elo_difference, expected_score, opening_position, parse_engine
+
+
+def test_parse_engine():
+    assert parse_engine('name=fast,nodes=2000,quiescence=2') == {'name': 'fast', 'nodes': 2000, 'quiescence': 2}
+    with pytest.raises(ValueError):
+        parse_engine('speed=3')
+    with pytest.raises(ValueError):
+        parse_engine('quiescence=2')  # no depth, nodes or movetime
+
+
+def test_elo():
+    assert expected_score(0) == 0.5
+    assert elo_difference(expected_score(100)) == pytest.approx(100)
+
+
+def test_sprt_decides():
+    winning = Sprt(elo0=0, elo1=50)
+    for _ in range(200):
+        winning.record(1)
+        winning.record(0.5)
+        if winning.decision():
+            break
+    assert winning.decision() == 'H1'
+    assert winning.elo()[0] > 0
+
+    losing = Sprt(elo0=0, elo1=50)
+    for _ in range(200):
+        losing.record(0)
+        losing.record(0.5)
+        if losing.decision():
+            break
+    assert losing.decision() == 'H0'
+
+
+def test_opening_position():
+    game, fen, moves = opening_position('e2e4 e7e5 g1f3')
+    assert moves == ['e4', 'e5', 'Nf3'] and not game.white_turn
+    with pytest.raises(ValueError):
+        opening_position('e2e5')
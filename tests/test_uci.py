@@ -0,0 +1,25 @@
+import io
+
+from uci import UciEngine
+
+
+def run(*lines):
+    output = io.StringIO()
+    UciEngine(output).run([line + '\n' for line in lines])
+    return output.getvalue().splitlines()
+
+
+def test_handshake():
+    assert run('uci', 'isready')[-2:] == ['uciok', 'readyok']
+
+
+def test_bad_position_does_not_stop_the_engine():
+    lines = run('position fen 4k3/8/8/8/8/8/8/4K3 w - e 0 1', 'position fen P3k3/8/8/8/8/8/8/4K3 w - - 0 1',
+                'isready', 'position startpos moves e2e4', 'go depth 1')
+    assert 'readyok' in lines
+    assert lines[-1].startswith('bestmove ')
+
+
+def test_en_passant_from_fen():
+    lines = run('position fen 4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1', 'go depth 1')
+    assert lines[-1] == 'bestmove e5d6'
@@ -0,0 +1,33 @@
+import pytest
+
+from fen import STARTING_FEN
+from validator import parse_line, validate, verdict
+
+PROMOTION_FEN = '4k3/1P6/8/8/8/8/8/4K3 w - - 0 1'
+
+
+@pytest.mark.parametrize('fen, move, expected', [
+    (STARTING_FEN, 'e2e4', (True, None)),
+    (STARTING_FEN, 'e2e5', (False, 'illegal move')),
+    (STARTING_FEN, 'e7e5', (False, 'no piece of the player to move can move from e7')),
+    (STARTING_FEN, 'e2', (False, "not a UCI move: 'e2'")),
+    (PROMOTION_FEN, 'b7b8n', (True, None)),
+    (PROMOTION_FEN, 'b7b8', (False, 'missing promotion piece')),
+    (PROMOTION_FEN, 'e1e2q', (False, 'not a promotion')),
+    ('7k/5Q2/6K1/8/8/8/8/8 b - - 0 1', 'h8g8', (False, 'the player to move has no move(checkmate or stalemate)')),
+])
+def test_verdict(fen, move, expected):
+    assert verdict(fen, move) == expected
+
+
+@pytest.mark.parametrize('fen', ['4k3/8/8/8/8/8/8/4K3 w - e 0 1', 'P3k3/8/8/8/8/8/8/4K3 w - - 0 1', 'not a fen'])
+def test_bad_fen(fen):
+    legal, reason = verdict(fen, 'e1e2')
+    assert not legal and reason.startswith('bad FEN: ')
+
+
+def test_validate_keeps_the_order():
+    lines = [f'{STARTING_FEN} e2e4', '4k3/8/8/8/8/8/8/4K3 w - e 0 1 e1e2', f'{STARTING_FEN} e2e5',
+             f'{PROMOTION_FEN} b7b8q']
+    results = validate([parse_line(line) for line in lines], workers=1)
+    assert [legal for legal, _ in results] == [True, False, False, True]
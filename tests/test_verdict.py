@@ -0,0 +1,37 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from fen import STARTING_FEN, game_from_fen
+
+
+@pytest.mark.parametrize('fen, state', [
+    ('7k/6Q1/6K1/8/8/8/8/8 b - - 0 1', 'checkmate'),
+    ('7k/5Q2/6K1/8/8/8/8/8 b - - 0 1', 'stalemate'),
+    ('7k/8/6K1/8/8/8/8/5Q2 b - - 0 1', None),
+    (STARTING_FEN, None),
+])
+def test_check_game_state(fen, state):
+    game = game_from_fen(fen)
+    assert game.check_game_state('white' if game.white_turn else 'black') == state
+
+
+def test_verdict_of_a_copy_in_a_worker():
+    game = game_from_fen(STARTING_FEN)
+    for from_square, to_square in (('f2', 'f3'), ('e7', 'e5'), ('g2', 'g4'), ('d8', 'h4')):
+        game.play_move(from_square, to_square)
+    assert game.game_state == 'checkmate'
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        position = game.copy()
+        assert executor.submit(position.check_game_state, 'white').result(timeout=10) == 'checkmate'
+
+
+def test_apply_verdict_ends_the_game():
+    game = game_from_fen('7k/6Q1/6K1/8/8/8/8/8 b - - 0 1')
+    game.apply_verdict(None, 'black')
+    assert not game.game_state
+
+    game.apply_verdict('checkmate', 'black')
+    assert game.game_state == 'checkmate'
+    assert game.won == 'white'
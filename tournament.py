@@ -0,0 +1,259 @@
+"""Plays two engine configurations against each other until a sequential probability ratio test(SPRT) decides.
+
+    python tournament.py depth=2 depth=1 [--games N] [--openings FILE] [--pgn FILE] [--workers N]
+
+An engine configuration is a comma separated list of search limits(e.g. 'name=deep,depth=3,quiescence=4'):
+depth, nodes, movetime(ms) and quiescence(the captures searched after the depth, see `Search.quiescence`).
+Every opening is played twice, each engine having the white pieces once. The games run in a process pool sized
+to the cores of the machine and are adjudicated by the rules of the game(checkmate, stalemate and the draws),
+a game reaching --max-plies is drawn.
+
+After every game, the SPRT tests whether the first engine is elo0 Elo(H0) or elo1 Elo(H1) stronger than the
+second one. Once the log-likelihood ratio crosses a bound, the games not started yet are cancelled. The Elo
+difference with its 95% error bars, the games per minute and the PGN of all the games are written at the end.
+"""
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from fen import STARTING_FEN, game_from_fen, game_to_fen
+from game import parse_uci_move
+from instrumentation import get_logger
+from pgn import game_pgn, play_san, result_of
+from search import Search
+
+logger = get_logger('tournament')
+
+# moves from the starting position(UCI)
+OPENINGS = [
+    'e2e4 e7e5 g1f3 b8c6',
+    'e2e4 c7c5 g1f3 d7d6',
+    'e2e4 e7e6 d2d4 d7d5',
+    'e2e4 c7c6 d2d4 d7d5',
+    'd2d4 d7d5 c2c4 e7e6',
+    'd2d4 g8f6 c2c4 g7g6',
+    'c2c4 e7e5 b1c3 g8f6',
+    'g1f3 d7d5 g2g3 g8f6',
+]
+MAX_PLIES = 200  # halfmoves after which a game is drawn
+# key: limit of an engine configuration, value: its type
+ENGINE_LIMITS = {'name': str, 'depth': int, 'nodes': int, 'movetime': int, 'quiescence': int}
+# key: PGN result, value: score of the white player
+RESULT_SCORES = {'1-0': 1.0, '0-1': 0.0, '1/2-1/2': 0.5}
+
+
+def parse_engine(text: str) -> dict:
+    """Returns the configuration of an engine(e.g. 'depth=2,nodes=5000' -> {'name': 'depth=2,nodes=5000',
+    'depth': 2, 'nodes': 5000}), raises ValueError for an unknown limit or an engine without any limit"""
+    engine = {'name': text}
+    for setting in text.split(','):
+        key, _, value = setting.partition('=')
+        if key not in ENGINE_LIMITS or not value:
+            raise ValueError(f'{setting!r}: expected one of {", ".join(ENGINE_LIMITS)} with a value')
+        engine[key] = ENGINE_LIMITS[key](value)
+
+    if not any(limit in engine for limit in ('depth', 'nodes', 'movetime')):
+        raise ValueError(f'{text!r}: an engine needs a depth, nodes or movetime limit')
+    return engine
+
+
+def read_openings(path: str) -> list:
+    """Returns the openings of a file, one per line: a FEN or moves from the starting position(UCI).
+    Empty lines and lines starting with '#' are skipped."""
+    with open(path) as file:
+        return [line.strip() for line in file if line.strip() and not line.startswith('#')]
+
+
+def opening_position(opening: str):
+    """Returns (game, FEN of the starting position, SAN moves) of an opening(a FEN or UCI moves)"""
+    if '/' in opening:
+        return game_from_fen(opening), opening, []
+
+    game = game_from_fen(STARTING_FEN)
+    moves = []
+    for move in opening.split():
+        from_square, to_square, promotion = parse_uci_move(move)
+        if (from_square, to_square) not in game.legal_moves():
+            raise ValueError(f'{opening!r}: {move} is not a correct move')
+        moves.append(play_san(game, from_square, to_square, promotion or 'queen'))
+    return game, STARTING_FEN, moves
+
+
+def engine_move(game, engine: dict) -> str:
+    """Returns the move(UCI) of `engine` in the position of `game`"""
+    search = Search(game)
+    if 'quiescence' in engine:
+        search.quiescence_depth = engine['quiescence']
+    best_move, _ = search.run(depth=engine.get('depth'), nodes=engine.get('nodes'),
+                              movetime_ms=engine.get('movetime'))
+    return best_move
+
+
+def play_game(index: int, opening: str, white: dict, black: dict, max_plies: int = MAX_PLIES) -> dict:
+    """Plays one game in a worker process.
+
+    :return: dict with the index of the game, the PGN result, the reason the game ended, the number of
+        halfmoves and the PGN of the game
+    """
+    game, fen, moves = opening_position(opening)
+    plies = 0
+    while not game.game_state and plies < max_plies:
+        engine = white if game.white_turn else black
+        move = engine_move(game, engine)
+        if move is None:  # judged as soon as the move was played, so not expected
+            break
+        from_square, to_square, promotion = parse_uci_move(move)
+        moves.append(play_san(game, from_square, to_square, promotion))
+        plies += 1
+
+    result = result_of(game)
+    reason = game.game_state
+    if result == '*':
+        result, reason = '1/2-1/2', 'max-plies'
+    logger.debug('game %d: %s(%s) after %d plies, %s', index, result, reason, plies, game_to_fen(game))
+
+    # the Seven Tag Roster first, '?' for a tag that is not known
+    headers = {'Event': 'Engine match', 'Site': '?', 'Date': time.strftime('%Y.%m.%d'), 'Round': str(index + 1),
+               'White': white['name'], 'Black': black['name'], 'Termination': reason}
+    return {'index': index, 'result': result, 'reason': reason, 'plies': plies,
+            'pgn': game_pgn(headers, moves, result, fen)}
+
+
+def expected_score(elo: float) -> float:
+    """Returns the score expected by a player `elo` Elo stronger than the opponent(logistic model)"""
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def elo_difference(score: float) -> float:
+    """Returns the Elo difference of a player scoring `score`(0 to 1) against the opponent"""
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+class Sprt:
+    """Sequential probability ratio test of the results of the first engine(1, 0.5 or 0 per game).
+
+    Uses the normal approximation of the log-likelihood ratio(generalized SPRT): with n games of mean score s and
+    variance v, LLR = n * (s1 - s0) * (2 * s - s0 - s1) / (2 * v), s0 and s1 being the scores expected at elo0
+    and elo1. H1 is accepted once LLR >= log((1 - beta) / alpha), H0 once LLR <= log(beta / (1 - alpha)).
+    """
+
+    def __init__(self, elo0: float = 0, elo1: float = 50, alpha: float = 0.05, beta: float = 0.05):
+        self.score0 = expected_score(elo0)
+        self.score1 = expected_score(elo1)
+        self.lower_bound = math.log(beta / (1 - alpha))
+        self.upper_bound = math.log((1 - beta) / alpha)
+        self.scores = []
+
+    def record(self, score: float):
+        self.scores.append(score)
+
+    def mean_variance(self):
+        """Returns (mean, variance) of the scores"""
+        count = len(self.scores)
+        mean = sum(self.scores) / count
+        return mean, sum(score * score for score in self.scores) / count - mean * mean
+
+    def llr(self) -> float:
+        """Returns the log-likelihood ratio of H1 against H0(0 until the results differ)"""
+        if not self.scores:
+            return 0.0
+        mean, variance = self.mean_variance()
+        if variance <= 0:
+            return 0.0
+        return len(self.scores) * (self.score1 - self.score0) * (2 * mean - self.score0 - self.score1) / (2 * variance)
+
+    def decision(self):
+        """Returns 'H1'(the first engine is elo1 stronger), 'H0'(it is not elo0 stronger) or None(play on)"""
+        llr = self.llr()
+        if llr >= self.upper_bound:
+            return 'H1'
+        if llr <= self.lower_bound:
+            return 'H0'
+        return None
+
+    def elo(self):
+        """Returns (Elo difference, lower bound, upper bound) of the first engine, the bounds of 95% confidence"""
+        mean, variance = self.mean_variance()
+        margin = 1.96 * math.sqrt(variance / len(self.scores))
+        return elo_difference(mean), elo_difference(mean - margin), elo_difference(mean + margin)
+
+
+def match(first: dict, second: dict, openings: list, games: int, sprt: Sprt, workers: int = None,
+          max_plies: int = MAX_PLIES) -> dict:
+    """Plays up to `games` games of `first` against `second` until `sprt` decides.
+
+    :return: dict with the SPRT decision, the scores of `first`(wins, draws, losses), the games per minute and
+        the results of `play_game` in the order of the games
+    """
+    results = []
+    wins = draws = losses = 0
+    decision = None
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = {}
+        for index in range(games):
+            opening = openings[index // 2 % len(openings)]
+            # the first engine has the white pieces in the even games
+            white, black = (first, second) if index % 2 == 0 else (second, first)
+            futures[executor.submit(play_game, index, opening, white, black, max_plies)] = index
+
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            score = RESULT_SCORES[result['result']]
+            if result['index'] % 2:
+                score = 1 - score
+            sprt.record(score)
+            wins += score == 1
+            draws += score == 0.5
+            losses += score == 0
+            logger.info('game %d: %s, %s %d-%d-%d LLR %.2f', result['index'] + 1, result['result'], first['name'],
+                        wins, draws, losses, sprt.llr())
+
+            decision = sprt.decision()
+            if decision:
+                for pending in futures:
+                    pending.cancel()  # the games running in the workers still finish
+                break
+
+    minutes = (time.perf_counter() - start) / 60
+    results.sort(key=lambda result: result['index'])
+    return {'decision': decision, 'wins': wins, 'draws': draws, 'losses': losses,
+            'games_per_minute': len(results) / minutes, 'results': results}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Plays two engine configurations against each other')
+    parser.add_argument('first', type=parse_engine, help="e.g. 'depth=2' or 'name=fast,nodes=2000,quiescence=2'")
+    parser.add_argument('second', type=parse_engine)
+    parser.add_argument('--games', type=int, default=200, help='games played at most')
+    parser.add_argument('--openings', help='file of FENs or UCI moves, one opening per line')
+    parser.add_argument('--pgn', default='tournament.pgn', help='file the games are written to')
+    parser.add_argument('--workers', type=int, help='processes playing games(the number of cores by default)')
+    parser.add_argument('--max-plies', type=int, default=MAX_PLIES)
+    parser.add_argument('--elo0', type=float, default=0)
+    parser.add_argument('--elo1', type=float, default=50)
+    parser.add_argument('--alpha', type=float, default=0.05)
+    parser.add_argument('--beta', type=float, default=0.05)
+    arguments = parser.parse_args()
+
+    sprt = Sprt(arguments.elo0, arguments.elo1, arguments.alpha, arguments.beta)
+    openings = read_openings(arguments.openings) if arguments.openings else OPENINGS
+    outcome = match(arguments.first, arguments.second, openings, arguments.games, sprt, arguments.workers,
+                    arguments.max_plies)
+
+    with open(arguments.pgn, 'w') as file:
+        file.write('\n'.join(result['pgn'] for result in outcome['results']))
+
+    played = len(outcome['results'])
+    elo, lower, upper = sprt.elo()
+    print(f'{arguments.first["name"]} vs {arguments.second["name"]}: {played} games, '
+          f'+{outcome["wins"]} ={outcome["draws"]} -{outcome["losses"]}')
+    print(f'Elo {elo:+.1f} (95% {lower:+.1f} to {upper:+.1f})')
+    print(f'SPRT elo0={arguments.elo0:g} elo1={arguments.elo1:g}: LLR {sprt.llr():.2f} '
+          f'({sprt.lower_bound:.2f}, {sprt.upper_bound:.2f}), {outcome["decision"] or "no decision"}')
+    print(f'{outcome["games_per_minute"]:.1f} games per minute, PGN written to {arguments.pgn}')
@@ -0,0 +1,166 @@
+"""Runs the rules and the search as a chess engine speaking the UCI protocol over stdin/stdout.
+
+    python uci.py
+
+The commands understood are:
+
+    uci                                     -> id ..., uciok
+    isready                                 -> readyok
+    ucinewgame
+    position startpos [moves e2e4 ...]
+    position fen <fen> [moves e2e4 ...]
+    go [depth N] [nodes N] [movetime MS] [wtime MS btime MS winc MS binc MS movestogo N] [infinite]
+                                            -> info depth ... nps ..., bestmove <move>
+    stop                                    ends the search, the best move found so far is sent
+    quit
+
+The search runs in a thread of its own while the commands keep being read, so `stop` is answered at once.
+The engine never imports tkinter(see `uci_benchmark` for the startup time and the nodes per second).
+"""
+import sys
+import threading
+
+from fen import STARTING_FEN, game_from_fen
+from game import parse_uci_move
+from instrumentation import configure_logging, get_logger
+from search import Search
+
+logger = get_logger('uci')
+
+ENGINE_NAME = 'ChessBoard'
+ENGINE_AUTHOR = 'the ChessBoard authors'
+MOVES_TO_GO = 30  # moves the remaining time is shared between when the GUI does not say(movestogo)
+
+
+def think_time_ms(options: dict, white_turn: bool):
+    """Returns the time to search in milliseconds from the options of `go`, None to search without a time limit"""
+    if 'movetime' in options:
+        return options['movetime']
+
+    time_left = options.get('wtime' if white_turn else 'btime')
+    if time_left is None:
+        return None
+
+    increment = options.get('winc' if white_turn else 'binc', 0)
+    share = time_left // (options.get('movestogo') or MOVES_TO_GO) + increment // 2
+    return max(1, min(share, time_left // 2))
+
+
+class UciEngine:
+    """Answers the UCI commands read by `run`, one position and at most one search at a time"""
+
+    def __init__(self, output=None):
+        self.output = output or sys.stdout
+        self.output_lock = threading.Lock()  # the search thread and the command loop both write
+        self.game = game_from_fen(STARTING_FEN)
+        self.search = None
+        self.search_thread = None
+        self.commands = {
+            'uci': self.uci,
+            'isready': self.isready,
+            'ucinewgame': self.ucinewgame,
+            'position': self.position,
+            'go': self.go,
+            'stop': self.stop,
+        }
+
+    def send(self, line: str):
+        with self.output_lock:
+            self.output.write(line + '\n')
+            self.output.flush()
+
+    def run(self, lines=None):
+        """Answers the commands of `lines`(stdin if not given) until quit or the end of the input"""
+        for line in lines or sys.stdin:
+            words = line.split()
+            if not words:
+                continue
+            if words[0] == 'quit':
+                break
+
+            command = self.commands.get(words[0])
+            if command is None:
+                logger.info('unknown command %r', line.strip())
+                continue
+            try:
+                command(words[1:])
+            except ValueError as error:
+                logger.warning('cannot run %r: %s', line.strip(), error)
+
+        self.stop([])
+
+    def uci(self, words: list):
+        self.send(f'id name {ENGINE_NAME}')
+        self.send(f'id author {ENGINE_AUTHOR}')
+        self.send('uciok')
+
+    def isready(self, words: list):
+        self.send('readyok')
+
+    def ucinewgame(self, words: list):
+        self.stop([])
+        self.game = game_from_fen(STARTING_FEN)
+
+    def position(self, words: list):
+        """position startpos|fen <fen> [moves <move> ...]"""
+        self.stop([])
+        moves = words.index('moves') if 'moves' in words else len(words)
+        if words[:1] == ['startpos']:
+            fen = STARTING_FEN
+        elif words[:1] == ['fen']:
+            fen = ' '.join(words[1:moves])
+        else:
+            raise ValueError('position needs startpos or fen')
+
+        game = game_from_fen(fen)
+        for move in words[moves + 1:]:
+            parsed = parse_uci_move(move)
+            if parsed is None or not game.play_move(*parsed):
+                raise ValueError(f'illegal move {move}')
+            if game.promotion_square:  # a promotion without its letter
+                game.promote('queen')
+        self.game = game
+
+    def go(self, words: list):
+        """go [depth N] [nodes N] [movetime MS] [wtime MS] [btime MS] [winc MS] [binc MS] [movestogo N] [infinite]"""
+        self.stop([])
+        options = {}
+        infinite = False
+        iterator = iter(words)
+        for word in iterator:
+            if word == 'infinite':
+                infinite = True
+            elif word in ('depth', 'nodes', 'movetime', 'wtime', 'btime', 'winc', 'binc', 'movestogo'):
+                options[word] = int(next(iterator, '0'))
+
+        movetime_ms = None if infinite else think_time_ms(options, self.game.white_turn)
+        self.search = Search(self.game, info=self.send_info)
+        self.search_thread = threading.Thread(
+            target=self.think, args=(self.search, options.get('depth'), options.get('nodes'), movetime_ms, infinite),
+            name='search', daemon=True)
+        self.search_thread.start()
+
+    def think(self, search: Search, depth, nodes, movetime_ms, infinite: bool):
+        """Runs in the search thread: searches, then sends the best move"""
+        best_move, _ = search.run(depth, nodes, movetime_ms)
+        if infinite:  # the GUI expects the best move only after stop
+            search.stopped.wait()
+        self.send(f'bestmove {best_move or "0000"}')
+
+    def send_info(self, info: dict):
+        score = f'mate {info["mate"]}' if info['mate'] is not None else f'cp {info["score"]}'
+        self.send(f'info depth {info["depth"]} score {score} nodes {info["nodes"]} nps {info["nps"]} '
+                  f'time {info["time_ms"]} pv {" ".join(info["pv"])}')
+
+    def stop(self, words: list):
+        """Stops the search if one is running and waits for its best move to be sent"""
+        if self.search_thread is not None:
+            self.search.stop()
+            self.search_thread.join()
+            self.search_thread = None
+            self.search = None
+
+
+if __name__ == '__main__':
+    configure_logging()  # the logs go to stderr, stdout is for the GUI
+    UciEngine().run()
@@ -0,0 +1,90 @@
+"""Measures the UCI engine(see `uci`) the way a GUI sees it, through a pipe to a new process.
+
+    python uci_benchmark.py [runs] [movetime_ms]
+
+prints the time from starting the process to `uciok`, the nodes per second of a search of `movetime_ms` on a few
+positions and how long `stop` takes to bring the best move during an infinite search.
+"""
+import os
+import subprocess
+import sys
+import time
+
+from instrumentation import LatencyHistogram
+
+POSITIONS = (
+    'startpos',
+    'fen r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+    'fen 8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+    'fen r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+)
+
+
+class Engine:
+    """An engine process driven through its stdin/stdout"""
+
+    def __init__(self):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uci.py')
+        self.process = subprocess.Popen([sys.executable, path], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        text=True, bufsize=1)
+
+    def send(self, line: str):
+        self.process.stdin.write(line + '\n')
+        self.process.stdin.flush()
+
+    def wait_for(self, prefix: str) -> list:
+        """Returns the lines read until(and including) the first one starting with `prefix`"""
+        lines = []
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                raise RuntimeError(f'the engine stopped before {prefix}')
+            lines.append(line.strip())
+            if line.startswith(prefix):
+                return lines
+
+    def quit(self):
+        self.send('quit')
+        self.process.wait()
+
+
+def benchmark(runs: int = 5, movetime_ms: int = 2000):
+    startup = LatencyHistogram()
+    for _ in range(runs):
+        start = time.perf_counter_ns()
+        engine = Engine()
+        engine.send('uci')
+        engine.wait_for('uciok')
+        startup.record(time.perf_counter_ns() - start)
+        engine.quit()
+    print(f'startup to uciok: p50 {startup.percentile(50) / 1e6:.0f} ms, max {startup.max_ns / 1e6:.0f} ms')
+
+    engine = Engine()
+    engine.send('uci')
+    engine.wait_for('uciok')
+    for position in POSITIONS:
+        engine.send(f'position {position}')
+        engine.send(f'go movetime {movetime_ms}')
+        lines = engine.wait_for('bestmove')
+        infos = [line.split() for line in lines if line.startswith('info')]
+        last = infos[-1] if infos else []
+        nps = last[last.index('nps') + 1] if 'nps' in last else '?'
+        depth = last[last.index('depth') + 1] if 'depth' in last else '?'
+        print(f'{position[:60]:60} depth {depth} nps {nps} {lines[-1]}')
+
+    stop = LatencyHistogram()
+    for _ in range(runs):
+        engine.send('position startpos')
+        engine.send('go infinite')
+        time.sleep(0.5)
+        start = time.perf_counter_ns()
+        engine.send('stop')
+        engine.wait_for('bestmove')
+        stop.record(time.perf_counter_ns() - start)
+    print(f'stop to bestmove: p50 {stop.percentile(50) / 1e6:.1f} ms, max {stop.max_ns / 1e6:.1f} ms')
+    engine.quit()
+
+
+if __name__ == '__main__':
+    arguments = [int(argument) for argument in sys.argv[1:3]]
+    benchmark(*arguments)
@@ -0,0 +1,180 @@
+"""Checks many (FEN, UCI move) pairs at once, e.g. the moves received from other sources before they are stored.
+
+    python validator.py [FILE] [--workers N]
+
+reads one pair per line("<FEN> <move>", the move after the FEN fields) from FILE or stdin and writes one
+verdict per line: 'ok' or 'illegal: <reason>'. With --benchmark it checks random moves and prints the throughput.
+
+The pairs are grouped by position: the correct moves of a position are generated once for all the moves asked
+about it, and kept in a cache of each process(`correct_moves`) for the positions that come back. A large batch is
+split by position over a process pool.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from fen import STARTING_FEN, game_from_fen, game_to_fen
+from game import PROMOTION_LETTERS, parse_uci_move, uci_move
+from instrumentation import get_logger
+
+logger = get_logger('validator')
+
+PARALLEL_POSITIONS = 64  # fewer positions are checked in the calling process, the pool costs more than it saves
+BLOCK_SIZE = 100000  # pairs of a stream checked at a time
+CACHE_SIZE = 4096  # positions whose correct moves each process keeps
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def correct_moves(fen: str):
+    """Returns (correct UCI moves, None) of the position `fen`, (None, reason) if `fen` is not a position"""
+    try:
+        game = game_from_fen(fen)
+    except ValueError as error:
+        return None, f'bad FEN: {error}'
+
+    moves = set()
+    for from_square, to_square in game.legal_moves():
+        piece = game.pieces[game.get_piece_on_square(from_square)]
+        if piece.name == 'pawn' and to_square[1] in '18':
+            moves.update(uci_move(from_square, to_square, name) for name in PROMOTION_LETTERS.values())
+        else:
+            moves.add(uci_move(from_square, to_square))
+    return frozenset(moves), None
+
+
+def verdict(fen: str, move: str):
+    """Returns (legal, reason) of `move`(UCI) in the position `fen`, the reason being None for a legal move"""
+    moves, error = correct_moves(fen)
+    if error:
+        return False, error
+    if move in moves:
+        return True, None
+    if not moves:
+        return False, 'the player to move has no move(checkmate or stalemate)'
+
+    parsed = parse_uci_move(move)
+    if parsed is None:
+        return False, f'not a UCI move: {move!r}'
+    from_square, to_square, promotion = parsed
+    if promotion is None and f'{move}q' in moves:
+        return False, 'missing promotion piece'
+    if promotion is not None and move[:4] in moves:
+        return False, 'not a promotion'
+    if not any(correct.startswith(from_square) for correct in moves):
+        return False, f'no piece of the player to move can move from {from_square}'
+    return False, 'illegal move'
+
+
+def check_positions(groups: list) -> list:
+    """Checks the moves of a few positions(in a worker process).
+
+    :param groups: list of (fen, [(index, move), ...])
+    :return: list of (index, legal, reason)
+    """
+    return [(index, *verdict(fen, move)) for fen, moves in groups for index, move in moves]
+
+
+def validate(pairs, workers: int = None, executor=None) -> list:
+    """Returns the (legal, reason) of each (FEN, UCI move) pair of `pairs`, in their order.
+
+    :param workers: processes of the pool made for a large batch(the number of cores by default)
+    :param executor: pool to use instead of making one(e.g. the one of `validate_stream`)
+    """
+    groups = defaultdict(list)  # key: FEN, value: list of (index, move)
+    count = 0
+    for index, (fen, move) in enumerate(pairs):
+        groups[fen.strip()].append((index, move.strip()))
+        count += 1
+
+    results = [None] * count
+    workers = workers or os.cpu_count()
+    if len(groups) < PARALLEL_POSITIONS or (workers == 1 and executor is None):
+        checked = [check_positions(list(groups.items()))]
+    else:
+        # the positions are dealt in turn to a few chunks per worker, so the chunks have about the same work
+        chunks = [list(groups.items())[start::workers * 4] for start in range(workers * 4)]
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                checked = list(pool.map(check_positions, chunks))
+        else:
+            checked = list(executor.map(check_positions, chunks))
+
+    for chunk in checked:
+        for index, legal, reason in chunk:
+            results[index] = (legal, reason)
+    logger.debug('%d moves of %d positions checked', count, len(groups))
+    return results
+
+
+def validate_stream(pairs, workers: int = None, block_size: int = BLOCK_SIZE):
+    """Yields the (legal, reason) of each (FEN, UCI move) pair of the iterable `pairs`, checking a block at a time"""
+    workers = workers or os.cpu_count()
+    block = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for pair in pairs:
+            block.append(pair)
+            if len(block) == block_size:
+                yield from validate(block, workers, executor)
+                block = []
+        if block:
+            yield from validate(block, workers, executor)
+
+
+def parse_line(line: str):
+    """Returns the (FEN, move) of a line '<FEN> <move>'(the move is the last word)"""
+    fen, _, move = line.strip().rpartition(' ')
+    return fen, move
+
+
+def benchmark(positions: int = 200, moves_per_position: int = 500, workers: int = None):
+    """Checks moves of random positions, a third of them illegal, and prints the moves checked per second"""
+    generator = random.Random(0)
+    fens = []
+    game = game_from_fen(STARTING_FEN)
+    while len(fens) < positions:
+        legal = game.legal_moves()
+        if not legal or game.game_state:
+            game = game_from_fen(STARTING_FEN)
+            continue
+        fens.append(game_to_fen(game))
+        game.play_move(*generator.choice(legal), 'queen')
+
+    pairs = []
+    for fen in fens:
+        moves = sorted(correct_moves(fen)[0])
+        for _ in range(moves_per_position):
+            if generator.randrange(3):
+                pairs.append((fen, generator.choice(moves)))
+            else:
+                pairs.append((fen, generator.choice(['e2e5', 'a1h8', 'e7e8', 'g1g1', 'x9'])))
+    generator.shuffle(pairs)
+    correct_moves.cache_clear()
+
+    start = time.perf_counter()
+    results = validate(pairs, workers)
+    seconds = time.perf_counter() - start
+    legal = sum(result[0] for result in results)
+    print(f'{len(pairs)} moves of {positions} positions checked in {seconds:.2f} s({legal} legal): '
+          f'{len(pairs) / seconds:,.0f} moves per second with {workers or os.cpu_count()} workers')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Checks the legality of (FEN, UCI move) pairs')
+    parser.add_argument('file', nargs='?', help="file of '<FEN> <move>' lines(stdin by default)")
+    parser.add_argument('--workers', type=int, help='processes checking the moves(the number of cores by default)')
+    parser.add_argument('--benchmark', action='store_true', help='checks random moves and prints the throughput')
+    arguments = parser.parse_args()
+
+    if arguments.benchmark:
+        benchmark(workers=arguments.workers)
+        sys.exit()
+
+    lines = open(arguments.file) if arguments.file else sys.stdin
+    with lines:
+        for legal, reason in validate_stream((parse_line(line) for line in lines if line.strip()), arguments.workers):
+            print('ok' if legal else f'illegal: {reason}')